@@ -26,3 +26,80 @@ TRON_TAX_COLLECT_PUBLIC_KEY = os.getenv("TRON_TAX_COLLECT_PUBLIC_KEY")
 CLIENT = os.getenv("CLIENT")
 OWNER_TELEGRAM_ID = os.getenv("OWNER_TELEGRAM_ID")
 TRON_CLIENT_NETWORK = os.getenv("TRON_CLIENT_NETWORK")
+
+# Seconds of wizard inactivity before buffered case draft fields are written
+CASE_DRAFT_IDLE_FLUSH_SECONDS = float(os.getenv("CASE_DRAFT_IDLE_FLUSH_SECONDS", "60"))
+
+# Solana RPC client (utils/solana_config.py)
+SOLANA_RPC_TIMEOUT = float(os.getenv("SOLANA_RPC_TIMEOUT", "10"))
+SOLANA_RPC_MAX_CONNECTIONS = int(os.getenv("SOLANA_RPC_MAX_CONNECTIONS", "20"))
+SOLANA_RPC_MAX_CONCURRENCY = int(os.getenv("SOLANA_RPC_MAX_CONCURRENCY", "16"))
+
+# RPC endpoint pools (utils/rpc_pool.py), URL lists are comma-separated
+SOLANA_RPC_URLS = os.getenv("SOLANA_RPC_URLS")
+SOLANA_RPC_RATE_PER_SECOND = float(os.getenv("SOLANA_RPC_RATE_PER_SECOND", "10"))
+SOLANA_RPC_BURST = float(os.getenv("SOLANA_RPC_BURST", "20"))
+TRON_RPC_URLS = os.getenv("TRON_RPC_URLS")
+TRON_RPC_TIMEOUT = float(os.getenv("TRON_RPC_TIMEOUT", "10"))
+TRON_RPC_RATE_PER_SECOND = float(os.getenv("TRON_RPC_RATE_PER_SECOND", "10"))
+TRON_RPC_BURST = float(os.getenv("TRON_RPC_BURST", "20"))
+RPC_FAILURE_COOLDOWN_SECONDS = float(os.getenv("RPC_FAILURE_COOLDOWN_SECONDS", "5"))
+RPC_MAX_COOLDOWN_SECONDS = float(os.getenv("RPC_MAX_COOLDOWN_SECONDS", "60"))
+RPC_ERROR_PENALTY_SECONDS = float(os.getenv("RPC_ERROR_PENALTY_SECONDS", "2"))
+
+# Background media uploads (services/upload_service.py)
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "4"))
+UPLOAD_QUEUE_SIZE = int(os.getenv("UPLOAD_QUEUE_SIZE", "100"))
+UPLOAD_MAX_ATTEMPTS = int(os.getenv("UPLOAD_MAX_ATTEMPTS", "3"))
+UPLOAD_RETRY_BACKOFF = float(os.getenv("UPLOAD_RETRY_BACKOFF", "1.0"))
+# How long a submission waits for the upload it needs before giving up
+UPLOAD_WAIT_SECONDS = float(os.getenv("UPLOAD_WAIT_SECONDS", "30"))
+
+# Per-user sessions (services/session_store.py): "memory" or "mongo"
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "100000"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+# With a shared backend, how long a process trusts its local copy of a session
+SESSION_CACHE_SECONDS = float(os.getenv("SESSION_CACHE_SECONDS", "60"))
+
+# Cached user languages (services/user_service.py)
+LANG_CACHE_MAX_ENTRIES = int(os.getenv("LANG_CACHE_MAX_ENTRIES", "200000"))
+LANG_CACHE_TTL_SECONDS = float(os.getenv("LANG_CACHE_TTL_SECONDS", "3600"))
+# Languages of the most recently active users loaded at startup
+LANG_PREFETCH_LIMIT = int(os.getenv("LANG_PREFETCH_LIMIT", "5000"))
+
+# Cached wallet balances (services/balance_cache.py)
+BALANCE_CACHE_TTL_SECONDS = float(os.getenv("BALANCE_CACHE_TTL_SECONDS", "15"))
+BALANCE_CACHE_MAX_ENTRIES = int(os.getenv("BALANCE_CACHE_MAX_ENTRIES", "50000"))
+
+# Transfer outbox (services/transfer_outbox.py)
+TRANSFER_WORKERS = int(os.getenv("TRANSFER_WORKERS", "4"))
+TRANSFER_MAX_ATTEMPTS = int(os.getenv("TRANSFER_MAX_ATTEMPTS", "5"))
+TRANSFER_RETRY_BACKOFF = float(os.getenv("TRANSFER_RETRY_BACKOFF", "5"))
+# How often a sent transfer is checked until it is confirmed
+TRANSFER_CONFIRM_POLL_SECONDS = float(os.getenv("TRANSFER_CONFIRM_POLL_SECONDS", "3"))
+# A transfer still unknown this long after its broadcast has expired and is sent again
+TRANSFER_RESEND_AFTER_SECONDS = float(os.getenv("TRANSFER_RESEND_AFTER_SECONDS", "120"))
+# How long a worker owns a claimed transfer before another may take it over
+TRANSFER_LEASE_SECONDS = float(os.getenv("TRANSFER_LEASE_SECONDS", "120"))
+# Idle workers look for due transfers at least this often
+TRANSFER_POLL_SECONDS = float(os.getenv("TRANSFER_POLL_SECONDS", "5"))
+# Follow-up groups queued for the legs of a reward that failed once another was paid
+REWARD_PAYOUT_MAX_ROUNDS = int(os.getenv("REWARD_PAYOUT_MAX_ROUNDS", "3"))
+
+# Solana confirmation tracking (services/signature_tracker.py)
+SIGNATURE_POLL_MIN_SECONDS = float(os.getenv("SIGNATURE_POLL_MIN_SECONDS", "0.5"))
+SIGNATURE_POLL_MAX_SECONDS = float(os.getenv("SIGNATURE_POLL_MAX_SECONDS", "4"))
+# Seconds a signature is polled before it is given up as unknown (blockhash expiry)
+SIGNATURE_TRACK_SECONDS = float(os.getenv("SIGNATURE_TRACK_SECONDS", "90"))
+
+# Recent blockhash shared by Solana sends (utils/blockhash_provider.py)
+BLOCKHASH_REFRESH_SECONDS = float(os.getenv("BLOCKHASH_REFRESH_SECONDS", "20"))
+BLOCKHASH_MAX_AGE_SECONDS = float(os.getenv("BLOCKHASH_MAX_AGE_SECONDS", "45"))
+
+# Wallet transaction history (services/history_service.py)
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "10"))
+# A history opened again within this time is served from MongoDB alone
+HISTORY_SYNC_SECONDS = float(os.getenv("HISTORY_SYNC_SECONDS", "30"))
+# Newest transactions copied per sync, each SOL one costs a getTransaction call
+HISTORY_MAX_FETCH = int(os.getenv("HISTORY_MAX_FETCH", "50"))
@@ -12,6 +12,9 @@ CASE_CONSTANT = {
         "enter_person_name": "Enter the name of the person you're looking for:",
         "relationship": "What is your relationship to the person? (e.g., Friend, Family, Partner, etc.):",
         "upload_photo": "Upload a clear photo of the person (max. 5 MB):",
+        "photo_upload_failed": "❌ We could not upload your photo. Please send it again.",
+        "photo_upload_failed_notice": "❌ We could not upload your photo. You will be asked to send it again before the case is submitted.",
+        "photo_upload_pending": "⏳ Your photo is still uploading. Please confirm again in a moment.",
         "last_seen_location": "Where was the last seen location of this person?",
         "sex": "What is the person's gender? (Male/Female):",
         "age": "What is the person's age?",
@@ -31,6 +34,8 @@ CASE_CONSTANT = {
         "transfer_successful": "The transfer was successful.",
         "transfer_failed": "The transfer failed. Please try again.",
         "transfer_error": "An error occurred while processing the transfer. Please try again.",
+        "transfer_queued": "⏳ Your transfer has been submitted. You will be notified once it is confirmed.",
+        "transfer_already_queued": "⏳ The transfer of this case is already submitted. You will be notified once it is confirmed.",
         "transfer_canceled": "The transfer has been canceled.",
         "invalid_confirmation": "Invalid response. Please confirm with 'yes' or 'no'.",
         "enter_reason_for_finding": "Please provide the reason for finding.",
@@ -51,6 +56,9 @@ CASE_CONSTANT = {
         "enter_person_name": "请输入您要寻找的人的姓名：",
         "relationship": "您与该人的关系：",
         "upload_photo": "上传清晰的人物照片：",
+        "photo_upload_failed": "❌ 无法上传您的照片。请重新发送。",
+        "photo_upload_failed_notice": "❌ 无法上传您的照片。提交案件前会请您重新发送。",
+        "photo_upload_pending": "⏳ 您的照片仍在上传中，请稍后再次确认。",
         "last_seen_location": "请输入最后出现的位置（省份）：",
         "sex": "性别（男/女）：",
         "age": "年龄：",
@@ -70,6 +78,8 @@ CASE_CONSTANT = {
         "transfer_successful": "转账成功。",
         "transfer_failed": "转账失败，请重试。",
         "transfer_error": "处理转账时发生错误，请重试。",
+        "transfer_queued": "⏳ 您的转账已提交，确认后会通知您。",
+        "transfer_already_queued": "⏳ 此案件的转账已提交，确认后会通知您。",
         "transfer_canceled": "转账已取消。",
         "invalid_confirmation": "无效的回复，请输入 'yes' 或 'no' 进行确认。",
         "enter_reason_for_finding": "请提供寻找的原因。",
@@ -90,6 +100,9 @@ CASE_CONSTANT = {
         "enter_person_name": "Masukkan nama orang yang anda cari:",
         "relationship": "Apakah hubungan anda dengan orang itu? (cth: Rakan, Keluarga, Pasangan, dsb.):",
         "upload_photo": "Muat naik gambar jelas orang itu (maks. 5 MB):",
+        "photo_upload_failed": "❌ Kami tidak dapat memuat naik gambar anda. Sila hantar semula.",
+        "photo_upload_failed_notice": "❌ Kami tidak dapat memuat naik gambar anda. Anda akan diminta menghantarnya semula sebelum kes dihantar.",
+        "photo_upload_pending": "⏳ Foto anda masih dimuat naik. Sila sahkan semula sebentar lagi.",
         "last_seen_location": "Di manakah lokasi terakhir orang ini dilihat?",
         "sex": "Apakah jantina orang itu? (Lelaki/Perempuan):",
         "age": "Apakah umur orang itu?",
@@ -109,6 +122,8 @@ CASE_CONSTANT = {
         "transfer_successful": "Pemindahan berjaya.",
         "transfer_failed": "Pemindahan gagal. Sila cuba lagi.",
         "transfer_error": "Ralat berlaku semasa memproses pemindahan. Sila cuba lagi.",
+        "transfer_queued": "⏳ Pemindahan anda telah dihantar. Anda akan dimaklumkan sebaik sahaja ia disahkan.",
+        "transfer_already_queued": "⏳ Pemindahan kes ini telah pun dihantar. Anda akan dimaklumkan sebaik sahaja ia disahkan.",
         "transfer_canceled": "Pemindahan telah dibatalkan.",
         "invalid_confirmation": "Jawapan tidak sah. Sila sahkan dengan 'yes' atau 'no'.",
         "enter_reason_for_finding": "Sila berikan sebab mencari.",
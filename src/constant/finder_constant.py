@@ -25,8 +25,12 @@ FINDER_CONSTANT = {
         "error_sending_notification": "❌ Error sending notification. Please try again later.",
         "proof_upload": "Please upload photo/video proof:",
         "error_processing_proof": "❌ Error processing your proof. Please try again.",
+        "proof_upload_failed": "❌ We could not upload your proof. You will be asked to send it again before your request is submitted.",
+        "proof_upload_resend": "❌ We could not upload your proof. Please send it again.",
+        "proof_upload_pending": "⏳ Your proof is still uploading. Please confirm again in a moment.",
         "case_not_found": "❌ Case not found.",
         "proof_received": "✅ Proof received. \n \n  Please enter the location where you found this person:",
+        "proof_received_confirm": "✅ Proof received. Please confirm your request again.",
         "error_upload_proof": "❌ Please upload a photo or video.",
         "no_case_selected": "Error: No case selected. Please start over.",
         "error_loading_case": "Error loading case details, Please try again.",
@@ -70,8 +74,12 @@ FINDER_CONSTANT = {
         "error_sending_notification": "❌ 发送通知时出错。请稍后再试。",
         "proof_upload": "请上传照片/视频证据：",
         "error_processing_proof": "❌ 处理您的证据时出错。请重试。",
+        "proof_upload_failed": "❌ 无法上传您的证据。提交请求前会请您重新发送。",
+        "proof_upload_resend": "❌ 无法上传您的证据。请重新发送。",
+        "proof_upload_pending": "⏳ 您的证据仍在上传中，请稍后再次确认。",
         "case_not_found": "❌ 未找到案件。",
         "proof_received": "✅ 证据已收到。\n\n请输入您发现此人的位置：",
+        "proof_received_confirm": "✅ 证据已收到。请再次确认您的请求。",
         "error_upload_proof": "❌ 请上传照片或视频。",
         "no_case_selected": "错误: 未选择案件。请重新开始。",
         "error_loading_case": "加载案件详情时出错，请重试。",
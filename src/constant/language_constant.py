@@ -1,3 +1,8 @@
+import re
+from string import Formatter
+from types import MappingProxyType
+from typing import List
+
 from constant.case_constant import CASE_CONSTANT
 from constant.finder_constant import FINDER_CONSTANT
 from constant.settings_constant import SETTINGS_CONSTANT
@@ -5,6 +10,8 @@ from constant.start_constant import START_LANG_DATA
 from constant.wallet_constant import WALLET_LANG_DATA
 from constant.wallet_menu_constant import WALLET_MENU_CONSTANT
 from constant.listing_constant import LISTING_CONSTANT
+from services.user_service import get_cached_user_lang
+from utils.logger import logger
 
 
 def merge_lang_data(lang_data, *new_constants):
@@ -17,7 +24,8 @@ def merge_lang_data(lang_data, *new_constants):
     return lang_data
 
 
-LANG_DATA = merge_lang_data(
+# The translated keys of every language, before the English fallback
+TRANSLATIONS = merge_lang_data(
     START_LANG_DATA,
     WALLET_LANG_DATA,
     SETTINGS_CONSTANT,
@@ -29,14 +37,149 @@ LANG_DATA = merge_lang_data(
 
 USDT_MINT_ADDRESS = "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB"
 
+DEFAULT_LANG = "en"
+
+
+def template_fields(text) -> frozenset:
+    """The placeholders of a format template, positional ones as "0", "1", ..."""
+    if not isinstance(text, str):
+        return frozenset()
+    fields, auto = set(), 0
+    for _, name, _, _ in Formatter().parse(text):
+        if name is None:
+            continue
+        if name == "":
+            name, auto = str(auto), auto + 1
+        # Only the argument matters, not the attribute or index used on it
+        fields.add(re.split(r"[.\[]", name, maxsplit=1)[0])
+    return frozenset(fields)
+
+
+def compile_template(text):
+    """
+    Pre-parse a format template into the equivalent printf-style template,
+    which formats faster: "Page {page}" gives "Page %(page)s".
+
+    :return: The template, or None for a text without placeholders or with
+        other than plain named ones (positional fields, attributes,
+        conversions or format specs), which str.format handles.
+    """
+    if not isinstance(text, str):
+        return None
+    parts, named = [], False
+    try:
+        for literal, name, spec, conversion in Formatter().parse(text):
+            parts.append(literal.replace("%", "%%"))
+            if name is None:
+                continue
+            if spec or conversion or not name.isidentifier():
+                return None
+            parts.append(f"%({name})s")
+            named = True
+    except ValueError:
+        # Not a valid template, e.g. a lone "}"
+        return None
+    return "".join(parts) if named else None
+
+
+def compile_catalog(lang_data: dict):
+    """
+    Freeze the merged catalogs into one read-only table per language.
+
+    Every table holds all the English keys, a missing translation falls back
+    to the English text. Every template is parsed once.
+
+    :return: The read-only tables by language, and the (texts, templates)
+        dicts by language used by get_text, templates holding the compiled
+        template of the keys that have one.
+    """
+    english = lang_data[DEFAULT_LANG]
+    catalog, tables = {}, {}
+    for lang, entries in lang_data.items():
+        table = {**english, **entries}
+        templates = {}
+        for key, text in table.items():
+            template = compile_template(text)
+            if template is not None:
+                templates[key] = template
+        catalog[lang] = MappingProxyType(table)
+        tables[lang] = (table, templates)
+    return MappingProxyType(catalog), tables
+
+
+CATALOG, _TABLES = compile_catalog(TRANSLATIONS)
+_DEFAULT_TABLE = _TABLES[DEFAULT_LANG]
+# Keep the name used by the handlers for the language buttons
+LANG_DATA = CATALOG
+
+
+def validate_catalog() -> List[str]:
+    """
+    Check the translations against the English catalog and log the problems:
+    keys missing in a language, and templates whose placeholders differ.
+
+    :return: The problems found.
+    """
+    english = CATALOG[DEFAULT_LANG]
+    problems = []
+    for lang, entries in TRANSLATIONS.items():
+        if lang == DEFAULT_LANG:
+            continue
+        missing = set(english) - set(entries)
+        if missing:
+            problems.append(
+                f"'{lang}' falls back to English for {len(missing)} keys: "
+                f"{', '.join(sorted(missing))}"
+            )
+        for key, text in entries.items():
+            if key not in english:
+                problems.append(f"'{lang}' has key '{key}' that English does not")
+                continue
+            expected = template_fields(english[key])
+            actual = template_fields(text)
+            if actual != expected:
+                problems.append(
+                    f"'{lang}.{key}' placeholders {sorted(actual)} differ from "
+                    f"English {sorted(expected)}"
+                )
+
+    for problem in problems:
+        logger.warning(f"Localization: {problem}")
+    if not problems:
+        logger.info(f"Localization catalog of {len(CATALOG)} languages is consistent")
+    return problems
+
+
+def get_lang(user_id) -> str:
+    """The catalog language of a user, English when unknown."""
+    # The language is cached by the load_user_lang handler and save_user_lang
+    lang = get_cached_user_lang(user_id)
+    return lang if lang in _TABLES else DEFAULT_LANG
 
-user_data_store = {}
 
+def get_text(user_id, key, /, *args, **kwargs):
+    """
+    Get the localized text for a given key based on user language.
 
-def get_text(user_id, key):
-    """Get the localized text for a given key based on user language."""
-    lang = user_data_store.get(user_id, {}).get("lang", "en")
-    return LANG_DATA.get(lang, LANG_DATA["en"]).get(key, f"Undefined text for {key}")
+    With arguments, the text is formatted with them, so
+    get_text(user_id, "city_multi", page=1, total=3) replaces
+    get_text(user_id, "city_multi").format(page=1, total=3).
+    """
+    texts, templates = _TABLES.get(get_cached_user_lang(user_id), _DEFAULT_TABLE)
+    text = texts.get(key)
+    if text is None:
+        logger.warning(f"Undefined text for {key}")
+        return f"Undefined text for {key}"
+    if not (args or kwargs):
+        return text
+    try:
+        template = None if args else templates.get(key)
+        if template is not None:
+            return template % kwargs
+        return text.format(*args, **kwargs)
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError) as e:
+        logger.error(f"Could not format text '{key}' in '{get_lang(user_id)}': {e}")
+        return text
 
 
 # def get_text(user_id, key, **kwargs):
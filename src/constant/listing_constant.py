@@ -46,8 +46,12 @@ LISTING_CONSTANT = {
             "📏 **Height:** {height} cm\n"
         ),
         "invalid_reward_amount": "❌ Invalid reward amount. Maximum reward amount is {max_amount}.",
-        "reward_success": "✅ Reward successfully sent to finder {finder_id}.",
+        "reward_success": "✅ Reward of {amount} successfully sent to finder {finder_id}.",
         "error_transferring_reward": "❌ An error occurred while transferring reward.",
+        "reward_transfer_queued": "⏳ Sending {amount} to finder {finder_id}. You will be notified once the transfer is confirmed.",
+        "reward_payout_pending": "⏳ The reward of this case is already being sent. You will be notified once the transfer is confirmed.",
+        "reward_payout_retrying": "⏳ Part of the reward transfer failed and is being sent again. You will be notified once it is confirmed.",
+        "reward_payout_stuck": "❌ Part of the reward could not be sent after several attempts. Our team has been notified and will complete it.",
         "case_or_finder_not_found": "❌ Case or finder not found.",
         "no_finders_for_case": "❌ No finders found for this case.",
         "finder_list_header": "👤 **Finders for this case:**",
@@ -132,12 +136,16 @@ LISTING_CONSTANT = {
         "invalid_reward_amount": "❌ 无效的奖励金额。最大奖励金额为 {max_amount}。",
         "reward_success": "✅ 已成功向查找者 {finder_id} 发送 {amount} 奖励。",
         "error_transferring_reward": "❌ 发送奖励时出错。",
+        "reward_transfer_queued": "⏳ 正在向查找者 {finder_id} 发送 {amount} 奖励，转账确认后会通知您。",
+        "reward_payout_pending": "⏳ 此案件的奖励正在发送中，转账确认后会通知您。",
+        "reward_payout_retrying": "⏳ 部分奖励转账失败，正在重新发送，确认后会通知您。",
+        "reward_payout_stuck": "❌ 部分奖励多次发送失败，我们的团队已收到通知并将完成发送。",
         "case_or_finder_not_found": "❌ 未找到案例或查找者。",
         "no_finders_for_case": "❌ 未找到此案例的查找者。",
         "finder_list_header": "👤 **此案例的查找者：**",
         "reward_this_finder": "💰 奖励此查找者",
         "enter_reward_amount": "✏️ 请输入此案例的奖励金额（最大 {max_amount}）：",
-        "reward_confirmation": "您确定要向查找者 ID {finder_id} 发送 {amount} 奖励吗？",
+        "reward_confirmation": "您确定要为案例 {case_no} 向查找者 ID {finder_id} 发送 {amount} 奖励吗？",
         "reward_cancelled": "奖励过程已取消。",
         "confirm_button": "✅ 确认",
         "cancel_button": "❌ 取消",
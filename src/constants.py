@@ -3,8 +3,6 @@ from telegram.ext import (
 )
 
 from enum import Enum
-from solana.rpc.api import Client
-from config.config_manager import CLIENT
 
 
 class State(Enum):
@@ -234,10 +232,4 @@ DUMMY_DATA = {
 
 
 WALLETS_DIR = "wallets"  # Directory to store user wallets
-PHOTOS_DIR = "photos"  # Directory to store uploaded photos
-PROOFS_DIR = "proofs"  # Directory to store proof uploads
 USDT_CONTRACT = "TXLAQ63Xg1NAzckPwKHvzw7CSEmLMEqcdj"
-
-# ====================== Solana ======================
-
-solana_client = Client(CLIENT)
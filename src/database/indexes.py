@@ -0,0 +1,123 @@
+from datetime import datetime
+from typing import List, Optional, Tuple, Type
+
+from beanie import Document
+from bson import ObjectId
+
+from models.case_model import Case, CaseStatus
+from models.extend_reward_model import ExtendReward, ExtendRewardStatus
+from models.finder_model import Finder, FinderStatus
+from models.history_model import HistoryCursor, HistoryEntry
+from models.mobile_number_model import MobileNumber
+from models.session_model import Session
+from models.transfer_model import Transfer, TransferStatus
+from models.user_model import User
+from models.wallet_model import Wallet
+from utils.logger import logger
+
+# Filters issued by the handlers, with placeholder values. The winning plan
+# only depends on the shape of the query, not on the values.
+HOT_QUERIES: List[Tuple[str, Type[Document], dict, Optional[list]]] = [
+    (
+        "listing page",
+        Case,
+        {"status": CaseStatus.ADVERTISE.value, "deleted": False},
+        [("created_at", -1), ("_id", -1)],
+    ),
+    (
+        "province listing page",
+        Case,
+        {"last_seen_location": "", "status": CaseStatus.ADVERTISE.value},
+        [("created_at", -1), ("_id", -1)],
+    ),
+    ("drafted case", Case, {"user_id": 0, "status": CaseStatus.DRAFT.value}, None),
+    ("drafted finder", Finder, {"user_id": 0, "status": FinderStatus.DRAFT.value}, None),
+    (
+        "finders of case",
+        Finder,
+        {"case.$id": ObjectId(), "status": FinderStatus.FIND.value},
+        None,
+    ),
+    (
+        "pending extension of case",
+        ExtendReward,
+        {"case.$id": ObjectId(), "status": ExtendRewardStatus.PENDING.value},
+        None,
+    ),
+    (
+        "user wallets",
+        Wallet,
+        {"user_id": 0, "wallet_type": "SOL", "deleted": False},
+        None,
+    ),
+    ("wallet by address", Wallet, {"public_key": ""}, None),
+    ("mobile number", MobileNumber, {"number": ""}, None),
+    ("user mobiles", MobileNumber, {"user.$id": ObjectId()}, None),
+    ("user by telegram id", User, {"tl_id": 0}, None),
+    ("recently active users", User, {}, [("updated_at", -1)]),
+    (
+        "user session",
+        Session,
+        {"user_id": 0, "expires_at": {"$gt": datetime.utcnow()}},
+        None,
+    ),
+    (
+        "due transfers",
+        Transfer,
+        {
+            "status": {"$in": [TransferStatus.PENDING.value, TransferStatus.SENT.value]},
+            "next_attempt_at": {"$lte": datetime.utcnow()},
+        },
+        [("next_attempt_at", 1)],
+    ),
+    ("transfer group", Transfer, {"group": ""}, [("key", 1)]),
+    (
+        "wallet history",
+        HistoryEntry,
+        {"address": "", "chain": "SOL"},
+        [("block_time", -1)],
+    ),
+    ("history cursor", HistoryCursor, {"address": "", "chain": "SOL"}, None),
+]
+
+
+def _plan_stages(plan: dict) -> List[str]:
+    """Collect the stage names of an explain() plan tree."""
+    stages = [plan.get("stage", "")]
+    if "inputStage" in plan:
+        stages += _plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return stages
+
+
+async def report_collection_scans() -> List[str]:
+    """
+    Explain every hot query and log the ones that fall back to a collection scan.
+
+    :return: The names of the queries whose winning plan contains a COLLSCAN.
+    """
+    scans = []
+    for name, model, query, sort in HOT_QUERIES:
+        cursor = model.get_motor_collection().find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            explain = await cursor.explain()
+        except Exception as e:
+            logger.warning(f"Could not explain '{name}' query: {e}")
+            continue
+
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        # Newer servers wrap the classic plan in queryPlan
+        stages = _plan_stages(winning_plan.get("queryPlan", winning_plan))
+        if "COLLSCAN" in stages:
+            scans.append(name)
+            logger.warning(
+                f"Query '{name}' on {model.get_collection_name()} does a "
+                f"collection scan: {query}"
+            )
+
+    if not scans:
+        logger.info(f"All {len(HOT_QUERIES)} hot queries are served by an index")
+    return scans
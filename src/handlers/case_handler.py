@@ -1,6 +1,8 @@
+from io import BytesIO
 import re
+from typing import Optional
+from bson import ObjectId
 from config.config_manager import (
-    CLIENT,
     OWNER_TELEGRAM_ID,
     STAKE_WALLET_PUBLIC_KEY,
     TRON_WALLET_PRIVATE_KEY,
@@ -8,7 +10,7 @@ from config.config_manager import (
 )
 from constant.language_constant import get_text
 from models.case_model import Case, CaseStatus
-import os
+from models.transfer_model import TransferStatus
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import (
     ContextTypes,
@@ -20,20 +22,27 @@ from constants import (
 )
 
 from models.mobile_number_model import MobileNumber
-from services.case_service import update_or_create_case
+from services.case_draft_service import CaseDraftService
+from services.case_service import (
+    set_case_status,
+    start_case_transfer,
+    update_or_create_case,
+)
 from services.otp_service import send_otp, verify_otp
+from services.upload_service import UploadService
 from services.wallet_service import WalletService
 from utils.error_wrapper import catch_async
 from utils.twilio import generate_tac
 from utils.wallet import load_user_wallet
-from utils.cloudinary import upload_image
-from solana.rpc.api import Client
 from models.wallet_model import Wallet
-from services.user_service import get_user_mobiles, save_user_mobiles, validate_mobile
+from services.user_service import (
+    get_user_lang,
+    get_user_mobiles,
+    save_user_mobiles,
+    validate_mobile,
+)
 from services.tron_wallet_service import TronWallet
-
-client = Client(CLIENT)
-
+from services.transfer_outbox import TransferOutbox
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
@@ -48,8 +57,9 @@ async def handle_name(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
     """Handle the user's name input."""
     user_id = update.effective_user.id
     name = update.message.text.strip()
-    await update_or_create_case(user_id, name=name)
-    context.user_data["case"] = {"name": name}
+    await CaseDraftService.recover(context, user_id)
+    CaseDraftService.stage(context, user_id, name=name)
+    context.user_data["case"] = {**(context.user_data.get("case") or {}), "name": name}
 
     # Check if the user has existing mobile numbers
     existing_mobiles = await get_user_mobiles(user_id)
@@ -165,7 +175,7 @@ async def handle_tac(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         await update.message.reply_text(get_text(user_id, "tac_verified"))
 
         # After TAC verification, update the case with the mobile reference
-        await update_or_create_case(user_id, mobile=selected_number)
+        CaseDraftService.stage(context, user_id, mobile=selected_number)
 
         # Proceed to the next step
         await show_disclaimer_2(update, context)
@@ -217,7 +227,7 @@ async def handle_person_name(update: Update, context: ContextTypes.DEFAULT_TYPE)
     """Handle input for the person's name (the case target)."""
     user_id = update.effective_user.id
     person_name = update.message.text.strip()
-    await update_or_create_case(user_id, person_name=person_name)
+    CaseDraftService.stage(context, user_id, person_name=person_name)
     context.user_data["case"]["person_name"] = person_name
     logger.info(f"User {user_id} entered person name: {person_name}")
     await update.message.reply_text(get_text(user_id, "relationship"))
@@ -230,7 +240,7 @@ async def handle_relationship(
     """Handle input for relationship detail."""
     user_id = update.effective_user.id
     relationship = update.message.text.strip()
-    await update_or_create_case(user_id, relationship=relationship)
+    CaseDraftService.stage(context, user_id, relationship=relationship)
     context.user_data["case"]["relationship"] = relationship
     logger.info(f"User {user_id} entered relationship: {relationship}")
 
@@ -250,30 +260,44 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
     # Get the highest quality photo from the list (the last element)
     photo_file = await update.message.photo[-1].get_file()
 
-    # Define the absolute path for the photos directory
-    photo_dir = os.path.join(os.getcwd(), "photos")
+    # Download the photo into memory, it is uploaded straight from the buffer
+    photo_buffer = BytesIO()
+    await photo_file.download_to_memory(photo_buffer)
+    logger.info(f"Downloaded {photo_buffer.tell()} bytes of photo for user {user_id}")
 
-    # Create the directory if it doesn't exist
-    os.makedirs(photo_dir, exist_ok=True)
-
-    # Define the path to save the photo
-    photo_path = os.path.join(photo_dir, f"{user_id}_photo.jpg")
+    # Milestone: write the buffered fields so the upload can attach to the case
+    case = await CaseDraftService.flush(context, user_id) or await update_or_create_case(
+        user_id
+    )
 
-    # Debug log for the path
-    logger.info(f"Saving photo at path: {photo_path}")
+    async def on_uploaded(url: str):
+        logger.info(f"Uploaded Photo URL: {url}")
+        await UploadService.attach_case_photo(case.id)(url)
+        # Store URL instead of local path
+        context.user_data.setdefault("case", {})["photo_url"] = url
 
-    # Download the photo to the server
-    await photo_file.download_to_drive(photo_path)
+    async def on_failed(error: Exception):
+        # The wizard has moved on, the photo is asked again at the confirmation
+        await context.bot.send_message(
+            user_id, get_text(user_id, "photo_upload_failed_notice")
+        )
 
-    # Upload the photo to Cloudinary
-    upload_result = await upload_image(photo_path)
-    if upload_result:
-        logger.info(f"Uploaded Photo URL: {upload_result}")
+    # Upload in the background, the wizard goes on meanwhile; the transfer
+    # confirmation waits for it
+    await UploadService.submit(
+        photo_buffer,
+        on_complete=on_uploaded,
+        on_failure=on_failed,
+        key=("case_photo", case.id),
+    )
 
-        await update_or_create_case(user_id, case_photo=upload_result)
-        context.user_data["case"][
-            "photo_url"
-        ] = upload_result  # Store URL instead of local path
+    if context.user_data.pop("photo_retry", False):
+        # Sent again after the first upload failed, back to the confirmation
+        await update.message.reply_text(
+            get_text(user_id, "reward_amount_confirmed", case.reward),
+            reply_markup=transfer_confirmation_keyboard(),
+        )
+        return State.CREATE_CASE_CONFIRM_TRANSFER
 
     # Move to the next step (e.g., last seen location)
     await update.message.reply_text(get_text(user_id, "last_seen_location"))
@@ -286,7 +310,7 @@ async def handle_last_seen_location(
     """Handle input for last seen location."""
     user_id = update.effective_user.id
     location = update.message.text.strip()
-    await update_or_create_case(user_id, last_seen_location=location)
+    CaseDraftService.stage(context, user_id, last_seen_location=location)
     context.user_data["case"]["last_seen_location"] = location
     logger.info(f"User {user_id} entered last seen location: {location}")
 
@@ -312,7 +336,7 @@ async def handle_sex(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     await query.answer()
     user_id = query.from_user.id
     sex = query.data
-    await update_or_create_case(user_id, gender=sex)
+    CaseDraftService.stage(context, user_id, gender=sex)
     context.user_data["case"]["sex"] = sex
     logger.info(f"User {user_id} selected sex: {sex}")
     await query.edit_message_text(get_text(user_id, "age"))
@@ -328,7 +352,7 @@ async def handle_age(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         await update.message.reply_text("Please enter a valid number for age.")
         return State.CREATE_CASE_AGE
 
-    await update_or_create_case(user_id, age=age)
+    CaseDraftService.stage(context, user_id, age=age)
     context.user_data["case"]["age"] = age
     logger.info(f"User {user_id} entered age: {age}")
     await update.message.reply_text(get_text(user_id, "hair_color"))
@@ -339,7 +363,7 @@ async def handle_hair_color(update: Update, context: ContextTypes.DEFAULT_TYPE)
     """Handle input for hair color."""
     user_id = update.effective_user.id
     hair_color = update.message.text.strip()
-    await update_or_create_case(user_id, hair_color=hair_color)
+    CaseDraftService.stage(context, user_id, hair_color=hair_color)
     context.user_data["case"]["hair_color"] = hair_color
     logger.info(f"User {user_id} entered hair color: {hair_color}")
     await update.message.reply_text(get_text(user_id, "eye_color"))
@@ -350,7 +374,7 @@ async def handle_eye_color(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     """Handle input for eye color."""
     user_id = update.effective_user.id
     eye_color = update.message.text.strip()
-    await update_or_create_case(user_id, eye_color=eye_color)
+    CaseDraftService.stage(context, user_id, eye_color=eye_color)
     context.user_data["case"]["eye_color"] = eye_color
     logger.info(f"User {user_id} entered eye color: {eye_color}")
     await update.message.reply_text(get_text(user_id, "height"))
@@ -366,7 +390,7 @@ async def handle_height(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
         await update.message.reply_text("Please enter a valid number for height.")
         return State.CREATE_CASE_HEIGHT
 
-    await update_or_create_case(user_id, height=height)
+    CaseDraftService.stage(context, user_id, height=height)
     context.user_data["case"]["height"] = height
     logger.info(f"User {user_id} entered height: {height}")
     await update.message.reply_text(get_text(user_id, "weight"))
@@ -382,7 +406,7 @@ async def handle_weight(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
         await update.message.reply_text("Please enter a valid number for weight.")
         return State.CREATE_CASE_WEIGHT
 
-    await update_or_create_case(user_id, weight=weight)
+    CaseDraftService.stage(context, user_id, weight=weight)
     context.user_data["case"]["weight"] = weight
     logger.info(f"User {user_id} entered weight: {weight}")
     await update.message.reply_text(get_text(user_id, "distinctive_features"))
@@ -396,7 +420,7 @@ async def handle_distinctive_features(
     user_id = update.effective_user.id
     features = update.message.text.strip()
 
-    await update_or_create_case(user_id, distinctive_features=features)
+    CaseDraftService.stage(context, user_id, distinctive_features=features)
     context.user_data["case"]["distinctive_features"] = features
     logger.info(f"User {user_id} entered distinctive features: {features}")
     await update.message.reply_text(get_text(user_id, "reason_for_finding"))
@@ -411,23 +435,17 @@ async def handle_reason_for_finding(
     user_id = update.effective_user.id
     reason = update.message.text.strip()
 
-    # Fetch the case for the user
-    case = await Case.find_one(
-        {"user_id": user_id, "status": CaseStatus.DRAFT}, fetch_links=True
-    )
+    # Milestone: write the buffered wizard fields together with the reason
+    case = await CaseDraftService.flush(context, user_id, reason=reason)
 
-    if not case:
+    if not case or not case.wallet:
         await update.message.reply_text(get_text(user_id, "case_not_found"))
         return State.END
 
-    # Store reason in case and ask for reward amount
-    case.reason = reason
-    await case.save()
-
     print(f"Case: {case}")
 
     # Ask for reward amount based on the wallet type (SOL or USDT)
-    wallet = case.wallet
+    wallet = await case.wallet.fetch()
     if wallet.wallet_type == "SOL":
         await update.message.reply_text(get_text(user_id, "enter_reward_amount_sol"))
     elif wallet.wallet_type == "USDT":
@@ -469,35 +487,56 @@ async def handle_ask_reward_amount(
     # Check if the reward amount is greater than available balance
     if reward_amount < 0:
         await update.message.reply_text(
-            get_text(user_id, "reward_amount_negative").format(reward_amount)
+            get_text(user_id, "reward_amount_negative", reward_amount)
         )
         return State.CREATE_CASE_ASK_REWARD
 
     if wallet_balance < reward_amount:
         await update.message.reply_text(
-            get_text(user_id, "insufficient_balance").format(wallet_balance)
+            get_text(user_id, "insufficient_balance", wallet_balance)
         )
         await update.message.reply_text(get_text(user_id, "refresh_wallet_balance"))
         return State.CREATE_CASE_ASK_REWARD
 
     # If balance is sufficient, save the reward amount in the case
-    case.reward = reward_amount
-    await case.save()
+    await CaseDraftService.flush(context, user_id, reward=reward_amount)
 
     # Confirm the reward amount and proceed with a button
     await update.message.reply_text(
-        get_text(user_id, "reward_amount_confirmed").format(reward_amount),
-        reply_markup=InlineKeyboardMarkup(
+        get_text(user_id, "reward_amount_confirmed", reward_amount),
+        reply_markup=transfer_confirmation_keyboard(),
+    )
+
+    return State.CREATE_CASE_CONFIRM_TRANSFER
+
+
+def transfer_confirmation_keyboard() -> InlineKeyboardMarkup:
+    """The buttons confirming or canceling the reward transfer of a new case."""
+    return InlineKeyboardMarkup(
+        [
             [
-                [
-                    InlineKeyboardButton("Confirm", callback_data="confirm_transfer"),
-                    InlineKeyboardButton("Cancel", callback_data="cancel_transfer"),
-                ]
+                InlineKeyboardButton("Confirm", callback_data="confirm_transfer"),
+                InlineKeyboardButton("Cancel", callback_data="cancel_transfer"),
             ]
-        ),
+        ]
     )
 
-    return State.CREATE_CASE_CONFIRM_TRANSFER
+
+async def wait_for_case_photo(case: Case) -> Optional[bool]:
+    """
+    Wait for the photo upload of a case to finish.
+
+    :return: True if the case has its photo, False if the upload failed (or
+        never happened), None if it is still running.
+    """
+    if case.case_photo:
+        return True
+    if not await UploadService.wait(("case_photo", case.id)):
+        return None
+    stored = await Case.get_motor_collection().find_one(
+        {"_id": case.id}, {"case_photo": 1}
+    )
+    return bool(stored and stored.get("case_photo"))
 
 
 @catch_async
@@ -511,9 +550,15 @@ async def handle_transfer_confirmation(
 
     # Fetch the case to retrieve reward amount and wallet info
     print("Calling in handle transfer confirmation")
+    await CaseDraftService.flush(context, user_id)
     case = await Case.find_one(
         {"user_id": user_id, "status": CaseStatus.DRAFT}, fetch_links=True
     )
+    if case is None:
+        # The draft left the drafts when its transfer was queued
+        await query.answer()
+        await query.edit_message_text(get_text(user_id, "transfer_already_queued"))
+        return State.END
     print(case)
     wallet = case.wallet
     reward_amount = case.reward
@@ -524,6 +569,21 @@ async def handle_transfer_confirmation(
     print(f"Wallet Type: {wallet_type}")
 
     if user_input == "confirm_transfer":
+        # The case is only published with its photo
+        has_photo = await wait_for_case_photo(case)
+        if has_photo is None:
+            await query.answer()
+            await query.edit_message_text(
+                get_text(user_id, "photo_upload_pending"),
+                reply_markup=transfer_confirmation_keyboard(),
+            )
+            return State.CREATE_CASE_CONFIRM_TRANSFER
+        if not has_photo:
+            context.user_data["photo_retry"] = True
+            await query.answer()
+            await query.edit_message_text(get_text(user_id, "photo_upload_failed"))
+            return State.CREATE_CASE_PHOTO
+
         # Proceed with the transfer
         try:
             # Check if wallet has sufficient balance
@@ -538,73 +598,61 @@ async def handle_transfer_confirmation(
             if wallet.wallet_type in ["USDT", "TRX"] and wallet_balance < reward_amount:
                 await query.answer()
                 await query.edit_message_text(
-                    get_text(user_id, "insufficient_balance_for_transfer").format(
-                        wallet_balance=wallet_balance,
-                        reward_amount=reward_amount,
-                        wallet_type=wallet_type,
+                    get_text(
+                        user_id, "insufficient_balance_for_transfer", wallet_balance
                     )
                 )
                 return State.CREATE_CASE_CONFIRM_TRANSFER
 
-            # Transfer the reward (this is just a placeholder, you need to implement transfer logic)
-            transfer_success = False
+            # Out of the drafts while it is paid, so a new draft cannot
+            # overwrite it and a second confirmation cannot pay it again
+            attempt = await start_case_transfer(
+                case.id, CaseStatus.DRAFT, CaseStatus.PAYMENT_PENDING
+            )
+            if attempt is None:
+                await query.answer()
+                await query.edit_message_text(
+                    get_text(user_id, "transfer_already_queued")
+                )
+                return State.END
+
+            # Queue the transfer, the outbox sends and confirms it
             print(f"Transfer to owner: {wallet.public_key}")
             print(f"Reward amount: {reward_amount}")
-
-            transfer_success = (
-                await WalletService.send_sol(
-                    wallet.private_key, STAKE_WALLET_PUBLIC_KEY, reward_amount
+            try:
+                queued = await TransferOutbox.enqueue(
+                    f"advertise:{case.id}:{attempt}",
+                    {
+                        "reward": {
+                            "chain": wallet_type,
+                            "recipient": (
+                                STAKE_WALLET_PUBLIC_KEY
+                                if wallet_type == "SOL"
+                                else TRON_WALLET_PUBLIC_KEY
+                            ),
+                            "amount": reward_amount,
+                            "sender_wallet": wallet,
+                        }
+                    },
+                    context={"user_id": user_id, "case_id": str(case.id)},
                 )
-                if wallet.wallet_type == "SOL"
-                else await TronWallet.transfer_usdt(
-                    wallet.private_key, TRON_WALLET_PUBLIC_KEY, reward_amount
+            except Exception:
+                # Nothing was queued, the case can be confirmed again
+                await set_case_status(
+                    case.id, CaseStatus.DRAFT, CaseStatus.PAYMENT_PENDING
                 )
-            )
+                raise
 
-            print("Getting the balance of the wallet")
-            print(f"Transfer_success: {transfer_success}")
-
-            print(f"Debug No: 1", transfer_success)
-            if transfer_success:
-                # Notify the advertiser
-                advertiser_message = (
-                    f"🎉 Congratulations! Your advertisement has been successfully processed.\n\n"
-                    f"Case ID: {case.id}\n"
-                    f"Reward Amount: {reward_amount} {wallet_type}\n"
-                    f"Wallet Type: {wallet_type}\n\n"
-                    f"Thank you for choosing our platform!"
-                )
-                await query.message.reply_text(advertiser_message)
-
-                print(f"Debug No: 2")
-
-                # Notify the owner
-                owner_message = (
-                    f"📢 **New Advertisement Notification**\n\n"
-                    f"🎯 **A new case has been successfully advertised!**\n\n"
-                    f"🆔 **Advertiser ID:** {user_id}\n"
-                    f"📄 **Case ID:** {case.id}\n"
-                    f"💰 **Reward Amount:** {reward_amount} {wallet_type}\n"
-                    f"🔒 **Wallet Type:** {wallet_type}\n\n"
-                    f"✅ **The funds have been securely transferred.**\n"
-                    f"📋 Use `/listing` to view all available cases."
-                )
+            # Clear user data
+            context.user_data["case"] = None
 
-                await context.bot.send_message(
-                    chat_id=OWNER_TELEGRAM_ID, text=owner_message
+            await query.answer()
+            await query.edit_message_text(
+                get_text(
+                    user_id, "transfer_queued" if queued else "transfer_already_queued"
                 )
-
-                # Update case status
-                case.status = CaseStatus.ADVERTISE
-                await case.save()
-
-                # Clear user data
-                context.user_data["case"] = None
-
-                return State.END
-            else:
-                await query.answer()
-                await query.edit_message_text(get_text(user_id, "transfer_failed"))
+            )
+            return State.END
         except Exception as e:
             print(f"Transfer failed: {e}")
             await query.answer()
@@ -621,6 +669,48 @@ async def handle_transfer_confirmation(
         return State.CREATE_CASE_CONFIRM_TRANSFER
 
 
+@TransferOutbox.on_settled("advertise")
+async def advertise_settled(bot, transfers, context: dict):
+    """Publish the case once its reward reached the stake wallet."""
+    user_id = context["user_id"]
+    # Runs outside an update, so the language is not cached by load_user_lang
+    await get_user_lang(user_id)
+    transfer = transfers[0]
+
+    case_id = ObjectId(context["case_id"])
+
+    if transfer.status != TransferStatus.CONFIRMED:
+        # Back to the drafts, confirming it again queues a new attempt
+        await set_case_status(case_id, CaseStatus.DRAFT, CaseStatus.PAYMENT_PENDING)
+        await bot.send_message(user_id, get_text(user_id, "transfer_failed"))
+        return
+
+    await set_case_status(case_id, CaseStatus.ADVERTISE, CaseStatus.PAYMENT_PENDING)
+
+    # Notify the advertiser
+    advertiser_message = (
+        f"🎉 Congratulations! Your advertisement has been successfully processed.\n\n"
+        f"Case ID: {context['case_id']}\n"
+        f"Reward Amount: {transfer.amount} {transfer.chain}\n"
+        f"Wallet Type: {transfer.chain}\n\n"
+        f"Thank you for choosing our platform!"
+    )
+    await bot.send_message(user_id, advertiser_message)
+
+    # Notify the owner
+    owner_message = (
+        f"📢 **New Advertisement Notification**\n\n"
+        f"🎯 **A new case has been successfully advertised!**\n\n"
+        f"🆔 **Advertiser ID:** {user_id}\n"
+        f"📄 **Case ID:** {context['case_id']}\n"
+        f"💰 **Reward Amount:** {transfer.amount} {transfer.chain}\n"
+        f"🔒 **Wallet Type:** {transfer.chain}\n\n"
+        f"✅ **The funds have been securely transferred.**\n"
+        f"📋 Use `/listing` to view all available cases."
+    )
+    await bot.send_message(chat_id=OWNER_TELEGRAM_ID, text=owner_message)
+
+
 # async def handle_case_finished(
 #     update: Update, context: ContextTypes.DEFAULT_TYPE
 # ) -> int:
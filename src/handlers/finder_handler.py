@@ -1,8 +1,8 @@
 from beanie import PydanticObjectId
 from bson import ObjectId
 import datetime
-import os
-import requests
+from io import BytesIO
+from typing import Optional
 import telegram
 
 from telegram.ext import (
@@ -11,63 +11,25 @@ from telegram.ext import (
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from config.config_manager import OWNER_TELEGRAM_ID
-from constant.language_constant import ITEMS_PER_PAGE
 from models.case_model import Case, CaseStatus
 from handlers.listing_handler import logger
 from models.extend_reward_model import ExtendReward, ExtendRewardStatus
-from models.finder_model import FinderStatus, RewardExtensionStatus
+from models.finder_model import Finder, FinderStatus, RewardExtensionStatus
 from models.wallet_model import Wallet
+from services.case_listing_service import CaseListingService
 from services.case_service import get_case_by_id
+from services.session_store import session_store
+from services.upload_service import UploadService
 from services.wallet_service import WalletService
-from utils.cloudinary import CloudinaryError, upload_image, upload_video
 from utils.error_wrapper import catch_async
 from utils.helper import paginate_list
+from utils.location_index import get_province_matches
 from utils.wallet import load_user_wallet
 from constants import State
-from constant.language_constant import get_text, user_data_store
+from constant.language_constant import get_text
 from services.finder_service import FinderService
 
 
-def get_provinces_for_country(country):
-    """
-    Fetch provinces/states for the given country using REST Countries API.
-    """
-    print(f"Country: {country}")
-    url = "https://countriesnow.space/api/v0.1/countries/states"
-    data = {"country": country}
-
-    response = requests.post(url, json=data)
-
-    if response.status_code == 200:
-        states = response.json()
-        print(f"states: {states["data"]["states"]}")
-        print([state["name"] for state in states["data"]["states"]])
-        return [state["name"] for state in states["data"]["states"]]
-    else:
-        print("Failed to fetch states:", response.status_code)
-        return []
-
-
-def get_province_matches(query, country):
-    """Geting the province match with query and inside the country which provided"""
-    query = query.lower()
-    provinces = get_provinces_for_country(country)
-    return [province for province in provinces if query in province.lower()]
-
-
-async def fetch_cases_by_province(location):
-    """
-    Fetch cases from the database based on the province.
-    """
-    # Implement this function
-    case = await Case.find(
-        {"last_seen_location": location, "status": CaseStatus.ADVERTISE}
-    ).to_list()
-    print(f"These are the cases for {location}: {case}")
-
-    return case
-
-
 async def fetch_case_by_number(case_no):
     """
     Fetch a case from the database based on the case number.
@@ -108,63 +70,11 @@ async def choose_province(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         )
         context.user_data["province"] = selected_province  # Save province in context
 
-        # Fetch cases from DB where last_seen_location matches province
-        cases = await Case.find(
-            {"last_seen_location": selected_province, "status": CaseStatus.ADVERTISE}
-        ).to_list()
-
-        if not cases:
-            await update.message.reply_text(
-                get_text(user_id, "no_case_found_in_province").format(
-                    province=selected_province
-                ),
-                parse_mode="Markdown",
-            )
-            return State.CHOOSE_PROVINCE
-
-        # Save case list in context for pagination
-        context.user_data["cases"] = cases
-        context.user_data["page"] = 1
-
-        # Paginate cases
-        paginated_cases, total_pages = paginate_list(cases, 1)
-
-        # Create keyboard buttons for cases
-        keyboard = [
-            [
-                InlineKeyboardButton(
-                    f"Case {case.case_no} - {case.person_name}",
-                    callback_data=f"case_{str(case.id)}",
-                )
-            ]
-            for case in paginated_cases
-        ]
-
-        # Add pagination buttons
-        navigation_buttons = []
-        if total_pages > 1:
-            navigation_buttons.append(
-                InlineKeyboardButton("⬅️ Previous", callback_data="case_page_previous")
-            )
-            navigation_buttons.append(
-                InlineKeyboardButton("➡️ Next", callback_data="case_page_next")
-            )
-        if navigation_buttons:
-            keyboard.append(navigation_buttons)
-
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        await update.message.reply_text(
-            f"📍 **Cases from {selected_province}:**",
-            reply_markup=reply_markup,
-            parse_mode="Markdown",
-        )
-        return State.CASE_DETAILS  # Transition to case details handling
+        return await show_advertisements(update, context)
 
     else:
         # If multiple matches, show province selection UI
-        user_data_store[user_id]["province_matches"] = matches
-        user_data_store[user_id]["province_page"] = 1
+        session_store.set(user_id, province_matches=matches, province_page=1)
         paginated, total = paginate_list(matches, 1)
         kb = []
         for p in paginated:
@@ -180,7 +90,7 @@ async def choose_province(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             )
         markup = InlineKeyboardMarkup(kb)
         await update.message.reply_text(
-            get_text(user_id, "province_multi").format(page=1, total=total),
+            get_text(user_id, "province_multi", page=1, total=total),
             reply_markup=markup,
             parse_mode="HTML",
         )
@@ -214,7 +124,7 @@ async def province_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
         except ValueError:
             page_num = 1
 
-        matches = user_data_store[user_id].get("province_matches", [])
+        matches = session_store.get_value(user_id, "province_matches", [])
         paginated, total = paginate_list(matches, page_num)
         kb = []
         for p in paginated:
@@ -234,12 +144,12 @@ async def province_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
         markup = InlineKeyboardMarkup(kb)
         await query.edit_message_text(
-            get_text(user_id, "province_multi").format(page=page_num, total=total),
+            get_text(user_id, "province_multi", page=page_num, total=total),
             reply_markup=markup,
             parse_mode="HTML",
         )
 
-        user_data_store[user_id]["province_page"] = page_num
+        session_store.set(user_id, province_page=page_num)
         return State.CHOOSE_PROVINCE
 
     else:
@@ -252,6 +162,15 @@ async def province_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
 # TODO: Why it has the seperate pagination function - Need to be fixe.
 
 
+CASE_PAGE_DIRECTIONS = {
+    "case_page_next": "next",
+    "case_page_previous": "previous",
+    "page_next": "next",
+    "page_previous": "previous",
+    "back_to_list": "current",
+}
+
+
 async def show_advertisements(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> int:
@@ -268,29 +187,30 @@ async def show_advertisements(
         return State.CHOOSE_PROVINCE
 
     try:
-        # Get current page from context
-        page = context.user_data.get("page", 1)  # Default to page 1
-        items_per_page = ITEMS_PER_PAGE
+        # Province selection starts a new listing, the buttons move the cursor
+        direction = CASE_PAGE_DIRECTIONS.get(query.data) if query else None
+        cursor = context.user_data.get("case_cursor") if direction else None
 
-        # Fetch cases from database
-        all_cases = await fetch_cases_by_province(province)
-        total_cases = len(all_cases)
+        listing = await CaseListingService.get_province_page(
+            province, cursor, direction or "next"
+        )
+        if not listing.items and cursor:
+            listing = await CaseListingService.get_province_page(province)
 
-        if not all_cases:
+        if not listing.items:
             await update.effective_message.reply_text(
-                get_text(user_id, "case_not_found_in_province")
+                get_text(user_id, "no_case_found_in_province", province=province),
+                parse_mode="Markdown",
             )
-            return State.END
+            return State.CHOOSE_PROVINCE
 
-        # Pagination calculations
-        total_pages = (total_cases + items_per_page - 1) // items_per_page
-        start_idx = (page - 1) * items_per_page
-        end_idx = start_idx + items_per_page
-        cases = all_cases[start_idx:end_idx]
+        context.user_data["case_cursor"] = listing.cursor
+        page = listing.page
 
         # Create case buttons
         keyboard = []
-        for case in cases:
+        for item in listing.items:
+            case = item.case
             case_info = f"Case #{case.case_no}: {case.person_name} ({case.age})"
             keyboard.append(
                 [InlineKeyboardButton(case_info, callback_data=f"case_{case.id}")]
@@ -298,22 +218,20 @@ async def show_advertisements(
 
         # Add pagination controls
         pagination_buttons = []
-        if page > 1:
+        if listing.has_previous:
             pagination_buttons.append(
-                InlineKeyboardButton(
-                    "⬅️ Previous", callback_data=f"case_page_{page - 1}"
-                )
+                InlineKeyboardButton("⬅️ Previous", callback_data="case_page_previous")
             )
-        if page < total_pages:
+        if listing.has_next:
             pagination_buttons.append(
-                InlineKeyboardButton("Next ➡️", callback_data=f"case_page_{page + 1}")
+                InlineKeyboardButton("Next ➡️", callback_data="case_page_next")
             )
 
         if pagination_buttons:
             keyboard.append(pagination_buttons)
 
         reply_markup = InlineKeyboardMarkup(keyboard)
-        text = f"Cases in {province} (Page {page} of {total_pages}):"
+        text = f"Cases in {province} (Page {page}):"
 
         if query:
             await query.edit_message_text(text, reply_markup=reply_markup)
@@ -333,25 +251,12 @@ async def show_advertisements(
 async def handle_pagination(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle pagination for case listings."""
     query = update.callback_query
-    await query.answer()
-    user_id = update.effective_user.id
-
-    # Extract page number from callback data
-    if query.data.startswith("case_page_"):
-        page_str = query.data.replace("case_page_", "")
-        try:
-            page = int(page_str)
-            if page < 1:
-                page = 1
-        except ValueError:
-            page = 1
-
-        # Save updated page in context
-        context.user_data["page"] = page
 
-        # Re-fetch and display cases for the updated page
+    if query.data in CASE_PAGE_DIRECTIONS:
+        # Move the stored cursor and display the neighbouring page
         return await show_advertisements(update, context)
 
+    await query.answer()
     return State.CASE_DETAILS
 
 
@@ -431,9 +336,6 @@ async def handle_proof(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
             await update.message.reply_text(get_text(user_id, "no_case_selected"))
             return State.END
 
-        # Ensure 'proofs' directory exists
-        os.makedirs("proofs", exist_ok=True)
-
         file_id = None
         file_extension = None
         file_size = None
@@ -478,34 +380,42 @@ async def handle_proof(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
                 )
                 return State.UPLOAD_PROOF
 
-        # Generate unique filename
+        # Generate unique name
         timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"proof_{user_id}_{case_no}_{timestamp}.{file_extension}"
-        file_path = os.path.join("proofs", filename)
+        public_id = f"proof_{user_id}_{case_no}_{timestamp}"
 
-        # Download file
+        # Download the file into memory, it is uploaded straight from the buffer
         file = await context.bot.get_file(file_id)
-        await file.download_to_drive(file_path)
+        proof_buffer = BytesIO()
+        await file.download_to_memory(proof_buffer)
 
-        # Upload to Cloudinary
-        try:
-            if is_video:
-                upload_result = await upload_video(file_path)
-            else:
-                upload_result = await upload_image(file_path)
-
-            print(f"Uploaded File URL: {upload_result}")
-        except CloudinaryError as e:
-            print(f"Cloudinary upload error: {e}")
-            await update.message.reply_text(
-                "There was an error uploading the file. Please try again."
+        # Clear a previous proof and attach the new one once it is uploaded
+        finder = await FinderService.update_or_create_finder(user_id, proof_url=[])
+
+        async def on_failed(error: Exception):
+            await context.bot.send_message(
+                user_id, get_text(user_id, "proof_upload_failed")
             )
-            return State.END
 
-        await FinderService.update_or_create_finder(user_id, proof_url=[upload_result])
+        # Upload in the background, the user goes on with the location
+        # meanwhile; the request is only submitted once it finished
+        options = {"folder": "proofs", "public_id": public_id} if is_video else {}
+        await UploadService.submit(
+            proof_buffer,
+            resource_type="video" if is_video else "image",
+            on_complete=UploadService.attach_finder_proof(finder.id),
+            on_failure=on_failed,
+            key=("finder_proof", finder.id),
+            **options,
+        )
 
-        # Store proof path in context
-        context.user_data["proof_path"] = file_path
+        if context.user_data.pop("proof_retry", False):
+            # Sent again after the first upload failed, back to the confirmation
+            await update.message.reply_text(
+                get_text(user_id, "proof_received_confirm"),
+                reply_markup=finder_confirmation_keyboard(),
+            )
+            return State.FINDER_CONFIRM_TRANSACTION
 
         await update.message.reply_text(get_text(user_id, "proof_received"))
         return State.ENTER_LOCATION
@@ -642,7 +552,9 @@ async def finder_wallet_selection_callback(
 
         print("\n\n DEBUGGING -002 \n\n")
 
-        msg = get_text(user_id, "wallet_create_details").format(
+        msg = get_text(
+            user_id,
+            "wallet_create_details",
             name=wallet_details["name"],
             public_key=wallet_details["public_key"],
             secret_key=wallet_details["private_key"],
@@ -660,18 +572,9 @@ async def finder_wallet_selection_callback(
             f"🔑 <b>Wallet Address:</b> <code>{wallet_details['public_key']}</code>"
         )
 
-        keyboard = [
-            [
-                InlineKeyboardButton(
-                    "✅ Confirm Transfer", callback_data="confirm_transfer"
-                ),
-                InlineKeyboardButton("❌ Cancel", callback_data="cancel_transfer"),
-            ]
-        ]
-
         await query.message.reply_text(
             confirmation_message,
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=finder_confirmation_keyboard(),
             parse_mode="HTML",
         )
 
@@ -771,6 +674,40 @@ async def finder_wallet_name_handler(
         return State.END
 
 
+def finder_confirmation_keyboard() -> InlineKeyboardMarkup:
+    """The buttons confirming or canceling the request of a finder."""
+    return InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton(
+                    "✅ Confirm Transfer", callback_data="confirm_transfer"
+                ),
+                InlineKeyboardButton("❌ Cancel", callback_data="cancel_transfer"),
+            ]
+        ]
+    )
+
+
+async def wait_for_finder_proof(user_id: int) -> Optional[bool]:
+    """
+    Wait for the proof upload of the drafted finder of a user to finish.
+
+    :return: True if the finder has its proof, False if the upload failed (or
+        never happened), None if it is still running.
+    """
+    finder = await FinderService.get_drafted_finder_by_user(user_id)
+    if finder is None:
+        return False
+    if finder.proof_url:
+        return True
+    if not await UploadService.wait(("finder_proof", finder.id)):
+        return None
+    stored = await Finder.get_motor_collection().find_one(
+        {"_id": finder.id}, {"proof_url": 1}
+    )
+    return bool(stored and stored.get("proof_url"))
+
+
 @catch_async
 async def finder_handle_transaction_confirmation(
     update: Update, context: ContextTypes.DEFAULT_TYPE
@@ -787,6 +724,19 @@ async def finder_handle_transaction_confirmation(
     print(f"Wallet: {wallet}")
     print(f"Case: {case}")
     if case.status == CaseStatus.ADVERTISE:
+        # The advertiser is only notified once the proof is uploaded
+        has_proof = await wait_for_finder_proof(user_id)
+        if has_proof is None:
+            await query.edit_message_text(
+                get_text(user_id, "proof_upload_pending"),
+                reply_markup=finder_confirmation_keyboard(),
+            )
+            return State.FINDER_CONFIRM_TRANSACTION
+        if not has_proof:
+            context.user_data["proof_retry"] = True
+            await query.edit_message_text(get_text(user_id, "proof_upload_resend"))
+            return State.UPLOAD_PROOF
+
         if isExtendedFlow:
             extend_reward = ExtendReward(
                 user_id=user_id,
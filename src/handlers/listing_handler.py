@@ -3,14 +3,13 @@ from datetime import datetime
 from beanie import PydanticObjectId
 from config.config_manager import (
     OWNER_TELEGRAM_ID,
-    STAKE_WALLET_PRIVATE_KEY,
+    REWARD_PAYOUT_MAX_ROUNDS,
     STAKE_WALLET_PUBLIC_KEY,
     TAX_COLLECT_PUBLIC_KEY,
     TRON_TAX_COLLECT_PRIVATE_KEY,
     TRON_TAX_COLLECT_PUBLIC_KEY,
-    TRON_WALLET_PRIVATE_KEY,
 )
-from constant.language_constant import get_text, user_data_store
+from constant.language_constant import get_text
 from constants import State
 from models.case_model import Case, CaseStatus
 from telegram import (
@@ -25,10 +24,12 @@ from bson import ObjectId, errors
 import traceback
 from models.extend_reward_model import ExtendReward
 from models.finder_model import Finder, FinderStatus
+from models.transfer_model import TransferStatus
 from models.wallet_model import Wallet
-from services.case_service import update_case
+from services.case_listing_service import CaseListingPage, CaseListingService
+from services.case_service import set_case_status, start_case_transfer, update_case
 from services.finder_service import FinderService
-from services.tron_wallet_service import TronWallet
+from services.transfer_outbox import TransferOutbox
 from services.user_service import get_user_lang
 from services.wallet_service import WalletService
 from utils.logger import logger
@@ -36,41 +37,19 @@ from utils.error_wrapper import catch_async
 from utils.helper import get_city_matches, get_country_matches, paginate_list
 
 
-@catch_async
-async def listing_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-    """Handler for the /listing command."""
-    user_id = update.effective_user.id
-    logger.info(f"User {user_id} issued /listing command")
-    all_cases = (
-        await Case.find({"status": CaseStatus.ADVERTISE, "deleted": False})
-        .sort(-Case.created_at)  # Sorting in descending order
-        .to_list()
-    )
-
-    logger.info(f"Fetched {len(all_cases)} ADVERTISE cases from the database")
-    user_lang = await get_user_lang(user_id)
-    if user_lang:
-        user_data_store[user_id] = {"lang": user_lang}
-        context.user_data["lang"] = user_lang
-    if not all_cases:
-        await update.message.reply_text(get_text(user_id, "no_advertise_cases"))
-        return State.END
-    context.user_data["page"] = 1
-    context.user_data["cases"] = all_cases
-    paginated_cases, total_pages = paginate_list(all_cases, 1)
+def build_listing_keyboard(user_id: int, listing: CaseListingPage) -> InlineKeyboardMarkup:
+    """Build the case list keyboard for one listing page."""
     keyboard = []
-    for case in paginated_cases:
+    for item in listing.items:
+        case = item.case
         row = [
             InlineKeyboardButton(
                 f"Case {case.case_no} - {case.person_name}",
                 callback_data=f"case_{str(case.id)}",
             )
         ]
-        finder_exist = await Finder.find(
-            {"case.$id": PydanticObjectId(case.id), "status": FinderStatus.FIND}
-        ).to_list()
 
-        if case.user_id == user_id and len(finder_exist) == 0:
+        if case.user_id == user_id and item.finder_count == 0:
             row.append(
                 InlineKeyboardButton(
                     get_text(user_id, "edit_button"),
@@ -84,9 +63,7 @@ async def listing_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 )
             )
 
-        print(user_id, OWNER_TELEGRAM_ID)
-
-        if str(user_id) == str(OWNER_TELEGRAM_ID) and finder_exist:
+        if str(user_id) == str(OWNER_TELEGRAM_ID) and item.finder_count:
             row.append(
                 InlineKeyboardButton(
                     # get_text(user_id, "reward_button"),
@@ -94,30 +71,25 @@ async def listing_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                     callback_data=f"reward_{str(case.id)}",
                 )
             )
-        keyboard.append(row)
 
-        # In the listing_command function, after checking for edit/delete buttons:
-        extend_reward = await ExtendReward.find_one(
-            {"case.$id": PydanticObjectId(case.id)}
-        )
-        if case.status == CaseStatus.ADVERTISE and extend_reward:
-            if case.user_id == user_id:  # Ensure only the owner sees the button
-                row.append(
-                    InlineKeyboardButton(
-                        get_text(user_id, "extend_reward_button"),
-                        callback_data=f"extend_reward_{str(case.id)}",
-                    )
+        # Only the owner sees the extend button
+        if item.has_pending_extension and case.user_id == user_id:
+            row.append(
+                InlineKeyboardButton(
+                    get_text(user_id, "extend_reward_button"),
+                    callback_data=f"extend_reward_{str(case.id)}",
                 )
+            )
+        keyboard.append(row)
 
     navigation_buttons = []
-    current_page = context.user_data["page"]
-    if current_page > 1:
+    if listing.has_previous:
         navigation_buttons.append(
             InlineKeyboardButton(
                 get_text(user_id, "previous_button"), callback_data="page_previous"
             )
         )
-    if current_page < total_pages:
+    if listing.has_next:
         navigation_buttons.append(
             InlineKeyboardButton(
                 get_text(user_id, "next_button"), callback_data="page_next"
@@ -125,10 +97,29 @@ async def listing_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         )
     if navigation_buttons:
         keyboard.append(navigation_buttons)
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await update.message.reply_text(
+    return InlineKeyboardMarkup(keyboard)
+
+
+@catch_async
+async def listing_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Handler for the /listing command."""
+    user_id = update.effective_user.id
+    logger.info(f"User {user_id} issued /listing command")
+    listing = await CaseListingService.get_advertised_page()
+
+    logger.info(f"Fetched {len(listing.items)} ADVERTISE cases for the first page")
+    user_lang = await get_user_lang(user_id)
+    if user_lang:
+        context.user_data["lang"] = user_lang
+    if not listing.items:
+        await update.effective_message.reply_text(
+            get_text(user_id, "no_advertise_cases")
+        )
+        return State.END
+    context.user_data["listing_cursor"] = listing.cursor
+    await update.effective_message.reply_text(
         get_text(user_id, "select_case_details"),
-        reply_markup=reply_markup,
+        reply_markup=build_listing_keyboard(user_id, listing),
         parse_mode="Markdown",
     )
     return State.CASE_DETAILS
@@ -166,7 +157,6 @@ async def case_details_callback(
         case_message = get_text(
             user_id,
             "case_details_template",
-        ).format(
             person_name=case.person_name,
             last_seen_location=case.last_seen_location,
             reward=case.reward or "None",
@@ -221,83 +211,29 @@ async def pagination_callback(
     """Handler for the pagination (Next/Previous) buttons."""
     query = update.callback_query
     await query.answer()
+    user_id = update.effective_user.id
 
     try:
-        # Get current page and case list from user data
-        current_page = context.user_data.get("page", 1)
-        cases = context.user_data.get("cases", [])
-        user_id = update.effective_user.id
+        cursor = context.user_data.get("listing_cursor")
 
         # Determine navigation action (next or previous)
         if query.data == "page_next":
-            new_page = current_page + 1
+            direction = "next"
         elif query.data == "page_previous":
-            new_page = current_page - 1
+            direction = "previous"
         else:
-            new_page = current_page
-
-        # Paginate the case list based on the new page
-        paginated_cases, total_pages = paginate_list(cases, new_page)
-
-        # Save the new page in context
-        context.user_data["page"] = new_page
-
-        # Create the inline keyboard with case buttons
-        keyboard = []
-        for case in paginated_cases:
+            direction = "current"
 
-            row = [
-                InlineKeyboardButton(
-                    f"Case {case.case_no} - {case.name}",
-                    callback_data=f"case_{str(case.id)}",
-                )
-            ]
+        listing = await CaseListingService.get_advertised_page(cursor, direction)
+        if not listing.items:
+            # The neighbouring cases were removed since the page was rendered
+            listing = await CaseListingService.get_advertised_page()
 
-            finder_exist = await Finder.find(
-                {"case.$id": PydanticObjectId(case.id), "status": FinderStatus.FIND}
-            ).to_list()
-            print(f"Finder exist: {finder_exist}")
-            if case.user_id == update.effective_user.id and len(finder_exist) == 0:
+        context.user_data["listing_cursor"] = listing.cursor
 
-                row.append(
-                    InlineKeyboardButton(
-                        get_text(user_id, "edit_button"),
-                        callback_data=f"edit_{str(case.id)}",
-                    )
-                )
-                row.append(
-                    InlineKeyboardButton(
-                        get_text(user_id, "delete_button"),
-                        callback_data=f"delete_{str(case.id)}",
-                    )
-                )
-
-            #
-            keyboard.append(row)
-
-        # Add navigation buttons
-        navigation_buttons = []
-        if new_page > 1:
-            navigation_buttons.append(
-                InlineKeyboardButton(
-                    get_text(user_id, "previous_button"), callback_data="page_previous"
-                )
-            )
-        if new_page < total_pages:
-            navigation_buttons.append(
-                InlineKeyboardButton(
-                    get_text(user_id, "next_button"), callback_data="page_next"
-                )
-            )
-        if navigation_buttons:
-            keyboard.append(navigation_buttons)
-
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        # Edit the message with the updated case list
         await query.message.edit_text(
             get_text(user_id, "select_case_details"),
-            reply_markup=reply_markup,
+            reply_markup=build_listing_keyboard(user_id, listing),
             parse_mode="Markdown",
         )
         return State.CASE_DETAILS
@@ -419,8 +355,10 @@ async def edit_field_callback(
 
     # For other fields
     await query.message.edit_text(
-        get_text(user_id, "enter_new_value").format(
-            field_name=field_name.replace("_", " ").title()
+        get_text(
+            user_id,
+            "enter_new_value",
+            field_name=field_name.replace("_", " ").title(),
         ),
         parse_mode="Markdown",
     )
@@ -468,7 +406,6 @@ async def update_case_field(update: Update, context: ContextTypes.DEFAULT_TYPE)
             get_text(
                 user_id,
                 "field_updated_successfully",
-            ).format(
                 field_name=field_name.replace("_", " ").title(),
                 new_value=new_value,
             ),
@@ -476,7 +413,7 @@ async def update_case_field(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
     except ValueError as e:
         await update.message.reply_text(
-            get_text(user_id, "invalid_value").format(error_message=str(e))
+            get_text(user_id, "invalid_value", error_message=str(e))
         )
         return State.EDIT_FIELD
 
@@ -579,7 +516,7 @@ async def update_choose_country(
             )
         markup = InlineKeyboardMarkup(kb)
         await update.message.reply_text(
-            get_text(user_id, "country_multi").format(page=1, total=total),
+            get_text(user_id, "country_multi", page=1, total=total),
             reply_markup=markup,
             parse_mode="HTML",
         )
@@ -630,7 +567,7 @@ async def country_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             kb.append(nav_row)
         markup = InlineKeyboardMarkup(kb)
         await query.edit_message_text(
-            get_text(user_id, "country_multi").format(page=page_num, total=total),
+            get_text(user_id, "country_multi", page=page_num, total=total),
             reply_markup=markup,
             parse_mode="HTML",
         )
@@ -685,7 +622,7 @@ async def choose_city(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
             )
         markup = InlineKeyboardMarkup(kb)
         await update.message.reply_text(
-            get_text(user_id, "city_multi").format(page=1, total=total),
+            get_text(user_id, "city_multi", page=1, total=total),
             reply_markup=markup,
             parse_mode="HTML",
         )
@@ -734,7 +671,7 @@ async def city_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
             kb.append(nav_row)
         markup = InlineKeyboardMarkup(kb)
         await query.edit_message_text(
-            get_text(user_id, "city_multi").format(page=page_num, total=total),
+            get_text(user_id, "city_multi", page=page_num, total=total),
             reply_markup=markup,
             parse_mode="HTML",
         )
@@ -893,6 +830,9 @@ async def reward_case_callback(
         if not case:
             await query.message.edit_text(get_text(user_id, "case_not_found"))
             return State.END
+        if case.status == CaseStatus.PAYOUT_PENDING:
+            await query.message.edit_text(get_text(user_id, "reward_payout_pending"))
+            return State.END
 
         finders = await Finder.find({"case.$id": PydanticObjectId(case.id)}).to_list()
         if not finders:
@@ -900,7 +840,9 @@ async def reward_case_callback(
             return State.END
 
         # Construct case details message
-        case_details = get_text(user_id, "case_details_template").format(
+        case_details = get_text(
+            user_id,
+            "case_details_template",
             person_name=case.person_name,
             last_seen_location=case.last_seen_location,
             reward=case.reward,
@@ -966,7 +908,9 @@ async def finder_details_callback(
             return State.END
 
         # Construct case details message
-        case_details = get_text(user_id, "case_details_template").format(
+        case_details = get_text(
+            user_id,
+            "case_details_template",
             person_name=case.person_name,
             last_seen_location=case.last_seen_location,
             reward=case.reward,
@@ -1034,12 +978,15 @@ async def ask_reward_amount(update: Update, context: ContextTypes.DEFAULT_TYPE)
         if not case or not finder:
             await query.message.edit_text(get_text(user_id, "case_or_finder_not_found"))
             return State.END
+        if case.status == CaseStatus.PAYOUT_PENDING:
+            await query.message.edit_text(get_text(user_id, "reward_payout_pending"))
+            return State.END
 
         context.user_data["reward_case_id"] = case.id
         context.user_data["reward_finder_id"] = finder.id
 
         await query.message.edit_text(
-            get_text(user_id, "enter_reward_amount").format(max_amount=case.reward),
+            get_text(user_id, "enter_reward_amount", max_amount=case.reward),
             parse_mode="Markdown",
         )
         return State.REWARD_TRANSFER_PROCESS  # Next step: user enters amount
@@ -1092,8 +1039,12 @@ async def process_reward_transfer(
         )
 
         await update.message.reply_text(
-            get_text(user_id, "reward_confirmation").format(
-                amount=amount, finder_id=finder_id, case_no=case.case_no
+            get_text(
+                user_id,
+                "reward_confirmation",
+                amount=amount,
+                finder_id=finder_id,
+                case_no=case.case_no,
             ),
             reply_markup=keyboard,
             parse_mode="Markdown",
@@ -1102,7 +1053,7 @@ async def process_reward_transfer(
 
     except ValueError:
         await update.message.reply_text(
-            get_text(user_id, "invalid_reward_amount").format(max_amount=case.reward)
+            get_text(user_id, "invalid_reward_amount", max_amount=case.reward)
         )
         return State.EDIT_FIELD
 
@@ -1135,45 +1086,65 @@ async def confirm_reward(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
         print(f"Finder: {finder}")
 
-        # Perform transfer
-
+        # Queue the payout and the tax, the outbox sends and confirms them
         finder_wallet = finder.wallet
-
-        is_transfer_to_finder_successful = (
-            await WalletService.send_sol(
-                STAKE_WALLET_PRIVATE_KEY, finder_wallet.public_key, amount
-            )
-            if finder_wallet.wallet_type == "SOL"
-            else await TronWallet.transfer_usdt(
-                TRON_WALLET_PRIVATE_KEY, finder_wallet.public_key, amount
-            )
-        )
-        is_tax_transfer_successful = (
-            await WalletService.send_sol(
-                STAKE_WALLET_PRIVATE_KEY,
-                TAX_COLLECT_PUBLIC_KEY,
-                float(case.reward - amount),
+        chain = finder_wallet.wallet_type
+        transfers = {
+            "finder": {
+                "chain": chain,
+                "recipient": finder_wallet.public_key,
+                "amount": amount,
+            }
+        }
+        tax = float(case.reward - amount)
+        if tax > 0 and chain == "SOL":
+            # One transaction pays the finder and the tax, or neither
+            transfers["finder"]["splits"] = [
+                {"recipient": TAX_COLLECT_PUBLIC_KEY, "amount": tax}
+            ]
+        elif tax > 0:
+            transfers["tax"] = {
+                "chain": chain,
+                "recipient": TRON_TAX_COLLECT_PUBLIC_KEY,
+                "amount": tax,
+            }
+
+        # Held out of the listings while it is paid, so no other finder or
+        # amount can be chosen and a second confirmation cannot pay it again
+        attempt = await start_case_transfer(
+            case.id, CaseStatus.ADVERTISE, CaseStatus.PAYOUT_PENDING
+        )
+        if attempt is None:
+            await query.message.edit_text(get_text(user_id, "reward_payout_pending"))
+            return State.END
+        try:
+            queued = await TransferOutbox.enqueue(
+                f"reward:{case.id}:{attempt}",
+                transfers,
+                context={
+                    "user_id": user_id,
+                    "case_id": str(case.id),
+                    "finder_id": str(finder.id),
+                    "finder_user_id": finder.user_id,
+                    "amount": amount,
+                },
             )
-            if finder_wallet.wallet_type == "SOL"
-            else await TronWallet.transfer_usdt(
-                TRON_WALLET_PRIVATE_KEY,
-                TRON_TAX_COLLECT_PUBLIC_KEY,
-                float(case.reward - amount),
+        except Exception:
+            # Nothing was queued, the reward can be sent again
+            await set_case_status(
+                case.id, CaseStatus.ADVERTISE, CaseStatus.PAYOUT_PENDING
             )
-        )
-
-        print(f"Is transfer to finder successful: {is_transfer_to_finder_successful}")
-        print(f"Is tax transfer successful: {is_tax_transfer_successful}")
-
-        finder.status = FinderStatus.COMPLETED
-        case.status = CaseStatus.COMPLETED
-        await case.save()
-
-        await finder.save()
+            raise
 
+        if not queued:
+            await query.message.edit_text(get_text(user_id, "reward_payout_pending"))
+            return State.END
         await query.message.edit_text(
-            get_text(user_id, "reward_success").format(
-                amount=amount, finder_id=finder.user_id
+            get_text(
+                user_id,
+                "reward_transfer_queued",
+                amount=amount,
+                finder_id=finder.user_id,
             )
         )
         return State.END
@@ -1184,6 +1155,72 @@ async def confirm_reward(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return State.END
 
 
+@TransferOutbox.on_settled("reward")
+async def reward_settled(bot, transfers, context: dict):
+    """
+    Complete the case once every transfer of the reward is confirmed, and
+    tell the owner. Once a leg was paid, the legs that failed are queued
+    again in a follow-up group instead of listing the case again.
+    """
+    user_id = context["user_id"]
+    # Runs outside an update, so the language is not cached by load_user_lang
+    await get_user_lang(user_id)
+    case_id = ObjectId(context["case_id"])
+    failed = [t for t in transfers if t.status != TransferStatus.CONFIRMED]
+    # Legs confirmed by this group and the follow-up groups before it
+    paid = context.get("paid", []) + [
+        t.key.rsplit(":", 1)[1]
+        for t in transfers
+        if t.status == TransferStatus.CONFIRMED
+    ]
+
+    if failed and not paid:
+        # Nothing was sent: listed again, rewarding a finder queues a new attempt
+        await set_case_status(case_id, CaseStatus.ADVERTISE, CaseStatus.PAYOUT_PENDING)
+        await bot.send_message(user_id, get_text(user_id, "error_transferring_reward"))
+        return
+
+    if failed:
+        for transfer in failed:
+            logger.error(f"Transfer {transfer.key} failed: {transfer.last_error}")
+        rounds = context.get("round", 0) + 1
+        if rounds > REWARD_PAYOUT_MAX_ROUNDS:
+            # Held in PAYOUT_PENDING, the failed legs are left to the platform owner
+            unpaid = ", ".join(f"{t.amount} {t.chain} to {t.recipient}" for t in failed)
+            await bot.send_message(
+                chat_id=OWNER_TELEGRAM_ID,
+                text=(
+                    f"⚠️ Reward of case {context['case_id']} only partly sent, "
+                    f"pay manually: {unpaid}"
+                ),
+            )
+            await bot.send_message(user_id, get_text(user_id, "reward_payout_stuck"))
+            return
+        first_group = context.get("group", transfers[0].group)
+        await TransferOutbox.enqueue_again(
+            f"{first_group}:retry{rounds}",
+            failed,
+            {**context, "group": first_group, "round": rounds, "paid": paid},
+        )
+        await bot.send_message(user_id, get_text(user_id, "reward_payout_retrying"))
+        return
+
+    await Finder.get_motor_collection().update_one(
+        {"_id": ObjectId(context["finder_id"])},
+        {"$set": {"status": FinderStatus.COMPLETED.value}},
+    )
+    await set_case_status(case_id, CaseStatus.COMPLETED, CaseStatus.PAYOUT_PENDING)
+    await bot.send_message(
+        user_id,
+        get_text(
+            user_id,
+            "reward_success",
+            amount=context["amount"],
+            finder_id=context["finder_user_id"],
+        ),
+    )
+
+
 # New cancellation handler
 @catch_async
 async def cancel_reward(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
@@ -1326,7 +1363,9 @@ async def advertiser_wallet_selection_callback(
         context.user_data["wallet"] = wallet_details  # Store in memory
         await update_or_create_case(user_id, wallet=str(wallet_details["id"]))
 
-        msg = get_text(user_id, "wallet_create_details").format(
+        msg = get_text(
+            user_id,
+            "wallet_create_details",
             name=wallet_details["name"],
             public_key=wallet_details["public_key"],
             secret_key=wallet_details["private_key"],
@@ -1334,7 +1373,9 @@ async def advertiser_wallet_selection_callback(
             wallet_type=wallet_type,
         )
 
-        transfer_instructions = get_text(user_id, "transfer_instructions").format(
+        transfer_instructions = get_text(
+            user_id,
+            "transfer_instructions",
             wallet_type=wallet_type,
             public_key=wallet_details["public_key"],
         )
@@ -1394,7 +1435,9 @@ async def advertiser_wallet_name_handler(
         print(f"This is the wallet type: {wallet_type}")
 
         context.user_data["wallet"] = wallet
-        msg = get_text(user_id, "wallet_create_details").format(
+        msg = get_text(
+            user_id,
+            "wallet_create_details",
             name=wallet.name,
             public_key=wallet.public_key,
             secret_key=wallet.private_key,
@@ -1402,7 +1445,9 @@ async def advertiser_wallet_name_handler(
             wallet_type=wallet_type,
         )
 
-        transfer_instructions = get_text(user_id, "transfer_instructions").format(
+        transfer_instructions = get_text(
+            user_id,
+            "transfer_instructions",
             wallet_type=wallet_type,
             public_key=wallet.public_key,
         )
@@ -1501,7 +1546,9 @@ async def extend_reward_callback(
         ]
     )
 
-    message = get_text(user_id, "extend_reward_confirmation").format(
+    message = get_text(
+        user_id,
+        "extend_reward_confirmation",
         amount=extend_reward.extend_reward_amount,
         wallet_type=wallet_type,
         from_wallet=best_wallet.public_key,
@@ -1,8 +1,9 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 from constants import State
-from constant.language_constant import get_text, user_data_store, LANG_DATA
+from constant.language_constant import get_text
 from services.otp_service import send_otp, verify_otp
+from services.session_store import session_store
 from services.user_service import (
     delete_user_mobile,
     get_user_lang,
@@ -12,6 +13,7 @@ from services.user_service import (
     validate_mobile,
 )
 from utils.helper import generate_tac
+from utils.keyboards import get_language_picker, get_menu
 
 
 # Handlers
@@ -21,29 +23,11 @@ async def settings_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     user_lang = await get_user_lang(user_id)
     if user_lang:
-        user_data_store[user_id] = {"lang": user_lang}
         context.user_data["lang"] = user_lang
 
-    kb = [
-        [
-            InlineKeyboardButton(
-                get_text(user_id, "btn_language"), callback_data="settings_language"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                get_text(user_id, "btn_mobile_number"), callback_data="settings_mobile"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                get_text(user_id, "btn_close_menu"), callback_data="settings_close"
-            )
-        ],
-    ]
     await update.message.reply_text(
         get_text(user_id, "menu_settings_title"),
-        reply_markup=InlineKeyboardMarkup(kb),
+        reply_markup=get_menu(user_id, "settings"),
         parse_mode="HTML",
     )
     return State.SETTINGS_MENU
@@ -58,22 +42,9 @@ async def settings_menu_callback(update: Update, context: ContextTypes.DEFAULT_T
 
     if choice == "settings_language":
         # Language selection
-        kb = [
-            [
-                InlineKeyboardButton(
-                    LANG_DATA["en"]["lang_button"], callback_data="setlang_en"
-                ),
-                InlineKeyboardButton(
-                    LANG_DATA["zh"]["lang_button"], callback_data="setlang_zh"
-                ),
-                InlineKeyboardButton(
-                    LANG_DATA["ms"]["lang_button"], callback_data="setlang_ms"
-                ),
-            ],
-        ]
         await query.edit_message_text(
             text=get_text(user_id, "choose_language"),
-            reply_markup=InlineKeyboardMarkup(kb),
+            reply_markup=get_language_picker("settings"),
             parse_mode="HTML",
         )
         return State.SETTINGS_MENU
@@ -118,9 +89,6 @@ async def settings_menu_callback(update: Update, context: ContextTypes.DEFAULT_T
         new_lang = choice.replace("setlang_", "")
         await save_user_lang(user_id, new_lang)
         context.user_data["lang"] = new_lang
-        if user_id not in user_data_store:
-            user_data_store[user_id] = {}
-        user_data_store[user_id]["lang"] = new_lang
         await query.edit_message_text(
             get_text(user_id, "lang_updated"), parse_mode="HTML"
         )
@@ -151,7 +119,7 @@ async def settings_menu_callback(update: Update, context: ContextTypes.DEFAULT_T
                 ],
             ]
             await query.edit_message_text(
-                get_text(user_id, "selected_mobile_options").format(mobile=mobile),
+                get_text(user_id, "selected_mobile_options", mobile=mobile),
                 reply_markup=InlineKeyboardMarkup(kb),
                 parse_mode="HTML",
             )
@@ -161,7 +129,7 @@ async def settings_menu_callback(update: Update, context: ContextTypes.DEFAULT_T
         mobile = choice.replace("remove_", "")
         await delete_user_mobile(user_id, mobile)
         await query.edit_message_text(
-            get_text(user_id, "mobile_removed").format(mobile=mobile),
+            get_text(user_id, "mobile_removed", mobile=mobile),
             parse_mode="HTML",
         )
         return State.MOBILE_MANAGEMENT
@@ -188,14 +156,12 @@ async def handle_setting_mobile(update: Update, context: ContextTypes.DEFAULT_TY
     context.user_data["mobile"] = mobile
 
     # Save TAC and mobile in user data store
-    if user_id not in user_data_store:
-        user_data_store[user_id] = {}
-    user_data_store[user_id]["mobile"] = mobile
+    session_store.set(user_id, mobile=mobile)
 
     # Notify the user that your VERIFICATION CODE IS THIS NUMBER
     res = await send_otp(mobile)
 
-    user_data_store[user_id]["otp_id"] = res["otp_id"]
+    session_store.set(user_id, otp_id=res["otp_id"])
 
     print(f"Response: {res}")
 
@@ -217,7 +183,7 @@ async def handle_setting_tac(update: Update, context: ContextTypes.DEFAULT_TYPE)
     print(f"Getting the number which is: {mobile}")
 
     # Verify TAC
-    otp_verify = await verify_otp(user_data_store[user_id]["otp_id"], user_tac)
+    otp_verify = await verify_otp(session_store.get_value(user_id, "otp_id"), user_tac)
     if otp_verify["success"]:
         # Save the verified mobile number
         mobiles = await get_user_mobiles(user_id)
@@ -18,7 +18,8 @@ from constants import (
 from services.user_service import get_user_lang, save_user_lang
 from utils.error_wrapper import catch_async
 from utils.helper import get_city_matches, get_country_matches, paginate_list
-from constant.language_constant import LANG_DATA, get_text, user_data_store
+from utils.keyboards import get_language_picker, get_menu
+from constant.language_constant import LANG_DATA, get_text
 
 
 @catch_async
@@ -28,24 +29,13 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
 
     user_lang = await get_user_lang(user_id)
     if user_lang:
-        user_data_store[user_id] = {"lang": user_lang}
         context.user_data["lang"] = user_lang
         await update.message.reply_text(get_text(user_id, "choose_country"))
         return State.CHOOSE_COUNTRY
 
-    btns = [
-        [
-            InlineKeyboardButton(
-                LANG_DATA["en"]["lang_button"], callback_data="lang_en"
-            ),
-            InlineKeyboardButton(
-                LANG_DATA["zh"]["lang_button"], callback_data="lang_zh"
-            ),
-        ]
-    ]
     await update.message.reply_text(
         f"{LANG_DATA['en']['start_msg']}\n\n{LANG_DATA['zh']['start_msg']}",
-        reply_markup=InlineKeyboardMarkup(btns),
+        reply_markup=get_language_picker("start"),
     )
 
     return State.SELECT_LANG
@@ -64,7 +54,6 @@ async def select_lang_callback(
     lang = data.replace("lang_", "")
     await save_user_lang(user_id, lang)
 
-    user_data_store[user_id] = {"lang": lang}
     context.user_data["lang"] = lang
 
     await query.edit_message_text(get_text(user_id, "choose_country"))
@@ -106,7 +95,7 @@ async def choose_country(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             )
         markup = InlineKeyboardMarkup(kb)
         await update.message.reply_text(
-            get_text(user_id, "country_multi").format(page=1, total=total),
+            get_text(user_id, "country_multi", page=1, total=total),
             reply_markup=markup,
             parse_mode="HTML",
         )
@@ -157,7 +146,7 @@ async def country_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             kb.append(nav_row)
         markup = InlineKeyboardMarkup(kb)
         await query.edit_message_text(
-            get_text(user_id, "country_multi").format(page=page_num, total=total),
+            get_text(user_id, "country_multi", page=page_num, total=total),
             reply_markup=markup,
             parse_mode="HTML",
         )
@@ -266,7 +255,7 @@ async def choose_city(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
             )
         markup = InlineKeyboardMarkup(kb)
         await update.message.reply_text(
-            get_text(user_id, "city_multi").format(page=1, total=total),
+            get_text(user_id, "city_multi", page=1, total=total),
             reply_markup=markup,
             parse_mode="HTML",
         )
@@ -315,7 +304,7 @@ async def city_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
             kb.append(nav_row)
         markup = InlineKeyboardMarkup(kb)
         await query.edit_message_text(
-            get_text(user_id, "city_multi").format(page=page_num, total=total),
+            get_text(user_id, "city_multi", page=page_num, total=total),
             reply_markup=markup,
             parse_mode="HTML",
         )
@@ -335,18 +324,7 @@ async def choose_action(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
         if update.message
         else update.callback_query.from_user.id
     )
-    kb = InlineKeyboardMarkup(
-        [
-            [
-                InlineKeyboardButton(
-                    get_text(user_id, "advertise_btn"), callback_data="advertise"
-                ),
-                InlineKeyboardButton(
-                    get_text(user_id, "find_btn"), callback_data="find_people"
-                ),
-            ]
-        ]
-    )
+    kb = get_menu(user_id, "choose_action")
     if update.callback_query:
         await update.callback_query.message.reply_text(
             get_text(user_id, "choose_action"), reply_markup=kb
@@ -476,7 +454,9 @@ async def wallet_selection_callback(
         context.user_data["wallet"] = wallet_details  # Store in memory
         await update_or_create_case(user_id, wallet=str(wallet_details["id"]))
 
-        msg = get_text(user_id, "wallet_create_details").format(
+        msg = get_text(
+            user_id,
+            "wallet_create_details",
             name=wallet_details["name"],
             public_key=wallet_details["public_key"],
             secret_key=wallet_details["private_key"],
@@ -484,7 +464,9 @@ async def wallet_selection_callback(
             wallet_type=wallet_type,
         )
 
-        transfer_instructions = get_text(user_id, "transfer_instructions").format(
+        transfer_instructions = get_text(
+            user_id,
+            "transfer_instructions",
             wallet_type=wallet_type,
             public_key=wallet_details["public_key"],
         )
@@ -544,7 +526,9 @@ async def wallet_name_handler(
         print(f"This is the wallet type: {wallet_type}")
 
         context.user_data["wallet"] = wallet
-        msg = get_text(user_id, "wallet_create_details").format(
+        msg = get_text(
+            user_id,
+            "wallet_create_details",
             name=wallet.name,
             public_key=wallet.public_key,
             secret_key=wallet.private_key,
@@ -552,7 +536,9 @@ async def wallet_name_handler(
             wallet_type=wallet_type,
         )
 
-        transfer_instructions = get_text(user_id, "transfer_instructions").format(
+        transfer_instructions = get_text(
+            user_id,
+            "transfer_instructions",
             wallet_type=wallet_type,
             public_key=wallet.public_key,
         )
@@ -4,9 +4,9 @@ from constants import State
 from helpers import get_sol_balance
 from services.tron_wallet_service import TronWallet
 from services.wallet_service import WalletService
+from utils.keyboards import get_menu
 from solders.pubkey import Pubkey
 from utils.error_wrapper import catch_async
-from utils.solana_config import solana_client
 from telegram.ext import ContextTypes
 from solders.token.associated import get_associated_token_address
 from constant.language_constant import USDT_MINT_ADDRESS
@@ -23,6 +23,25 @@ def escape_markdown_v2(text: str) -> str:
     return re.sub(f"([{re.escape(escape_chars)}])", r"\\\1", text)
 
 
+def format_balance_line(wallet, balance) -> str:
+    """One line of a wallet list: its name and balance, or that it is unavailable."""
+    if balance is None:
+        return f"Name: {wallet.name}, Error fetching balance\n"
+    return f"Name: {wallet.name}, Balance: {balance} {wallet.wallet_type}\n"
+
+
+def format_history_line(entry, wallet_type) -> str:
+    """One line of a wallet history: time, amount moved and short signature."""
+    when = entry.block_time.strftime("%Y-%m-%d %H:%M") if entry.block_time else "pending"
+    if entry.amount is None:
+        amount = "unknown amount"
+    else:
+        sign = {"in": "+", "out": "-"}.get(entry.direction, "")
+        amount = f"{sign}{entry.amount:g} {wallet_type}"
+    status = " (failed)" if entry.failed else ""
+    return f"{when} {amount}{status} {entry.signature[:8]}...\n"
+
+
 # Define the USDT mint address
 
 
@@ -30,51 +49,14 @@ def escape_markdown_v2(text: str) -> str:
 async def wallet_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Entry point for /wallet command."""
     user_id = update.effective_user.id
-    wallets = await WalletService.get_wallet_by_user(user_id)
-    if wallets is None:
-        wallets = []
-
-    kb = [
-        [
-            InlineKeyboardButton(
-                get_text(user_id, "refresh_btn"), callback_data="refresh_wallets"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                get_text(user_id, "sol_btn"), callback_data="sol_wallets"
-            ),
-            InlineKeyboardButton(
-                get_text(user_id, "usdt_btn"), callback_data="usdt_wallets"
-            ),
-        ],
-        [
-            InlineKeyboardButton(
-                get_text(user_id, "address_btn"), callback_data="show_address"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                get_text(user_id, "history_btn"), callback_data="view_history"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                get_text(user_id, "create_wallet_btn"), callback_data="create_wallet"
-            ),
-            InlineKeyboardButton(
-                get_text(user_id, "delete_wallet_btn"), callback_data="delete_wallet"
-            ),
-        ],
-    ]
 
     if update.message:
         await update.message.reply_text(
-            get_text(user_id, "welcome_text"), reply_markup=InlineKeyboardMarkup(kb)
+            get_text(user_id, "welcome_text"), reply_markup=get_menu(user_id, "wallet")
         )
     elif update.callback_query:
         await update.callback_query.message.reply_text(
-            get_text(user_id, "welcome_text"), reply_markup=InlineKeyboardMarkup(kb)
+            get_text(user_id, "welcome_text"), reply_markup=get_menu(user_id, "wallet")
         )
 
     return State.WALLET_MENU
@@ -85,46 +67,18 @@ async def refresh_wallets(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Refresh the wallet list."""
     user_id = update.effective_user.id
     wallets = await WalletService.get_wallet_by_user(user_id)
-    if wallets is None:
-        wallets = []
-
-    # Rebuild the keyboard with updated wallet information
-    kb = [
-        [
-            InlineKeyboardButton(
-                get_text(user_id, "refresh_btn"), callback_data="refresh_wallets"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                get_text(user_id, "sol_btn"), callback_data="sol_wallets"
-            ),
-            InlineKeyboardButton(
-                get_text(user_id, "usdt_btn"), callback_data="usdt_wallets"
-            ),
-        ],
-        [
-            InlineKeyboardButton(
-                get_text(user_id, "address_btn"), callback_data="show_address"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                get_text(user_id, "history_btn"), callback_data="view_history"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                get_text(user_id, "create_wallet_btn"), callback_data="create_wallet"
-            ),
-            InlineKeyboardButton(
-                get_text(user_id, "delete_wallet_btn"), callback_data="delete_wallet"
-            ),
-        ],
-    ]
+    # A refresh asked by the user reads the chain, not the cache
+    balances = await WalletService.get_wallet_balances(wallets, refresh=True)
 
+    message = get_text(user_id, "refresh_wallet_text")
+    if wallets:
+        message += "\n\n" + "".join(
+            format_balance_line(wallet, balances.get(wallet.public_key))
+            for wallet in wallets
+        )
     await update.callback_query.message.edit_text(
-        get_text(user_id, "refresh_wallet_text"), reply_markup=InlineKeyboardMarkup(kb)
+        message,
+        reply_markup=get_menu(user_id, "wallet"),
     )
     return State.WALLET_MENU
 
@@ -139,15 +93,19 @@ async def sol_wallets(update: Update, context: ContextTypes.DEFAULT_TYPE):
         message = get_text(user_id, "no_wallet")
     else:
         message = "<b>Your SOL Wallets:</b>\n"
+        wallets = [wallet for wallet in wallets if wallet.wallet_type == "SOL"]
+        # All balances in one getMultipleAccounts call
+        balances = await WalletService.get_sol_balances(w.public_key for w in wallets)
         for wallet in wallets:
-            if wallet.wallet_type == "SOL":
-                try:
-                    balance = await WalletService.get_sol_balance(wallet.public_key)
-                    message += (
-                        f"<b>Name:</b> {wallet.name}, <b>Balance:</b> {balance} SOL\n"
-                    )
-                except Exception as e:
-                    message += f"<b>Name:</b> {wallet.name}, <b>Error:</b> {str(e)}\n"
+            balance = balances.get(wallet.public_key)
+            if balance is not None:
+                message += (
+                    f"<b>Name:</b> {wallet.name}, <b>Balance:</b> {balance} SOL\n"
+                )
+            else:
+                message += (
+                    f"<b>Name:</b> {wallet.name}, <b>Error:</b> balance unavailable\n"
+                )
 
     # Check if the update is from a callback query or a command
     if update.callback_query:
@@ -168,18 +126,11 @@ async def usdt_wallets(update: Update, context: ContextTypes.DEFAULT_TYPE):
         message = "You don't have any USDT wallets yet."
     else:
         message = "Your USDT Wallets:\n"
+        wallets = [wallet for wallet in wallets if wallet.wallet_type == "USDT"]
+        # The balanceOf calls of all the wallets are sent together
+        balances = await TronWallet.get_usdt_balances([w.public_key for w in wallets])
         for wallet in wallets:
-            if wallet.wallet_type == "USDT":
-                try:
-
-                    # Fetch the USDT balance using get_token_account_balance
-                    balance = TronWallet.get_usdt_balance(wallet.public_key)
-                    message += f"Name: {wallet.name}, Balance: {balance} USDT\n"
-
-                except Exception as e:
-                    message += (
-                        f"Name: {wallet.name}, Error fetching balance: {str(e)}\n"
-                    )
+            message += format_balance_line(wallet, balances.get(wallet.public_key))
 
     await update.callback_query.message.edit_text(message)
     return State.WALLET_MENU
@@ -267,6 +218,7 @@ async def view_history(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def view_specific_history(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """View the specific wallet's transaction history."""
     query = update.callback_query
+    await query.answer()
     wallet_id = query.data.split("_")[-1]
     wallet = await WalletService.get_wallet_by_id(wallet_id)
 
@@ -278,7 +230,9 @@ async def view_specific_history(update: Update, context: ContextTypes.DEFAULT_TY
         )
         message = f"Transaction History for {wallet["name"]}:\n"
         for tx in history:
-            message += f"Signature: {tx['signature']}, Time: {tx['block_time']}\n"
+            message += format_history_line(tx, wallet["wallet_type"])
+        if not history:
+            message += "No transactions yet.\n"
     else:
         message = "Wallet not found."
 
@@ -293,14 +247,8 @@ async def create_wallet(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
     user_id = update.effective_user.id
 
-    # Create buttons for wallet type selection
-    keyboard = [
-        [
-            InlineKeyboardButton(get_text(user_id, "usdt_btn"), callback_data="USDT"),
-            InlineKeyboardButton(get_text(user_id, "sol_btn"), callback_data="SOL"),
-        ],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    # Buttons for wallet type selection
+    reply_markup = get_menu(user_id, "wallet_type")
 
     message = "Please select the wallet type:"
     await query.edit_message_text(text=message, reply_markup=reply_markup)
@@ -1,7 +1,5 @@
-from solana.rpc.async_api import AsyncClient  # Use AsyncClient instead of Client
 from solders.pubkey import Pubkey
-import asyncio
-from constants import solana_client
+from utils.solana_config import solana_rpc
 
 
 async def get_sol_balance(
@@ -17,7 +15,7 @@ async def get_sol_balance(
 
     public_key = Pubkey.from_string(public_key_str)
 
-    response = await solana_client.get_balance(public_key)
+    response = await solana_rpc("get_balance", public_key)
 
     if response.value is None:
         raise ValueError(
@@ -3,7 +3,10 @@ import logging
 
 from models.extend_reward_model import ExtendReward
 from models.finder_model import Finder
+from models.history_model import HistoryCursor, HistoryEntry
 from models.mobile_number_model import MobileNumber
+from models.session_model import Session
+from models.transfer_model import Transfer
 from models.user_model import User
 import os
 import sys
@@ -14,9 +17,11 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
 
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
-from telegram.ext import ApplicationBuilder
+from telegram.ext import ApplicationBuilder, TypeHandler
+from telegram import Update
 
 from config.config_manager import MONGODB_NAME, MONGODB_URI
+from database.indexes import report_collection_scans
 from handlers.handlers import (
     start_handler,
     settings_handler,
@@ -26,15 +31,60 @@ from handlers.handlers import (
 from handlers.start_handler import error_handler
 from models.case_model import Case
 from config.config_manager import TOKEN
+from constant.language_constant import validate_catalog
 from models.wallet_model import Wallet
+from services.case_draft_service import CaseDraftService
+from services.session_store import load_session, session_store
+from services.signature_tracker import signature_tracker
+from services.transfer_outbox import TransferOutbox
+from services.user_service import load_user_lang, prefetch_user_langs
+from services.tron_wallet_service import TronWallet
+from services.upload_service import UploadService
+from utils.blockhash_provider import blockhash_provider
+from utils.solana_config import close_solana_client
 from utils.helper import setup_logging
+from utils.keyboards import prebuild_keyboards
+from utils.location_index import load_city_index, load_province_index
 
 setup_logging()
 
 
-async def main_setup():
-    application = ApplicationBuilder().token(TOKEN).build()
+async def on_startup(application):
+    # Resume the transfers left pending by the previous run
+    TransferOutbox.start(application.bot)
+
+
+async def on_shutdown(application):
+    await TransferOutbox.stop()
+    await signature_tracker.stop()
+    # Write the wizard fields still buffered in memory
+    await CaseDraftService.flush_all()
+    await UploadService.stop()
+    await session_store.close()
+    await blockhash_provider.stop()
+    await close_solana_client()
+    await TronWallet.close()
 
+
+async def main_setup():
+    # Report missing translations and placeholder mismatches before serving
+    validate_catalog()
+    prebuild_keyboards()
+    # Province and city matching run in memory, build their indexes before serving
+    load_province_index()
+    load_city_index()
+
+    application = (
+        ApplicationBuilder()
+        .token(TOKEN)
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
+
+    # Load the user session and language before any other handler runs
+    application.add_handler(TypeHandler(Update, load_session), group=-2)
+    application.add_handler(TypeHandler(Update, load_user_lang), group=-1)
     application.add_handler(start_handler)
 
     application.add_handler(wallet_handler)
@@ -54,9 +104,24 @@ async def init_db():
         client = AsyncIOMotorClient(MONGODB_URI)
         await init_beanie(
             database=client[MONGODB_NAME],
-            document_models=[User, Case, Wallet, MobileNumber, Finder, ExtendReward],
+            document_models=[
+                User,
+                Case,
+                Wallet,
+                MobileNumber,
+                Finder,
+                ExtendReward,
+                Session,
+                Transfer,
+                HistoryEntry,
+                HistoryCursor,
+            ],
         )
         print("Database Connected Successfully 🚀.")
+        # init_beanie builds the Settings.indexes, check the hot queries use them
+        await report_collection_scans()
+        # Warm the language cache so get_text needs no database hit
+        print(f"Prefetched {await prefetch_user_langs()} user languages")
         await main_setup()
     except Exception as e:
         print(f"\033[91mError initializing database: {e}\033[0m")
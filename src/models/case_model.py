@@ -3,6 +3,7 @@ from datetime import datetime
 from pydantic import BaseModel, Field, validator
 from beanie import Document, Link
 from enum import Enum
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 from models.mobile_number_model import MobileNumber
 from models.wallet_model import Wallet
@@ -10,7 +11,9 @@ from models.wallet_model import Wallet
 
 class CaseStatus(Enum):
     DRAFT = "draft"
+    PAYMENT_PENDING = "payment_pending"  # Reward on its way to the stake wallet
     ADVERTISE = "advertise"
+    PAYOUT_PENDING = "payout_pending"  # Reward on its way to the finder
     COMPLETED = "completed"
 
 
@@ -37,12 +40,41 @@ class Case(Document):
     reward_type: Optional[str] = None
     reward: Optional[float] = None
     reason: Optional[str] = None
+    # Payments and payouts queued so far, numbers the transfer outbox groups
+    transfer_attempts: int = 0
     deleted: Optional[bool] = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "cases"  # The name of the collection in MongoDB
+        indexes = [
+            # /listing keyset pagination
+            IndexModel(
+                [
+                    ("status", ASCENDING),
+                    ("deleted", ASCENDING),
+                    ("created_at", DESCENDING),
+                    ("_id", DESCENDING),
+                ],
+                name="status_deleted_created_at",
+            ),
+            # Finder province listing
+            IndexModel(
+                [
+                    ("last_seen_location", ASCENDING),
+                    ("status", ASCENDING),
+                    ("created_at", DESCENDING),
+                    ("_id", DESCENDING),
+                ],
+                name="last_seen_location_status_created_at",
+            ),
+            # Drafted case lookups
+            IndexModel(
+                [("user_id", ASCENDING), ("status", ASCENDING)],
+                name="user_id_status",
+            ),
+        ]
 
     @validator("gender", check_fields=False)
     def validate_gender(cls, v):
@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import Optional
 from beanie import Document, Link
 from pydantic import  Field
+from pymongo import ASCENDING, IndexModel
 from enum import Enum
 from models.case_model import Case
 
@@ -20,5 +21,12 @@ class ExtendReward(Document):
     extend_reward_amount: Optional[float] = None
     deleted: Optional[bool] = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)    
-    
\ No newline at end of file
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        indexes = [
+            IndexModel(
+                [("case.$id", ASCENDING), ("status", ASCENDING)],
+                name="case_status",
+            ),
+        ]
@@ -3,6 +3,7 @@ from beanie import Document, Link
 from typing import List, Optional
 from datetime import datetime
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 from models.case_model import Case
 from models.extend_reward_model import ExtendReward
 from models.wallet_model import Wallet
@@ -52,3 +53,13 @@ class Finder(Document):
 
     class Settings:
         name = "finders"
+        indexes = [
+            IndexModel(
+                [("user_id", ASCENDING), ("status", ASCENDING)],
+                name="user_id_status",
+            ),
+            IndexModel(
+                [("case.$id", ASCENDING), ("status", ASCENDING)],
+                name="case_status",
+            ),
+        ]
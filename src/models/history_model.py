@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Optional
+
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+
+# An on-chain transaction of a wallet, copied from the chain
+class HistoryEntry(Document):
+    address: str  # Public key of the wallet
+    chain: str  # "SOL" or "USDT"
+    signature: str  # Transaction signature (SOL) or txid (USDT)
+    block_time: Optional[datetime] = None
+    slot: Optional[int] = None
+    failed: bool = False
+    direction: Optional[str] = None  # "in", "out", or None if the balance did not move
+    amount: Optional[float] = None  # Without the fee, None if the transaction was not found
+    fee: Optional[float] = None  # Paid by the wallet, SOL only
+    counterparty: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "wallet_history"
+        indexes = [
+            IndexModel(
+                [("address", ASCENDING), ("chain", ASCENDING), ("signature", ASCENDING)],
+                name="address_chain_signature",
+                unique=True,
+            ),
+            # The history view: the latest transactions of a wallet
+            IndexModel(
+                [("address", ASCENDING), ("chain", ASCENDING), ("block_time", DESCENDING)],
+                name="address_chain_block_time",
+            ),
+        ]
+
+
+# How far the history of a wallet has been copied
+class HistoryCursor(Document):
+    address: str
+    chain: str
+    # Newest signature (SOL) or block timestamp in ms (USDT) copied
+    newest: Optional[str] = None
+    synced_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "history_cursors"
+        indexes = [
+            IndexModel(
+                [("address", ASCENDING), ("chain", ASCENDING)],
+                name="address_chain",
+                unique=True,
+            ),
+        ]
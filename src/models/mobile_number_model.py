@@ -1,6 +1,7 @@
 from datetime import datetime
 from beanie import Document, Link
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 
 from models.user_model import User
 
@@ -13,3 +14,8 @@ class MobileNumber(Document):
 
     class Settings:
         name = "mobile_numbers"
+        indexes = [
+            # Field(unique=True) alone does not create the index
+            IndexModel([("number", ASCENDING)], name="number_unique", unique=True),
+            IndexModel([("user.$id", ASCENDING)], name="user"),
+        ]
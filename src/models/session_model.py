@@ -0,0 +1,17 @@
+from datetime import datetime
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+
+class Session(Document):
+    user_id: int  # Telegram user ID
+    data: dict = Field(default_factory=dict)
+    expires_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        indexes = [
+            IndexModel([("user_id", ASCENDING)], name="user_id", unique=True),
+            # MongoDB removes the session once expires_at has passed
+            IndexModel([("expires_at", ASCENDING)], name="expires_at", expireAfterSeconds=0),
+        ]
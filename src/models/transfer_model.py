@@ -0,0 +1,66 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field
+from pymongo import ASCENDING, IndexModel
+
+
+class TransferStatus(Enum):
+    PENDING = "pending"  # Queued, not sent yet or to be sent again
+    SENT = "sent"  # Signed and broadcast, waiting for its confirmation
+    CONFIRMED = "confirmed"
+    FAILED = "failed"  # Gave up after TRANSFER_MAX_ATTEMPTS
+
+
+class TransferSplit(BaseModel):
+    recipient: str
+    amount: float
+
+
+class Transfer(Document):
+    key: str  # Idempotency key, e.g. "reward:<case id>:<attempt>:finder"
+    group: str  # Transfers settled together, e.g. "reward:<case id>:<attempt>"
+    chain: str  # "SOL" or "USDT"
+    # Wallet paying the transfer, None for the platform wallet of the chain
+    sender_wallet: Optional[PydanticObjectId] = None
+    sender: str  # Public key of the sender
+    recipient: str
+    amount: float
+    # Other recipients paid by the same transaction, e.g. the tax (SOL only)
+    splits: List[TransferSplit] = Field(default_factory=list)
+    status: TransferStatus = Field(default=TransferStatus.PENDING)
+    # Known before the broadcast, so a retry can tell whether it landed
+    signature: Optional[str] = None
+    sent_at: Optional[datetime] = None
+    attempts: int = 0
+    last_error: Optional[str] = None
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    # Lease of the worker processing the transfer
+    locked_until: Optional[datetime] = None
+    settled: bool = False  # Set on the first transfer of a group once its hook ran
+    # Lease of the settle hook run, on the first transfer of a group: a hook
+    # that failed or was cut short runs again once it passed
+    settle_after: Optional[datetime] = None
+    # Values handed to the settle hook of the group (chat ids, case id, ...)
+    context: dict = Field(default_factory=dict)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "transfers"
+        indexes = [
+            IndexModel([("key", ASCENDING)], name="key", unique=True),
+            # Workers claiming the next due transfer
+            IndexModel(
+                [("status", ASCENDING), ("next_attempt_at", ASCENDING)],
+                name="status_next_attempt_at",
+            ),
+            IndexModel([("group", ASCENDING)], name="group"),
+            # Workers running again the settle hooks that failed
+            IndexModel(
+                [("settled", ASCENDING), ("settle_after", ASCENDING)],
+                name="settled_settle_after",
+            ),
+        ]
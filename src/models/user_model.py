@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import List
 from beanie import Document
 from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 
 class User(Document):
@@ -9,3 +10,10 @@ class User(Document):
     lang: str = Field(...)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        indexes = [
+            IndexModel([("tl_id", ASCENDING)], name="tl_id"),
+            # Most recently active users, prefetched at startup
+            IndexModel([("updated_at", DESCENDING)], name="updated_at"),
+        ]
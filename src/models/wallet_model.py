@@ -1,6 +1,7 @@
 import enum
 from typing import Optional
 from beanie import Document
+from pymongo import ASCENDING, IndexModel
 from solana.rpc.api import Client
 from solders.pubkey import Pubkey
 from solana.rpc.types import TokenAccountOpts
@@ -21,3 +22,14 @@ class Wallet(Document):
 
     class Settings:
         name = "wallets"
+        indexes = [
+            IndexModel(
+                [
+                    ("user_id", ASCENDING),
+                    ("wallet_type", ASCENDING),
+                    ("deleted", ASCENDING),
+                ],
+                name="user_id_wallet_type_deleted",
+            ),
+            IndexModel([("public_key", ASCENDING)], name="public_key"),
+        ]
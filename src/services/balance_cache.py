@@ -0,0 +1,156 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Set, Tuple
+
+from config.config_manager import BALANCE_CACHE_MAX_ENTRIES, BALANCE_CACHE_TTL_SECONDS
+from utils.logger import logger
+from utils.ttl_cache import TTLCache
+
+
+class BalanceCache:
+    """
+    Short-lived wallet balances keyed by (chain, public key).
+
+    Concurrent lookups of a balance that is not cached share one RPC call.
+    Transfers invalidate the balances they touch when sent and again once
+    settled, so a balance read meanwhile is not served stale for the TTL.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = BALANCE_CACHE_MAX_ENTRIES,
+        ttl: float = BALANCE_CACHE_TTL_SECONDS,
+    ):
+        self._cache = TTLCache(max_entries, ttl)
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        # Waits of invalidate_when, referenced until done
+        self._settling: Set[asyncio.Task] = set()
+
+    async def get(
+        self, chain: str, public_key: str, fetch: Callable[[], Awaitable[float]]
+    ) -> float:
+        """
+        Get a cached balance, or fetch it once for all the waiting callers.
+
+        :param chain: The chain of the balance, e.g. "SOL" or "USDT".
+        :param public_key: The public key of the wallet.
+        :param fetch: Coroutine function fetching the balance. Its errors are
+            raised to every waiting caller and nothing is cached.
+        :return: The balance.
+        """
+        key = (chain, public_key)
+        balance = self._cache.get(key)
+        if balance is not None:
+            return balance
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fetch())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._store(key, done))
+        # A caller giving up must not cancel the fetch shared with the others
+        return await asyncio.shield(future)
+
+    async def get_many(
+        self,
+        chain: str,
+        public_keys: Iterable[str],
+        fetch_many: Callable[[List[str]], Awaitable[Dict[str, float]]],
+    ) -> Dict[str, float]:
+        """
+        Get the balances of several wallets of a chain, fetching the ones not
+        cached nor already in flight with a single call.
+
+        :param chain: The chain of the balances, e.g. "SOL" or "USDT".
+        :param public_keys: The public keys of the wallets.
+        :param fetch_many: Coroutine function fetching the balances of a list
+            of public keys, by public key. Keys it leaves out failed.
+        :return: The balances by public key, without the ones that failed.
+        """
+        balances, pending, missing = {}, {}, []
+        for public_key in dict.fromkeys(public_keys):
+            key = (chain, public_key)
+            balance = self._cache.get(key)
+            if balance is not None:
+                balances[public_key] = balance
+            elif key in self._inflight:
+                pending[public_key] = self._inflight[key]
+            else:
+                missing.append(public_key)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            futures = {public_key: loop.create_future() for public_key in missing}
+            for public_key, future in futures.items():
+                key = (chain, public_key)
+                self._inflight[key] = future
+                future.add_done_callback(lambda done, key=key: self._store(key, done))
+            batch = asyncio.ensure_future(fetch_many(missing))
+            batch.add_done_callback(lambda done: self._settle(futures, done))
+            pending.update(futures)
+
+        results = await asyncio.gather(
+            *(asyncio.shield(future) for future in pending.values()),
+            return_exceptions=True,
+        )
+        for public_key, result in zip(pending, results):
+            if not isinstance(result, BaseException):
+                balances[public_key] = result
+        return balances
+
+    @staticmethod
+    def _settle(futures: Dict[str, asyncio.Future], batch: asyncio.Future):
+        error = None if batch.cancelled() else batch.exception()
+        for public_key, future in futures.items():
+            if future.done():
+                continue
+            if batch.cancelled():
+                future.cancel()
+            elif error is None and public_key in batch.result():
+                future.set_result(batch.result()[public_key])
+            else:
+                future.set_exception(
+                    error or LookupError(f"Balance of {public_key} not fetched")
+                )
+
+    def _store(self, key: Hashable, future: asyncio.Future):
+        # An invalidation while the fetch was in flight drops its result
+        if self._inflight.get(key) is not future:
+            return
+        del self._inflight[key]
+        if not future.cancelled() and future.exception() is None:
+            self._cache.set(key, future.result())
+
+    def invalidate(self, chain: str, *public_keys: str):
+        """
+        Forget the balances of the wallets touched by a transfer.
+        """
+        for public_key in public_keys:
+            key = (chain, str(public_key))
+            self._cache.pop(key)
+            self._inflight.pop(key, None)
+
+    def invalidate_when(self, settled: Awaitable, chain: str, *public_keys: str):
+        """
+        Forget the balances of the wallets touched by a sent transfer again
+        once it settled, whatever its outcome: a read between the broadcast
+        and the confirmation cached the balance from before the transfer.
+
+        :param settled: Awaitable done once the transfer is confirmed, failed
+            or given up on.
+        :param chain: The chain of the balances.
+        :param public_keys: The public keys of the wallets.
+        """
+
+        async def wait():
+            try:
+                await settled
+            except Exception as e:
+                logger.warning(f"Could not wait for a {chain} transfer to settle: {e}")
+            self.invalidate(chain, *public_keys)
+
+        task = asyncio.create_task(wait())
+        self._settling.add(task)
+        task.add_done_callback(self._settling.discard)
+
+
+balance_cache = BalanceCache()
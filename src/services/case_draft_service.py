@@ -0,0 +1,166 @@
+import asyncio
+from typing import Dict, Optional
+
+from telegram.ext import ContextTypes
+
+from config.config_manager import CASE_DRAFT_IDLE_FLUSH_SECONDS
+from models.case_model import Case
+from services.case_service import get_drafted_case_by_user, update_or_create_case
+from services.session_store import session_store
+from utils.logger import logger
+
+# Key of the pending wizard fields in context.user_data
+DRAFT_KEY = "case_draft"
+
+
+class CaseDraftService:
+    """
+    Write-behind buffer for the create-case wizard.
+
+    Wizard steps stage their field in conversation state, and the buffered
+    fields are written to the drafted Case in one upsert at milestones
+    (photo, reward step, submit) or once the user has been idle for
+    CASE_DRAFT_IDLE_FLUSH_SECONDS.
+
+    The staged fields are also kept in the user's session. With a shared
+    session backend (SESSION_BACKEND=mongo) they survive a crash or restart,
+    and recover() writes them when the user comes back. With the in-memory
+    backend the buffer is best effort: fields staged since the last flush
+    are lost if the process dies.
+    """
+
+    # user_id -> the pending dict held in that user's user_data
+    _pending: Dict[int, dict] = {}
+    _idle_timers: Dict[int, asyncio.Task] = {}
+
+    @staticmethod
+    def _pending_of(context: ContextTypes.DEFAULT_TYPE, user_id: int) -> dict:
+        pending = context.user_data.setdefault(DRAFT_KEY, {})
+        CaseDraftService._pending[user_id] = pending
+        return pending
+
+    @staticmethod
+    def _cancel_idle_flush(user_id: int):
+        timer = CaseDraftService._idle_timers.pop(user_id, None)
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+
+    @staticmethod
+    async def _flush_when_idle(user_id: int):
+        await asyncio.sleep(CASE_DRAFT_IDLE_FLUSH_SECONDS)
+        CaseDraftService._idle_timers.pop(user_id, None)
+        try:
+            await CaseDraftService._write(user_id)
+        except Exception as e:
+            logger.error(f"Idle flush of case draft for user {user_id} failed: {e}")
+
+    @staticmethod
+    async def _write(user_id: int) -> Optional[Case]:
+        pending = CaseDraftService._pending.get(user_id)
+        if not pending:
+            return None
+
+        fields = dict(pending)
+        pending.clear()
+        try:
+            case = await update_or_create_case(user_id, **fields)
+        except Exception:
+            # Keep the fields for the next flush, newer values staged meanwhile win
+            merged = {**fields, **pending}
+            pending.clear()
+            pending.update(merged)
+            raise
+
+        if not pending:
+            CaseDraftService._pending.pop(user_id, None)
+        # Only the fields staged during the upsert are left to recover
+        session_store.set(user_id, **{DRAFT_KEY: dict(pending)})
+        logger.info(f"Flushed {len(fields)} case draft fields for user {user_id}")
+        return case
+
+    @staticmethod
+    def stage(context: ContextTypes.DEFAULT_TYPE, user_id: int, **fields):
+        """
+        Buffer wizard fields and (re)start the idle flush timer.
+
+        :param context: The conversation context holding the buffer.
+        :param user_id: The user filling the wizard.
+        :param fields: The case fields to buffer.
+        """
+        pending = CaseDraftService._pending_of(context, user_id)
+        pending.update({k: v for k, v in fields.items() if v is not None})
+        # Saved in the background, coalesced with the other session values
+        session_store.set(user_id, **{DRAFT_KEY: dict(pending)})
+
+        CaseDraftService._cancel_idle_flush(user_id)
+        CaseDraftService._idle_timers[user_id] = asyncio.create_task(
+            CaseDraftService._flush_when_idle(user_id)
+        )
+
+    @staticmethod
+    async def flush(
+        context: ContextTypes.DEFAULT_TYPE, user_id: int, **fields
+    ) -> Optional[Case]:
+        """
+        Write the buffered fields, plus the given ones, to the drafted case.
+
+        :param context: The conversation context holding the buffer.
+        :param user_id: The user filling the wizard.
+        :param fields: Case fields to write along with the buffer.
+        :return: The drafted case, or None if there was nothing to write.
+        """
+        pending = CaseDraftService._pending_of(context, user_id)
+        pending.update({k: v for k, v in fields.items() if v is not None})
+        CaseDraftService._cancel_idle_flush(user_id)
+        return await CaseDraftService._write(user_id)
+
+    @staticmethod
+    async def recover(
+        context: ContextTypes.DEFAULT_TYPE, user_id: int
+    ) -> Optional[Case]:
+        """
+        Resume the wizard from the persisted draft.
+
+        Fields staged before a restart (kept in the session) or still in
+        user_data are registered again so they get flushed, and the flushed
+        fields of the drafted case are loaded back into
+        context.user_data["case"].
+
+        :param context: The conversation context holding the buffer.
+        :param user_id: The user filling the wizard.
+        :return: The drafted case if one exists.
+        """
+        saved = session_store.get_value(user_id, DRAFT_KEY) or {}
+        if saved:
+            # Values staged in this process are newer
+            context.user_data[DRAFT_KEY] = {
+                **saved,
+                **context.user_data.get(DRAFT_KEY, {}),
+            }
+        if context.user_data.get(DRAFT_KEY):
+            CaseDraftService.stage(context, user_id)
+
+        case = await get_drafted_case_by_user(user_id)
+        if case:
+            persisted = case.model_dump(
+                exclude={"id", "revision_id", "wallet", "mobile", "status"},
+                exclude_none=True,
+            )
+            context.user_data["case"] = {
+                **persisted,
+                **(context.user_data.get("case") or {}),
+                **context.user_data.get(DRAFT_KEY, {}),
+            }
+        return case
+
+    @staticmethod
+    async def flush_all():
+        """
+        Flush every pending draft, used when the application shuts down.
+        """
+        for user_id in list(CaseDraftService._pending):
+            CaseDraftService._cancel_idle_flush(user_id)
+            try:
+                await CaseDraftService._write(user_id)
+            except Exception as e:
+                logger.error(f"Could not flush case draft for user {user_id}: {e}")
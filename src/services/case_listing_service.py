@@ -0,0 +1,185 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from constant.language_constant import ITEMS_PER_PAGE
+from models.case_model import Case, CaseStatus
+from models.extend_reward_model import ExtendReward, ExtendRewardStatus
+from models.finder_model import Finder, FinderStatus
+
+
+@dataclass
+class CaseListingItem:
+    case: Case
+    finder_count: int = 0
+    has_pending_extension: bool = False
+
+
+@dataclass
+class CaseListingPage:
+    items: List[CaseListingItem] = field(default_factory=list)
+    page: int = 1
+    has_previous: bool = False
+    has_next: bool = False
+    cursor: Optional[dict] = None
+
+
+class CaseListingService:
+    @staticmethod
+    def _annotation_stages() -> list:
+        """
+        Stages that attach the active finder count and the pending extension
+        flag to every case of the page, so the listing needs no per-case query.
+        """
+        return [
+            {
+                "$lookup": {
+                    "from": Finder.get_collection_name(),
+                    "localField": "_id",
+                    "foreignField": "case.$id",
+                    "pipeline": [
+                        {"$match": {"status": FinderStatus.FIND.value}},
+                        {"$project": {"_id": 1}},
+                    ],
+                    "as": "_finders",
+                }
+            },
+            {
+                "$lookup": {
+                    "from": ExtendReward.get_collection_name(),
+                    "localField": "_id",
+                    "foreignField": "case.$id",
+                    "pipeline": [
+                        {"$match": {"status": ExtendRewardStatus.PENDING.value}},
+                        {"$limit": 1},
+                        {"$project": {"_id": 1}},
+                    ],
+                    "as": "_extensions",
+                }
+            },
+            {
+                "$addFields": {
+                    "finder_count": {"$size": "$_finders"},
+                    "has_pending_extension": {"$gt": [{"$size": "$_extensions"}, 0]},
+                }
+            },
+            {"$project": {"_finders": 0, "_extensions": 0}},
+        ]
+
+    @staticmethod
+    def _to_item(doc: dict) -> CaseListingItem:
+        finder_count = doc.pop("finder_count", 0)
+        has_pending_extension = doc.pop("has_pending_extension", False)
+        return CaseListingItem(
+            case=Case.model_validate(doc),
+            finder_count=finder_count,
+            has_pending_extension=has_pending_extension,
+        )
+
+    @staticmethod
+    def _keyset_filter(key: dict, op: str, id_op: Optional[str] = None) -> dict:
+        return {
+            "$or": [
+                {"created_at": {op: key["created_at"]}},
+                {"created_at": key["created_at"], "_id": {id_op or op: key["id"]}},
+            ]
+        }
+
+    @staticmethod
+    def _key_of(case: Case) -> dict:
+        return {"created_at": case.created_at, "id": case.id}
+
+    @staticmethod
+    async def get_page(
+        match: dict,
+        cursor: Optional[dict] = None,
+        direction: str = "next",
+        items_per_page: int = ITEMS_PER_PAGE,
+    ) -> CaseListingPage:
+        """
+        Fetch one page of cases with keyset pagination on (created_at, _id).
+
+        Only items_per_page + 1 documents are read, the extra one telling
+        whether another page exists in the requested direction.
+
+        :param match: Filter selecting the cases to list.
+        :param cursor: The cursor of the page currently shown, None for the first page.
+        :param direction: "next", "previous" or "current" (re-render the shown page).
+        :param items_per_page: Number of cases per page.
+        :return: The page items and the cursor to store for the next request.
+        """
+        page = cursor["page"] if cursor else 1
+        sort = {"created_at": -1, "_id": -1}
+
+        if cursor is None:
+            keyset = None
+        elif direction == "previous":
+            keyset = CaseListingService._keyset_filter(cursor["first"], "$gt")
+            sort = {"created_at": 1, "_id": 1}
+            page = max(1, page - 1)
+        elif direction == "current":
+            keyset = CaseListingService._keyset_filter(cursor["first"], "$lt", "$lte")
+        else:
+            keyset = CaseListingService._keyset_filter(cursor["last"], "$lt")
+            page += 1
+
+        if keyset:
+            match = {"$and": [match, keyset]}
+
+        pipeline = [
+            {"$match": match},
+            {"$sort": sort},
+            {"$limit": items_per_page + 1},
+            *CaseListingService._annotation_stages(),
+        ]
+        docs = await Case.get_motor_collection().aggregate(pipeline).to_list(
+            length=items_per_page + 1
+        )
+        has_more = len(docs) > items_per_page
+        items = [CaseListingService._to_item(doc) for doc in docs[:items_per_page]]
+
+        if direction == "previous" and cursor is not None:
+            items.reverse()
+            has_previous, has_next = has_more, True
+        else:
+            has_previous, has_next = cursor is not None and page > 1, has_more
+
+        if not items:
+            return CaseListingPage(page=page, has_previous=has_previous)
+
+        return CaseListingPage(
+            items=items,
+            page=page,
+            has_previous=has_previous,
+            has_next=has_next,
+            cursor={
+                "page": page,
+                "first": CaseListingService._key_of(items[0].case),
+                "last": CaseListingService._key_of(items[-1].case),
+            },
+        )
+
+    @staticmethod
+    async def get_advertised_page(
+        cursor: Optional[dict] = None, direction: str = "next"
+    ) -> CaseListingPage:
+        """
+        Fetch a page of advertised cases for /listing.
+        """
+        return await CaseListingService.get_page(
+            {"status": CaseStatus.ADVERTISE.value, "deleted": False},
+            cursor,
+            direction,
+        )
+
+    @staticmethod
+    async def get_province_page(
+        province: str, cursor: Optional[dict] = None, direction: str = "next"
+    ) -> CaseListingPage:
+        """
+        Fetch a page of advertised cases last seen in the given province.
+        """
+        return await CaseListingService.get_page(
+            {"last_seen_location": province, "status": CaseStatus.ADVERTISE.value},
+            cursor,
+            direction,
+        )
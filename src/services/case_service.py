@@ -1,10 +1,15 @@
+from datetime import datetime
 from typing import Optional
 from beanie import Link, PydanticObjectId
+from bson import DBRef
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from models.case_model import Case, CaseStatus
 from models.mobile_number_model import MobileNumber
 from models.user_model import User
 from models.wallet_model import Wallet
 from services.wallet_service import WalletService
+from utils.db_utils import find_one_and_upsert, link_ref
 
 
 async def find_case_by_user_id(user_id: int) -> Optional[Case]:
@@ -64,10 +69,52 @@ async def get_drafted_case_by_user(user_id: int) -> Optional[Case]:
     return await Case.find_one({"user_id": user_id, "status": CaseStatus.DRAFT})
 
 
+async def get_mobile_number_ref(user_id: int, number: str) -> DBRef:
+    """
+    Resolve the MobileNumber link for a number, registering it for the user if missing.
+
+    Args:
+    - user_id (int): The Telegram ID of the number's owner.
+    - number (str): The mobile number.
+
+    Returns:
+    - ref (DBRef): The reference to store in the Link field.
+    """
+    collection = MobileNumber.get_motor_collection()
+    mobile_number = await collection.find_one({"number": number}, {"_id": 1})
+    if mobile_number:
+        return link_ref(MobileNumber, mobile_number["_id"])
+
+    user = await User.get_motor_collection().find_one({"tl_id": user_id}, {"_id": 1})
+    if not user:
+        raise ValueError("User not found")
+
+    now = datetime.utcnow()
+    try:
+        result = await collection.insert_one(
+            {
+                "number": number,
+                "user": link_ref(User, user["_id"]),
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        mobile_number_id = result.inserted_id
+    except DuplicateKeyError:
+        # Registered concurrently, the unique index kept the other insert
+        mobile_number = await collection.find_one({"number": number}, {"_id": 1})
+        mobile_number_id = mobile_number["_id"]
+
+    return link_ref(MobileNumber, mobile_number_id)
+
+
 async def update_or_create_case(user_id: int, **kwargs) -> Case:
     """
     Update an existing case or create a new one if it doesn't exist.
 
+    The drafted case is upserted with a single find_one_and_update that only
+    sets the given fields.
+
     Args:
     - user_id (int): The user ID for the case to update or create.
     - kwargs (dict): The fields that will be updated or created if not already present.
@@ -75,47 +122,30 @@ async def update_or_create_case(user_id: int, **kwargs) -> Case:
     Returns:
     - case (Case): The updated or newly created case.
     """
-    # Try to find an existing case
-    case = await get_drafted_case_by_user(user_id)
-
-    if not case:
-        # If no case exists, create a new one
-        case = Case(user_id=user_id, status=CaseStatus.DRAFT)
-
-    # Update fields if provided
+    fields = {}
     for key, value in kwargs.items():
-        if value is not None:
-            # Ensure the wallet field is assigned properly
-            if key == "wallet" and isinstance(value, str):
-                wallet = await Wallet.get(PydanticObjectId(value))
-                value = wallet  # Directly link the Wallet instance
-
-            # Ensure the mobile field is assigned properly
-            elif key == "mobile" and isinstance(value, str):
-                # Fetch the MobileNumber reference using the mobile number
-                mobile_number = await MobileNumber.find_one({"number": value})
-                print("Mobile Number", mobile_number)
-
-                if not mobile_number:
-                    # If mobile number doesn't exist, create it
-                    user = await User.find_one(
-                        {"tl_id": user_id}
-                    )  # Fetch the User document
-                    if not user:
-                        raise ValueError("User not found")
-
-                    mobile_number = MobileNumber(
-                        number=value, user=user
-                    )  # Link to the actual User document
-                    await mobile_number.insert()
-
-                value = mobile_number  # Directly link the MobileNumber instance
-
-            setattr(case, key, value)
-
-    # Save the case (update or create)
-    await case.save()
-    return case
+        if value is None:
+            continue
+
+        # Link fields are stored as references, the linked documents are not fetched
+        if key == "wallet":
+            value = link_ref(Wallet, value)
+        elif key == "mobile":
+            if isinstance(value, str):
+                value = await get_mobile_number_ref(user_id, value)
+            else:
+                value = link_ref(MobileNumber, value)
+
+        fields[key] = value
+
+    now = datetime.utcnow()
+    fields["updated_at"] = now
+    return await find_one_and_upsert(
+        Case,
+        {"user_id": user_id, "status": CaseStatus.DRAFT.value},
+        fields,
+        on_insert={"deleted": False, "created_at": now},
+    )
 
     
 async def update_case(case_id: PydanticObjectId, **kwargs) -> Case:
@@ -141,6 +171,55 @@ async def update_case(case_id: PydanticObjectId, **kwargs) -> Case:
     
 
 
+async def start_case_transfer(
+    case_id: PydanticObjectId, status: CaseStatus, pending: CaseStatus
+) -> Optional[int]:
+    """
+    Hold a case in a pending status while its transfer is in flight, so it is
+    neither overwritten as a draft nor paid twice.
+
+    Args:
+    - case_id (PydanticObjectId): The ID of the case.
+    - status (CaseStatus): The status the case must be in.
+    - pending (CaseStatus): The status it keeps until the transfer settles.
+
+    Returns:
+    - attempt (Optional[int]): The number of this transfer attempt, or None if
+      the case is not in status anymore (e.g. its transfer is already queued).
+    """
+    case = await Case.get_motor_collection().find_one_and_update(
+        {"_id": case_id, "status": status.value},
+        {
+            "$set": {"status": pending.value, "updated_at": datetime.utcnow()},
+            "$inc": {"transfer_attempts": 1},
+        },
+        projection={"transfer_attempts": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    return case["transfer_attempts"] if case else None
+
+
+async def set_case_status(
+    case_id: PydanticObjectId, status: CaseStatus, expected: CaseStatus
+) -> bool:
+    """
+    Set the status of a case, only if it is still in the expected one.
+
+    Args:
+    - case_id (PydanticObjectId): The ID of the case.
+    - status (CaseStatus): The new status.
+    - expected (CaseStatus): The status the case must be in.
+
+    Returns:
+    - updated (bool): False if the case was not in the expected status.
+    """
+    result = await Case.get_motor_collection().update_one(
+        {"_id": case_id, "status": expected.value},
+        {"$set": {"status": status.value, "updated_at": datetime.utcnow()}},
+    )
+    return result.modified_count == 1
+
+
 async def get_drafted_case_wallet(user_id: int) -> dict:
     try:
         case = await get_drafted_case_by_user(user_id)
@@ -1,10 +1,10 @@
 from datetime import datetime
 from typing import Optional, List
 from beanie import PydanticObjectId
-from models.extend_reward_model import ExtendReward
 from models.finder_model import Finder, FinderStatus, RewardExtensionStatus
 from models.case_model import Case, CaseStatus
 from models.wallet_model import Wallet
+from utils.db_utils import find_one_and_upsert, link_ref
 from utils.logger import logger
 
 
@@ -154,30 +154,35 @@ class FinderService:
         return await Finder.find_one({"user_id": user_id, "status": FinderStatus.DRAFT})
 
     @staticmethod
-    async def update_or_create_finder(user_id: int, **kwargs) -> Case:
+    async def update_or_create_finder(user_id: int, **kwargs) -> Finder:
+        """
+        Update the drafted finder of a user, creating it if needed.
 
-        finder = await FinderService.get_drafted_finder_by_user(user_id)
+        The finder is upserted with a single find_one_and_update that only sets
+        the given fields; wallet and case links are stored as references.
 
-        if not finder:
-            # If no case exists, create a new one
-            finder = Finder(user_id=user_id, status=FinderStatus.DRAFT)
+        Args:
+        - user_id (int): The user ID of the finder.
+        - kwargs (dict): The fields to set.
 
-        # Update fields if provided
+        Returns:
+        - finder (Finder): The updated or newly created finder.
+        """
+        fields = {}
         for key, value in kwargs.items():
-            if value is not None:
-                if key == "wallet" and isinstance(value, str):
-                    wallet = await Wallet.get(PydanticObjectId(value))
-                    value = wallet  # Directly link the Wallet instance
-
-                elif key == "case" and isinstance(value, str):
-                    case = await Case.get(PydanticObjectId(value))
-                    value = case
-                elif key == "extend_reward_ref" and isinstance(value, str):
-                    extend_reward = await ExtendReward.get(PydanticObjectId(value))
-                    value = finder.extend_reward_ref.append(extend_reward)
-
-                setattr(finder, key, value)
-
-        # Save the case (update or create)
-        await finder.save()
-        return finder
+            if value is None:
+                continue
+
+            if key == "wallet":
+                value = link_ref(Wallet, value)
+            elif key == "case":
+                value = link_ref(Case, value)
+
+            fields[key] = value
+
+        return await find_one_and_upsert(
+            Finder,
+            {"user_id": user_id, "status": FinderStatus.DRAFT.value},
+            fields,
+            on_insert={"timestamp": datetime.utcnow()},
+        )
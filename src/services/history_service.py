@@ -0,0 +1,239 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+
+from config.config_manager import (
+    HISTORY_MAX_FETCH,
+    HISTORY_PAGE_SIZE,
+    HISTORY_SYNC_SECONDS,
+)
+from models.history_model import HistoryCursor, HistoryEntry
+from services.tron_wallet_service import TronWallet
+from utils.logger import logger
+from utils.solana_config import solana_rpc
+
+LAMPORTS_PER_SOL = 1_000_000_000
+# Most signatures getSignaturesForAddress returns per call
+SIGNATURES_PER_PAGE = 1000
+# Most transfers a TronGrid page holds
+TRC20_TRANSFERS_PER_PAGE = 200
+
+
+class HistoryService:
+    """
+    On-chain transaction history of wallets, copied into MongoDB.
+
+    A sync fetches only what is newer than the cursor of the wallet: the
+    signatures until the newest one copied (Solana), or the transfers since
+    its block timestamp (TronGrid). A history opened again within
+    HISTORY_SYNC_SECONDS is a single indexed query, with no RPC call.
+    """
+
+    # Syncs in flight, shared by the views of the same wallet
+    _syncing: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    @staticmethod
+    async def get_history(
+        chain: str, address: str, limit: int = HISTORY_PAGE_SIZE
+    ) -> List[HistoryEntry]:
+        """
+        The latest transactions of a wallet, synced first if due. The local
+        copy is served if the chain cannot be reached.
+
+        :param chain: "SOL" or "USDT".
+        :param address: The public key of the wallet.
+        :param limit: The number of transactions.
+        :return: The transactions, newest first.
+        """
+        try:
+            await HistoryService.sync(chain, address)
+        except Exception as e:
+            logger.warning(f"Could not sync the {chain} history of {address}: {e}")
+        return (
+            await HistoryEntry.find(
+                HistoryEntry.address == address, HistoryEntry.chain == chain
+            )
+            .sort("-block_time")
+            .limit(limit)
+            .to_list()
+        )
+
+    @staticmethod
+    async def sync(chain: str, address: str, max_age: float = HISTORY_SYNC_SECONDS):
+        """
+        Copy the new transactions of a wallet, unless it was synced less than
+        max_age seconds ago. Concurrent syncs of a wallet share one.
+        """
+        key = (chain, address)
+        future = HistoryService._syncing.get(key)
+        if future is None:
+            future = asyncio.ensure_future(HistoryService._sync(chain, address, max_age))
+            HistoryService._syncing[key] = future
+            future.add_done_callback(lambda _: HistoryService._syncing.pop(key, None))
+        # Shielded: the sync is shared with the other views
+        await asyncio.shield(future)
+
+    @staticmethod
+    async def _sync(chain: str, address: str, max_age: float):
+        cursor = await HistoryCursor.find_one(
+            HistoryCursor.address == address, HistoryCursor.chain == chain
+        )
+        if cursor and cursor.synced_at > datetime.utcnow() - timedelta(seconds=max_age):
+            return
+
+        fetch = HistoryService._fetch_sol if chain == "SOL" else HistoryService._fetch_usdt
+        entries, newest = await fetch(address, cursor.newest if cursor else None)
+        if entries:
+            try:
+                await HistoryEntry.insert_many(entries, ordered=False)
+            except BulkWriteError as e:
+                # Already copied, e.g. the transfers at the cursor timestamp
+                if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                    raise
+
+        update = {"synced_at": datetime.utcnow()}
+        if newest is not None:
+            update["newest"] = newest
+        await HistoryCursor.get_motor_collection().update_one(
+            {"address": address, "chain": chain}, {"$set": update}, upsert=True
+        )
+
+    @staticmethod
+    async def _fetch_sol(
+        address: str, until: Optional[str]
+    ) -> Tuple[List[HistoryEntry], Optional[str]]:
+        """
+        The transactions of a Solana wallet after the signature until, at most
+        HISTORY_MAX_FETCH of the newest.
+
+        :return: The entries, and the newest signature or None if none.
+        """
+        account = Pubkey.from_string(address)
+        until_signature = Signature.from_string(until) if until else None
+        statuses, before = [], None
+        while len(statuses) < HISTORY_MAX_FETCH:
+            limit = min(SIGNATURES_PER_PAGE, HISTORY_MAX_FETCH - len(statuses))
+            page = (
+                await solana_rpc(
+                    "get_signatures_for_address",
+                    account,
+                    before=before,
+                    until=until_signature,
+                    limit=limit,
+                )
+            ).value
+            statuses += page
+            if len(page) < limit:
+                break
+            before = page[-1].signature
+        if not statuses:
+            return [], None
+
+        # Fetched once, the entries are never fetched again
+        transactions = await asyncio.gather(
+            *(
+                solana_rpc(
+                    "get_transaction",
+                    status.signature,
+                    encoding="base64",
+                    max_supported_transaction_version=0,
+                )
+                for status in statuses
+            )
+        )
+        entries = [
+            HistoryService._sol_entry(address, status, response.value)
+            for status, response in zip(statuses, transactions)
+        ]
+        return entries, str(statuses[0].signature)
+
+    @staticmethod
+    def _sol_entry(address: str, status, transaction) -> HistoryEntry:
+        entry = HistoryEntry(
+            address=address,
+            chain="SOL",
+            signature=str(status.signature),
+            slot=status.slot,
+            block_time=(
+                datetime.utcfromtimestamp(status.block_time)
+                if status.block_time
+                else None
+            ),
+            failed=status.err is not None,
+        )
+        meta = transaction.transaction.meta if transaction else None
+        if meta is None:
+            return entry
+
+        accounts = [str(key) for key in transaction.transaction.transaction.message.account_keys]
+        if meta.loaded_addresses:
+            accounts += [str(key) for key in meta.loaded_addresses.writable]
+            accounts += [str(key) for key in meta.loaded_addresses.readonly]
+        if address not in accounts:
+            return entry
+        index = accounts.index(address)
+        changes = [post - pre for pre, post in zip(meta.pre_balances, meta.post_balances)]
+
+        # The fee payer is the first account
+        fee = meta.fee if index == 0 else 0
+        change = changes[index] + fee
+        entry.fee = fee / LAMPORTS_PER_SOL
+        entry.amount = abs(change) / LAMPORTS_PER_SOL
+        if change:
+            entry.direction = "in" if change > 0 else "out"
+            # The account whose balance moved the most the other way
+            others = [
+                (abs(other), accounts[i])
+                for i, other in enumerate(changes)
+                if i != index and other * change < 0
+            ]
+            if others:
+                entry.counterparty = max(others)[1]
+        return entry
+
+    @staticmethod
+    async def _fetch_usdt(
+        address: str, newest: Optional[str]
+    ) -> Tuple[List[HistoryEntry], Optional[str]]:
+        """
+        The USDT transfers of a TRON wallet from the block timestamp newest,
+        at most HISTORY_MAX_FETCH of the newest.
+
+        :return: The entries, and the newest block timestamp or None if none.
+        """
+        min_timestamp = int(newest) if newest else None
+        transfers, fingerprint = [], None
+        while len(transfers) < HISTORY_MAX_FETCH:
+            page, fingerprint = await TronWallet.get_usdt_transfers(
+                address,
+                min_timestamp,
+                fingerprint,
+                limit=min(TRC20_TRANSFERS_PER_PAGE, HISTORY_MAX_FETCH - len(transfers)),
+            )
+            transfers += page
+            if not page or not fingerprint:
+                break
+        if not transfers:
+            return [], None
+
+        entries = []
+        for transfer in transfers:
+            incoming = transfer["to"] == address
+            decimals = int(transfer.get("token_info", {}).get("decimals", TronWallet.USDT_DECIMALS))
+            entries.append(
+                HistoryEntry(
+                    address=address,
+                    chain="USDT",
+                    signature=transfer["transaction_id"],
+                    block_time=datetime.utcfromtimestamp(transfer["block_timestamp"] / 1000),
+                    direction="in" if incoming else "out",
+                    amount=int(transfer["value"]) / 10**decimals,
+                    counterparty=transfer["from"] if incoming else transfer["to"],
+                )
+            )
+        newest = max(transfer["block_timestamp"] for transfer in transfers)
+        return entries, str(newest)
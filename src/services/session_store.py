@@ -0,0 +1,179 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Set
+
+from config.config_manager import (
+    SESSION_BACKEND,
+    SESSION_CACHE_SECONDS,
+    SESSION_MAX_ENTRIES,
+    SESSION_TTL_SECONDS,
+)
+from models.session_model import Session
+from utils.logger import logger
+from utils.ttl_cache import TTLCache
+
+
+class MemorySessionBackend:
+    """
+    Keeps sessions in this process only: the store's bounded cache is the
+    single copy, nothing is loaded or saved.
+    """
+
+    shared = False
+
+    async def load(self, user_id: int) -> Optional[dict]:
+        return None
+
+    async def save(self, user_id: int, data: dict, ttl: float):
+        pass
+
+    async def delete(self, user_id: int):
+        pass
+
+
+class MongoSessionBackend:
+    """
+    Keeps sessions in the sessions collection, shared by every bot process.
+    Expired sessions are removed by the TTL index of the Session model.
+    """
+
+    shared = True
+
+    async def load(self, user_id: int) -> Optional[dict]:
+        doc = await Session.get_motor_collection().find_one(
+            {"user_id": user_id, "expires_at": {"$gt": datetime.utcnow()}},
+            {"data": 1},
+        )
+        return doc["data"] if doc else None
+
+    async def save(self, user_id: int, data: dict, ttl: float):
+        await Session.get_motor_collection().update_one(
+            {"user_id": user_id},
+            {
+                "$set": {
+                    "data": data,
+                    "expires_at": datetime.utcnow() + timedelta(seconds=ttl),
+                }
+            },
+            upsert=True,
+        )
+
+    async def delete(self, user_id: int):
+        await Session.get_motor_collection().delete_one({"user_id": user_id})
+
+
+SESSION_BACKENDS = {
+    "memory": MemorySessionBackend,
+    "mongo": MongoSessionBackend,
+}
+
+
+class SessionStore:
+    """
+    Per-user session values (pending matches, OTP ids, wallet, ...).
+
+    Reads are served from a bounded LRU+TTL cache so they stay synchronous.
+    With a shared backend the cache only holds recently used sessions for
+    SESSION_CACHE_SECONDS; sessions are loaded per update (see load) and
+    written behind, one write per user in flight.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        max_entries: int = SESSION_MAX_ENTRIES,
+        ttl: float = SESSION_TTL_SECONDS,
+        cache_ttl: float = SESSION_CACHE_SECONDS,
+    ):
+        self.backend = backend or MemorySessionBackend()
+        self.ttl = ttl
+        self._cache = TTLCache(max_entries, cache_ttl if self.backend.shared else ttl)
+        self._writes: Dict[int, asyncio.Task] = {}
+        # Users whose cached session changed since it was last saved
+        self._dirty: Set[int] = set()
+
+    def get(self, user_id: int) -> dict:
+        """
+        A copy of the user's session, empty if there is none.
+        """
+        return dict(self._cache.get(user_id) or {})
+
+    def get_value(self, user_id: int, key: str, default: Any = None) -> Any:
+        """
+        One value of the user's session.
+        """
+        return (self._cache.get(user_id) or {}).get(key, default)
+
+    def set(self, user_id: int, **values):
+        """
+        Update values of the user's session and persist it in the background.
+        """
+        session = {**(self._cache.get(user_id) or {}), **values}
+        self._cache.set(user_id, session)
+        self._schedule_write(user_id)
+
+    async def load(self, user_id: int) -> dict:
+        """
+        Make sure the user's session is cached, loading it from the backend.
+
+        :param user_id: The Telegram user ID.
+        :return: A copy of the session.
+        """
+        session = self._cache.get(user_id)
+        if session is None and self.backend.shared and user_id not in self._writes:
+            try:
+                session = await self.backend.load(user_id)
+            except Exception as e:
+                logger.error(f"Could not load session of user {user_id}: {e}")
+            if session is not None:
+                self._cache.set(user_id, session)
+        return dict(session or {})
+
+    async def delete(self, user_id: int):
+        """
+        Drop the user's session.
+        """
+        self._cache.pop(user_id)
+        await self.backend.delete(user_id)
+
+    def _schedule_write(self, user_id: int):
+        if not self.backend.shared:
+            return
+        self._dirty.add(user_id)
+        if user_id in self._writes:
+            return
+        self._writes[user_id] = asyncio.create_task(self._write(user_id))
+
+    async def _write(self, user_id: int):
+        try:
+            # Let values set in the same handler land in one write
+            await asyncio.sleep(0)
+            # Values set while a save is in flight are saved right after it
+            while user_id in self._dirty:
+                self._dirty.discard(user_id)
+                session = self._cache.get(user_id)
+                if session is not None:
+                    await self.backend.save(user_id, session, self.ttl)
+        except Exception as e:
+            logger.error(f"Could not save session of user {user_id}: {e}")
+        finally:
+            self._writes.pop(user_id, None)
+
+    async def close(self):
+        """
+        Wait for the pending writes, used when the application shuts down.
+        """
+        if self._writes:
+            await asyncio.gather(*self._writes.values(), return_exceptions=True)
+
+
+session_store = SessionStore(SESSION_BACKENDS[SESSION_BACKEND]())
+
+
+async def load_session(update, context):
+    """
+    Handler run before the others (group -2) so get_text and the handlers
+    see the session of the user, also when another process wrote it.
+    """
+    if update.effective_user:
+        await session_store.load(update.effective_user.id)
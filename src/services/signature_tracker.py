@@ -0,0 +1,196 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus
+
+from config.config_manager import (
+    SIGNATURE_POLL_MAX_SECONDS,
+    SIGNATURE_POLL_MIN_SECONDS,
+    SIGNATURE_TRACK_SECONDS,
+)
+from utils.logger import logger
+from utils.solana_config import solana_rpc
+
+# Most signatures getSignatureStatuses accepts in one call
+SIGNATURES_PER_CALL = 256
+
+_FINAL_CONFIRMATIONS = (
+    TransactionConfirmationStatus.Confirmed,
+    TransactionConfirmationStatus.Finalized,
+)
+
+
+def signature_status(status) -> Optional[str]:
+    """
+    Map an entry of a getSignatureStatuses response: "confirmed" once it is
+    confirmed without error, "failed" if it landed with an error, None while
+    it is unknown or only processed.
+    """
+    if status is None:
+        return None
+    if status.err is not None:
+        return "failed"
+    if status.confirmation_status in _FINAL_CONFIRMATIONS:
+        return "confirmed"
+    return None
+
+
+async def fetch_signature_statuses(
+    signatures: List[str], search_history: bool = False
+) -> List[Optional[str]]:
+    """
+    Statuses of signatures, one getSignatureStatuses call per
+    SIGNATURES_PER_CALL signatures.
+
+    :param signatures: The transaction signatures.
+    :param search_history: Whether to look past the recent status cache
+        of the node, for transactions older than a few minutes.
+    :return: The status of each signature, in order.
+    """
+    chunks = [
+        signatures[i : i + SIGNATURES_PER_CALL]
+        for i in range(0, len(signatures), SIGNATURES_PER_CALL)
+    ]
+    responses = await asyncio.gather(
+        *(
+            solana_rpc(
+                "get_signature_statuses",
+                [Signature.from_string(signature) for signature in chunk],
+                search_transaction_history=search_history,
+            )
+            for chunk in chunks
+        )
+    )
+    return [
+        signature_status(status)
+        for response in responses
+        for status in response.value
+    ]
+
+
+class SignatureTracker:
+    """
+    Waits for Solana signatures to be confirmed or to fail.
+
+    Every outstanding signature is checked by one background poller, in
+    getSignatureStatuses batches of up to SIGNATURES_PER_CALL. The poll
+    interval starts at SIGNATURE_POLL_MIN_SECONDS after a new signature or
+    a settled one, and doubles up to SIGNATURE_POLL_MAX_SECONDS while
+    nothing changes, so hundreds of in-flight transfers cost a few calls
+    per second. A signature still unknown after its tracking time resolves
+    to None. The poller stops when nothing is tracked.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = SIGNATURE_POLL_MIN_SECONDS,
+        max_interval: float = SIGNATURE_POLL_MAX_SECONDS,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._interval = min_interval
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Signature -> monotonic time after which it resolves to None
+        self._deadlines: Dict[str, float] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def track(
+        self, signature: str, timeout: float = SIGNATURE_TRACK_SECONDS
+    ) -> asyncio.Future:
+        """
+        Start tracking a signature.
+
+        :param signature: The transaction signature.
+        :param timeout: Seconds to poll it before giving up.
+        :return: A future resolved with "confirmed", "failed", or None once
+            the timeout passed.
+        :raises ValueError: If the signature is malformed.
+        """
+        deadline = time.monotonic() + timeout
+        future = self._pending.get(signature)
+        if future is None:
+            # Raises ValueError here rather than failing every batch it joins
+            Signature.from_string(signature)
+            future = asyncio.get_running_loop().create_future()
+            self._pending[signature] = future
+            # A new signature is checked soon, whatever the current backoff
+            self._interval = self.min_interval
+            if self._wakeup is not None:
+                self._wakeup.set()
+        self._deadlines[signature] = max(deadline, self._deadlines.get(signature, 0))
+        if self._poller is None or self._poller.done():
+            self._wakeup = asyncio.Event()
+            self._poller = asyncio.create_task(self._poll())
+        return future
+
+    def _resolve(self, signature: str, status: Optional[str]):
+        future = self._pending.pop(signature)
+        self._deadlines.pop(signature, None)
+        if not future.done():
+            future.set_result(status)
+
+    async def wait(
+        self, signature: str, timeout: float = SIGNATURE_TRACK_SECONDS
+    ) -> Optional[str]:
+        """
+        Wait for a signature to be confirmed or to fail.
+
+        :param signature: The transaction signature.
+        :param timeout: Seconds to wait.
+        :return: "confirmed", "failed", or None if still unknown.
+        """
+        # Shielded: the future is shared with the other waiters
+        return await asyncio.shield(self.track(signature, timeout))
+
+    async def _poll(self):
+        while self._pending:
+            signatures = list(self._pending)
+            try:
+                statuses = await fetch_signature_statuses(signatures)
+            except Exception as e:
+                logger.warning(f"Could not fetch {len(signatures)} signature statuses: {e}")
+                self._interval = self.max_interval
+            else:
+                settled = 0
+                for signature, status in zip(signatures, statuses):
+                    if status is not None and signature in self._pending:
+                        self._resolve(signature, status)
+                        settled += 1
+                if settled:
+                    self._interval = self.min_interval
+                else:
+                    self._interval = min(self._interval * 2, self.max_interval)
+
+            now = time.monotonic()
+            for signature, deadline in list(self._deadlines.items()):
+                if deadline <= now:
+                    self._resolve(signature, None)
+            if not self._pending:
+                break
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def stop(self):
+        """
+        Stop the poller and cancel the futures still waiting.
+        """
+        if self._poller is not None:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self._deadlines.clear()
+
+
+signature_tracker = SignatureTracker()
@@ -0,0 +1,535 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from config.config_manager import (
+    STAKE_WALLET_PRIVATE_KEY,
+    STAKE_WALLET_PUBLIC_KEY,
+    TRANSFER_CONFIRM_POLL_SECONDS,
+    TRANSFER_LEASE_SECONDS,
+    TRANSFER_MAX_ATTEMPTS,
+    TRANSFER_POLL_SECONDS,
+    TRANSFER_RESEND_AFTER_SECONDS,
+    TRANSFER_RETRY_BACKOFF,
+    TRANSFER_WORKERS,
+    TRON_WALLET_PRIVATE_KEY,
+    TRON_WALLET_PUBLIC_KEY,
+)
+from models.transfer_model import Transfer, TransferStatus
+from models.wallet_model import Wallet
+from services.balance_cache import balance_cache
+from services.signature_tracker import signature_tracker
+from services.tron_wallet_service import TronWallet
+from services.wallet_service import WalletService
+from utils.blockhash_provider import is_blockhash_not_found
+from utils.logger import logger
+
+# Awaited with the bot, the transfers of a group and its context once all settled
+SettleHook = Callable[[object, List[Transfer], dict], Awaitable]
+
+# (private key, public key) of the wallet paying the platform's transfers
+PLATFORM_WALLETS = {
+    "SOL": (STAKE_WALLET_PRIVATE_KEY, STAKE_WALLET_PUBLIC_KEY),
+    "USDT": (TRON_WALLET_PRIVATE_KEY, TRON_WALLET_PUBLIC_KEY),
+}
+
+_OPEN_STATUSES = [TransferStatus.PENDING.value, TransferStatus.SENT.value]
+
+
+class TransferOutbox:
+    """
+    Durable queue of on-chain transfers in the transfers collection.
+
+    Handlers enqueue the transfers of an operation (a group) and answer the
+    user right away. A pool of workers signs each transfer, stores its
+    signature before broadcasting it, and polls it until it is confirmed:
+    a transfer is only sent again once its previous transaction can no
+    longer land, so retries never pay twice. Once every transfer of a group
+    is confirmed or failed, the settle hook registered for its kind runs,
+    e.g. to complete the case and notify the user: on one worker at a time,
+    and again later if it raised, until it succeeds.
+    """
+
+    _bot = None
+    _workers: List[asyncio.Task] = []
+    _wakeup: Optional[asyncio.Event] = None
+    # Signature -> task waiting for the signature tracker to settle it
+    _watchers: Dict[str, asyncio.Task] = {}
+    _settle_hooks: Dict[str, SettleHook] = {}
+
+    @staticmethod
+    def on_settled(kind: str) -> Callable[[SettleHook], SettleHook]:
+        """
+        Decorator registering the settle hook of the groups "<kind>:...". A
+        hook that raises runs again later, so it must be safe to repeat.
+        """
+
+        def register(hook: SettleHook) -> SettleHook:
+            TransferOutbox._settle_hooks[kind] = hook
+            return hook
+
+        return register
+
+    @staticmethod
+    async def enqueue(
+        group: str, transfers: Dict[str, dict], context: Optional[dict] = None
+    ) -> bool:
+        """
+        Queue the transfers of an operation, once.
+
+        :param group: The operation, e.g. "reward:<case id>:<attempt>". The
+            part before the first colon picks the settle hook.
+        :param transfers: The transfers by name, each a dict with the chain,
+            recipient, amount and optionally the sender_wallet (a Wallet,
+            the platform wallet of the chain by default) and the splits: the
+            other recipients and amounts paid by the same SOL transaction.
+        :param context: Values handed to the settle hook.
+        :return: False if the group was already queued.
+        """
+        queued = False
+        for name, spec in transfers.items():
+            wallet: Optional[Wallet] = spec.get("sender_wallet")
+            chain = spec["chain"]
+            splits = spec.get("splits", [])
+            if splits and chain != "SOL":
+                # A TRC20 transfer pays a single recipient
+                raise ValueError(f"{chain} transfers cannot be split")
+            transfer = Transfer(
+                key=f"{group}:{name}",
+                group=group,
+                chain=chain,
+                sender_wallet=wallet.id if wallet else None,
+                sender=wallet.public_key if wallet else PLATFORM_WALLETS[chain][1],
+                recipient=spec["recipient"],
+                amount=float(spec["amount"]),
+                splits=splits,
+                context=context or {},
+            )
+            try:
+                # The unique key makes a second confirmation a no-op
+                await transfer.insert()
+                queued = True
+            except DuplicateKeyError:
+                logger.info(f"Transfer {transfer.key} is already queued")
+        if queued:
+            logger.info(f"Queued {len(transfers)} transfers of {group}")
+            if TransferOutbox._wakeup is not None:
+                TransferOutbox._wakeup.set()
+        return queued
+
+    @staticmethod
+    async def enqueue_again(
+        group: str, transfers: List[Transfer], context: Optional[dict] = None
+    ) -> bool:
+        """
+        Queue settled transfers that failed again, under the same names in a
+        new group, e.g. "reward:<case id>:<attempt>:retry1".
+
+        :param group: The follow-up group.
+        :param transfers: The failed transfers.
+        :param context: Values handed to the settle hook of the new group.
+        :return: False if the group was already queued.
+        """
+        specs = {}
+        for transfer in transfers:
+            specs[transfer.key.rsplit(":", 1)[1]] = {
+                "chain": transfer.chain,
+                "recipient": transfer.recipient,
+                "amount": transfer.amount,
+                "sender_wallet": (
+                    await Wallet.get(transfer.sender_wallet)
+                    if transfer.sender_wallet
+                    else None
+                ),
+                "splits": [split.model_dump() for split in transfer.splits],
+            }
+        return await TransferOutbox.enqueue(group, specs, context)
+
+    @staticmethod
+    def start(bot):
+        """
+        Start the workers, which also resume the transfers left by a restart.
+
+        :param bot: The Telegram bot handed to the settle hooks.
+        """
+        if TransferOutbox._workers:
+            return
+        TransferOutbox._bot = bot
+        TransferOutbox._wakeup = asyncio.Event()
+        TransferOutbox._workers = [
+            asyncio.create_task(TransferOutbox._worker())
+            for _ in range(TRANSFER_WORKERS)
+        ]
+        TransferOutbox._workers.append(
+            asyncio.create_task(TransferOutbox._resume_watches())
+        )
+        logger.info(f"Started {TRANSFER_WORKERS} transfer workers")
+
+    @staticmethod
+    async def stop():
+        """
+        Stop the workers. Transfers in progress are resumed at the next start,
+        from their stored signature.
+        """
+        tasks = TransferOutbox._workers + list(TransferOutbox._watchers.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        TransferOutbox._workers = []
+        TransferOutbox._watchers.clear()
+        TransferOutbox._wakeup = None
+
+    @staticmethod
+    async def _worker():
+        while True:
+            try:
+                transfer = await TransferOutbox._claim()
+            except Exception as e:
+                logger.error(f"Could not claim a transfer: {e}")
+                await asyncio.sleep(TRANSFER_POLL_SECONDS)
+                continue
+            if transfer is None:
+                try:
+                    if await TransferOutbox._settle_due():
+                        continue
+                except Exception as e:
+                    logger.error(f"Could not settle a transfer group: {e}")
+                wakeup = TransferOutbox._wakeup
+                try:
+                    await asyncio.wait_for(wakeup.wait(), TRANSFER_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()
+                continue
+            try:
+                await TransferOutbox._process(transfer)
+            except Exception as e:
+                logger.error(f"Transfer {transfer.key} could not be processed: {e}")
+                try:
+                    await TransferOutbox._reschedule(transfer, str(e))
+                except Exception as e:
+                    # The lease expires and another worker takes it over
+                    logger.error(f"Could not reschedule transfer {transfer.key}: {e}")
+
+    @staticmethod
+    async def _reschedule(transfer: Transfer, error: str):
+        if transfer.signature is None:
+            # Nothing was broadcast, e.g. the transaction could not be built
+            transfer.attempts += 1
+            await TransferOutbox._retry(transfer, error)
+        else:
+            # Only the status check failed and it may have landed: never give up
+            await TransferOutbox._update(
+                transfer,
+                last_error=error,
+                next_attempt_at=TransferOutbox._backoff(transfer.attempts),
+            )
+
+    @staticmethod
+    async def _claim() -> Optional[Transfer]:
+        now = datetime.utcnow()
+        doc = await Transfer.get_motor_collection().find_one_and_update(
+            {
+                "status": {"$in": _OPEN_STATUSES},
+                "next_attempt_at": {"$lte": now},
+                "$or": [{"locked_until": None}, {"locked_until": {"$lte": now}}],
+            },
+            {
+                "$set": {
+                    "locked_until": now + timedelta(seconds=TRANSFER_LEASE_SECONDS)
+                }
+            },
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return Transfer.model_validate(doc) if doc else None
+
+    @staticmethod
+    async def _update(transfer: Transfer, **values) -> bool:
+        """
+        Write to the attempt of the transfer this copy was read at: a watcher
+        or a worker holding a stale copy must not reset or settle the attempt
+        sent since.
+
+        :return: False if the transfer was sent again or settled meanwhile,
+            and nothing was written.
+        """
+        # Releases the lease, the next_attempt_at set decides when it is seen again
+        values = {"locked_until": None, "updated_at": datetime.utcnow(), **values}
+        if isinstance(values.get("status"), TransferStatus):
+            values["status"] = values["status"].value
+        result = await Transfer.get_motor_collection().update_one(
+            {
+                "_id": transfer.id,
+                "signature": transfer.signature,
+                "status": {"$in": _OPEN_STATUSES},
+            },
+            {"$set": values},
+        )
+        if result.modified_count == 0:
+            logger.info(
+                f"Transfer {transfer.key} moved on from {transfer.signature}, "
+                "dropped a stale update"
+            )
+            return False
+        return True
+
+    @staticmethod
+    def _backoff(attempts: int) -> datetime:
+        delay = TRANSFER_RETRY_BACKOFF * 2 ** max(attempts - 1, 0)
+        delay += random.uniform(0, TRANSFER_RETRY_BACKOFF)
+        return datetime.utcnow() + timedelta(seconds=delay)
+
+    @staticmethod
+    async def _process(transfer: Transfer):
+        if transfer.signature is None:
+            await TransferOutbox._send(transfer)
+            return
+
+        expired = datetime.utcnow() - transfer.sent_at > timedelta(
+            seconds=TRANSFER_RESEND_AFTER_SECONDS
+        )
+        if not expired:
+            await TransferOutbox._await_confirmation(transfer)
+            return
+
+        # Its blockhash (SOL) or expiration (TRON) has passed, so it can no
+        # longer land; make sure it did not land while nobody was polling
+        status = await TransferOutbox._signature_status(transfer, history=True)
+        if status == "confirmed":
+            await TransferOutbox._finish(transfer, TransferStatus.CONFIRMED)
+        elif status == "failed":
+            await TransferOutbox._retry(transfer, "Transaction failed on chain")
+        else:
+            await TransferOutbox._retry(transfer, "Transaction expired unconfirmed")
+
+    @staticmethod
+    async def _await_confirmation(transfer: Transfer):
+        if transfer.chain != "SOL":
+            status = await TransferOutbox._signature_status(transfer)
+            if status == "confirmed":
+                await TransferOutbox._finish(transfer, TransferStatus.CONFIRMED)
+            elif status == "failed":
+                await TransferOutbox._retry(transfer, "Transaction failed on chain")
+            else:
+                await TransferOutbox._update(
+                    transfer,
+                    next_attempt_at=datetime.utcnow()
+                    + timedelta(seconds=TRANSFER_CONFIRM_POLL_SECONDS),
+                )
+            return
+
+        # SOL signatures are polled in batches by the signature tracker; the
+        # workers only look at the transfer again once it should have expired
+        expires_at = transfer.sent_at + timedelta(seconds=TRANSFER_RESEND_AFTER_SECONDS)
+        TransferOutbox._watch(transfer, (expires_at - datetime.utcnow()).total_seconds())
+        await TransferOutbox._update(transfer, next_attempt_at=expires_at)
+
+    @staticmethod
+    def _watch(transfer: Transfer, timeout: float):
+        if transfer.signature in TransferOutbox._watchers:
+            return
+        task = asyncio.create_task(TransferOutbox._watch_signature(transfer, timeout))
+        TransferOutbox._watchers[transfer.signature] = task
+        task.add_done_callback(
+            lambda _: TransferOutbox._watchers.pop(transfer.signature, None)
+        )
+
+    @staticmethod
+    async def _watch_signature(transfer: Transfer, timeout: float):
+        status = await signature_tracker.wait(transfer.signature, max(timeout, 0))
+        try:
+            if status == "confirmed":
+                await TransferOutbox._finish(transfer, TransferStatus.CONFIRMED)
+            elif status == "failed":
+                await TransferOutbox._retry(transfer, "Transaction failed on chain")
+            # Still unknown: a worker checks it once it expired
+        except Exception as e:
+            logger.error(f"Could not record the status of transfer {transfer.key}: {e}")
+
+    @staticmethod
+    async def _resume_watches():
+        # Transfers sent before a restart are watched again right away
+        docs = Transfer.get_motor_collection().find(
+            {"status": TransferStatus.SENT.value, "chain": "SOL"}
+        )
+        async for doc in docs:
+            transfer = Transfer.model_validate(doc)
+            if transfer.signature and transfer.sent_at:
+                expires_at = transfer.sent_at + timedelta(
+                    seconds=TRANSFER_RESEND_AFTER_SECONDS
+                )
+                remaining = (expires_at - datetime.utcnow()).total_seconds()
+                if remaining > 0:
+                    TransferOutbox._watch(transfer, remaining)
+
+    @staticmethod
+    async def _retry(transfer: Transfer, error: str):
+        if transfer.attempts >= TRANSFER_MAX_ATTEMPTS:
+            await TransferOutbox._finish(transfer, TransferStatus.FAILED, error)
+            return
+        updated = await TransferOutbox._update(
+            transfer,
+            status=TransferStatus.PENDING,
+            signature=None,
+            sent_at=None,
+            attempts=transfer.attempts,
+            last_error=error,
+            next_attempt_at=TransferOutbox._backoff(transfer.attempts),
+        )
+        if updated:
+            logger.warning(f"Transfer {transfer.key}: {error}, sending it again")
+
+    @staticmethod
+    async def _sender_private_key(transfer: Transfer) -> str:
+        if transfer.sender_wallet is None:
+            return PLATFORM_WALLETS[transfer.chain][0]
+        wallet = await Wallet.get(transfer.sender_wallet)
+        return wallet.private_key
+
+    @staticmethod
+    async def _send(transfer: Transfer):
+        private_key = await TransferOutbox._sender_private_key(transfer)
+        if transfer.chain == "SOL":
+            payments = [(transfer.recipient, transfer.amount)]
+            payments += [(split.recipient, split.amount) for split in transfer.splits]
+            transaction = await WalletService.build_sol_payout(private_key, payments)
+            signature = str(transaction.signatures[0])
+        else:
+            transaction = await TronWallet.build_usdt_transfer(
+                private_key, transfer.recipient, transfer.amount
+            )
+            signature = transaction.txid
+
+        transfer.attempts += 1
+        sent_at = datetime.utcnow()
+        # Stored first: whatever happens to the broadcast, the next attempt
+        # checks this signature before sending anything again. Only while the
+        # lease is ours and no other attempt stored its own
+        result = await Transfer.get_motor_collection().update_one(
+            {
+                "_id": transfer.id,
+                "status": TransferStatus.PENDING.value,
+                "signature": None,
+                "locked_until": transfer.locked_until,
+            },
+            {
+                "$set": {
+                    "status": TransferStatus.SENT.value,
+                    "signature": signature,
+                    "sent_at": sent_at,
+                    "attempts": transfer.attempts,
+                }
+            },
+        )
+        if result.modified_count == 0:
+            logger.warning(f"Transfer {transfer.key} was taken over, not sending it")
+            return
+        transfer.signature, transfer.sent_at = signature, sent_at
+        try:
+            if transfer.chain == "SOL":
+                await WalletService.broadcast_sol(transaction)
+            else:
+                await TronWallet.broadcast(transaction)
+        except Exception as e:
+            logger.warning(f"Broadcast of transfer {transfer.key} failed: {e}")
+            if transfer.chain == "SOL" and is_blockhash_not_found(e):
+                # Rejected by preflight, it cannot land: build it again right away
+                await TransferOutbox._retry(transfer, str(e))
+                return
+            await TransferOutbox._update(
+                transfer,
+                last_error=str(e),
+                next_attempt_at=TransferOutbox._backoff(transfer.attempts),
+            )
+            return
+
+        logger.info(f"Transfer {transfer.key} sent: {signature}")
+        await TransferOutbox._await_confirmation(transfer)
+
+    @staticmethod
+    async def _signature_status(
+        transfer: Transfer, history: bool = False
+    ) -> Optional[str]:
+        if transfer.chain == "SOL":
+            return await WalletService.get_signature_status(
+                transfer.signature, search_history=history
+            )
+        return await TronWallet.get_transaction_status(transfer.signature)
+
+    @staticmethod
+    async def _finish(
+        transfer: Transfer, status: TransferStatus, error: Optional[str] = None
+    ):
+        if not await TransferOutbox._update(
+            transfer, status=status, last_error=error or transfer.last_error
+        ):
+            return
+        balance_cache.invalidate(
+            transfer.chain,
+            transfer.sender,
+            transfer.recipient,
+            *(split.recipient for split in transfer.splits),
+        )
+        if status == TransferStatus.CONFIRMED:
+            logger.info(f"Transfer {transfer.key} confirmed: {transfer.signature}")
+        else:
+            logger.error(f"Transfer {transfer.key} failed: {error}")
+        await TransferOutbox._settle(transfer.group)
+
+    @staticmethod
+    async def _settle(group: str):
+        collection = Transfer.get_motor_collection()
+        docs = collection.find({"group": group}).sort("key", ASCENDING)
+        transfers = [Transfer.model_validate(doc) async for doc in docs]
+        if any(t.status.value in _OPEN_STATUSES for t in transfers):
+            return
+        # Two workers may finish the last transfers together: only the one
+        # leasing the first transfer of the group runs the hook
+        now = datetime.utcnow()
+        claimed = await collection.update_one(
+            {
+                "_id": transfers[0].id,
+                "settled": False,
+                "$or": [{"settle_after": None}, {"settle_after": {"$lte": now}}],
+            },
+            {
+                "$set": {
+                    "settle_after": now + timedelta(seconds=TRANSFER_LEASE_SECONDS)
+                }
+            },
+        )
+        if claimed.modified_count == 0:
+            return
+
+        hook = TransferOutbox._settle_hooks.get(group.split(":", 1)[0])
+        if hook is not None:
+            try:
+                await hook(TransferOutbox._bot, transfers, transfers[0].context)
+            except Exception as e:
+                # Still leased, _settle_due runs it again once the lease passed
+                logger.error(f"Settle hook of {group} failed: {e}")
+                return
+        await collection.update_one(
+            {"_id": transfers[0].id}, {"$set": {"settled": True}}
+        )
+
+    @staticmethod
+    async def _settle_due() -> bool:
+        """
+        Run again the settle hook of a group whose last run failed or was cut
+        short by a restart.
+
+        :return: False if no hook was due.
+        """
+        doc = await Transfer.get_motor_collection().find_one(
+            {"settled": False, "settle_after": {"$lte": datetime.utcnow()}}
+        )
+        if doc is None:
+            return False
+        await TransferOutbox._settle(doc["group"])
+        return True
@@ -1,6 +1,55 @@
-from tronpy import Tron
+import asyncio
+from decimal import Decimal
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import urljoin
+
+import httpx
+from tronpy import AsyncContract, AsyncTron
+from tronpy.async_tron import AsyncTransaction
+from tronpy.defaults import conf_for_name
+from tronpy.exceptions import TransactionNotFound
 from tronpy.keys import PrivateKey
-from tronpy.contract import Contract
+from tronpy.providers import AsyncHTTPProvider
+
+from config.config_manager import (
+    TRANSFER_CONFIRM_POLL_SECONDS,
+    TRANSFER_RESEND_AFTER_SECONDS,
+    TRON_CLIENT_NETWORK,
+    TRON_RPC_BURST,
+    TRON_RPC_RATE_PER_SECOND,
+    TRON_RPC_TIMEOUT,
+    TRON_RPC_URLS,
+)
+from services.balance_cache import balance_cache
+from utils.logger import logger
+from utils.rpc_pool import EndpointPool, parse_urls
+
+T = TypeVar("T")
+
+# Only the TRC20 entries the bot calls, so the contract never needs an ABI lookup
+TRC20_ABI = [
+    {
+        "constant": True,
+        "inputs": [{"name": "_owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "payable": False,
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "constant": False,
+        "inputs": [
+            {"name": "_to", "type": "address"},
+            {"name": "_value", "type": "uint256"},
+        ],
+        "name": "transfer",
+        "outputs": [{"name": "", "type": "bool"}],
+        "payable": False,
+        "stateMutability": "nonpayable",
+        "type": "function",
+    },
+]
 
 
 class TronWallet:
@@ -8,11 +57,77 @@ class TronWallet:
     Service for managing TRON wallets and transactions, including USDT (TRC20) operations.
     """
 
-    # USDT TRC20 Contract Address (Mainnet)
+    # USDT TRC20 Contract Address (Shasta)
     USDT_CONTRACT = "TXLAQ63Xg1NAzckPwKHvzw7CSEmLMEqcdj"
+    USDT_DECIMALS = 6
+    # Max TRX (in SUN) burnt for energy by a TRC20 transfer
+    TRC20_FEE_LIMIT = 30_000_000
+
+    DEFAULT_NETWORK = TRON_CLIENT_NETWORK or "shasta"  # Use "mainnet" for live transactions
 
-    # Initialize Tron Client
-    client = Tron(network="shasta")  # Use "shasta" for testnet
+    # One long-lived client per node of the pool, and its USDT contract handle
+    _pool: Optional[EndpointPool] = None
+    _usdt_contracts: Dict[AsyncTron, AsyncContract] = {}
+
+    @staticmethod
+    def _connect(url: str) -> AsyncTron:
+        provider = AsyncHTTPProvider(url, timeout=TRON_RPC_TIMEOUT)
+        return AsyncTron(provider, network=TronWallet.DEFAULT_NETWORK)
+
+    @staticmethod
+    def get_pool() -> EndpointPool:
+        """
+        Return the shared pool of TRON nodes: TRON_RPC_URLS, or the full node
+        of the default network.
+        """
+        if TronWallet._pool is None:
+            urls = parse_urls(TRON_RPC_URLS) or [
+                conf_for_name(TronWallet.DEFAULT_NETWORK)["fullnode"]
+            ]
+            TronWallet._pool = EndpointPool(
+                "TRON",
+                urls,
+                TronWallet._connect,
+                TRON_RPC_RATE_PER_SECOND,
+                TRON_RPC_BURST,
+                (httpx.HTTPError, OSError, asyncio.TimeoutError),
+            )
+        return TronWallet._pool
+
+    @staticmethod
+    async def tron_rpc(request: Callable[[AsyncTron], Awaitable[T]]) -> T:
+        """
+        Run a request on the best TRON node, failing over to the other ones.
+
+        :param request: Coroutine function sending the request with the
+            AsyncTron client it is given.
+        :return: The result of the request.
+        """
+        return await TronWallet.get_pool().call(request)
+
+    @staticmethod
+    def get_usdt_contract(client: AsyncTron) -> AsyncContract:
+        """
+        Return the USDT contract handle of a client, built once from the local ABI.
+        """
+        contract = TronWallet._usdt_contracts.get(client)
+        if contract is None:
+            contract = TronWallet._usdt_contracts[client] = AsyncContract(
+                addr=TronWallet.USDT_CONTRACT,
+                abi=TRC20_ABI,
+                client=client,
+            )
+        return contract
+
+    @staticmethod
+    async def close():
+        """
+        Close the HTTP sessions of every node client.
+        """
+        pool, TronWallet._pool = TronWallet._pool, None
+        TronWallet._usdt_contracts.clear()
+        if pool is not None:
+            await pool.close()
 
     @staticmethod
     def create_wallet(wallet_name):
@@ -29,28 +144,69 @@ class TronWallet:
         }
 
     @staticmethod
-    def get_trx_balance(address):
+    async def get_trx_balance(address):
         """
         Fetches the TRX balance of a TRON wallet.
         """
         try:
-            return TronWallet.client.get_account_balance(address)  # Balance is in TRX
+            # Balance is in TRX
+            return await TronWallet.tron_rpc(
+                lambda client: client.get_account_balance(address)
+            )
         except Exception:
             return 0  # Wallet may be new and unfunded
 
+    @staticmethod
+    async def _fetch_usdt_balance(address) -> float:
+        balance = await TronWallet.tron_rpc(
+            lambda client: TronWallet.get_usdt_contract(client).functions.balanceOf(
+                address
+            )
+        )
+        return float(Decimal(balance) / 10**TronWallet.USDT_DECIMALS)
+
     @staticmethod
     async def get_usdt_balance(address):
+        """
+        Fetches the USDT (TRC20) balance of a TRON wallet.
+        """
         try:
-            balance = TronWallet.client.get_account_balance(address)
-            # real_balance = balance / 10**6  # Convert from SUN to TRX
-            # print(f"Balance: {real_balance} TRX")
-            # return real_balance  # Balance is in TRX
-            return balance
-        except Exception:
+            return await balance_cache.get(
+                "USDT", address, lambda: TronWallet._fetch_usdt_balance(address)
+            )
+        except Exception as e:
+            logger.warning(f"Error fetching USDT balance of {address}: {e}")
             return 0  # Wallet may be new and unfunded
 
     @staticmethod
-    def transfer_trx(sender_private_key, recipient_address, amount_in_trx):
+    async def get_usdt_balances(addresses: List[str]) -> Dict[str, float]:
+        """
+        Fetches the USDT (TRC20) balances of several TRON wallets at once.
+
+        The node API has no batch call, so the balanceOf calls of the
+        addresses not cached are sent together over the node pool.
+
+        :param addresses: The wallet addresses.
+        :return: The balances by address, without the ones that failed.
+        """
+
+        async def fetch_many(missing):
+            results = await asyncio.gather(
+                *(TronWallet._fetch_usdt_balance(address) for address in missing),
+                return_exceptions=True,
+            )
+            balances = {}
+            for address, result in zip(missing, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Error fetching USDT balance of {address}: {result}")
+                else:
+                    balances[address] = result
+            return balances
+
+        return await balance_cache.get_many("USDT", addresses, fetch_many)
+
+    @staticmethod
+    async def transfer_trx(sender_private_key, recipient_address, amount_in_trx):
         """
         Transfers TRX from one wallet to another.
         """
@@ -61,67 +217,171 @@ class TronWallet:
             # Convert TRX to Sun (1 TRX = 1,000,000 Sun)
             amount_in_sun = int(amount_in_trx * 1_000_000)
 
-            txn = (
-                TronWallet.client.trx.transfer(
+            txn = await TronWallet.tron_rpc(
+                lambda client: client.trx.transfer(
                     sender_address, recipient_address, amount_in_sun
-                )
-                .build()
-                .sign(sender_private_key)
+                ).build()
             )
 
-            return txn.broadcast()
+            return await TronWallet.broadcast(txn.sign(sender_private_key))
         except Exception as e:
-            print(f"Error sending TRX: {e}")
+            logger.error(f"Error sending TRX: {e}")
             return None
 
     @staticmethod
-    async def transfer_usdt(sender_private_key, recipient_address, amount_in_usdt):
+    async def build_usdt_transfer(
+        sender_private_key, recipient_address, amount_in_usdt
+    ) -> AsyncTransaction:
         """
-        Transfers USDT from one wallet to another.
+        Builds and signs a USDT (TRC20) transfer without broadcasting it, so
+        its txid is known before it can land.
         """
-        try:
-            print(
-                f"DEBUG - 1: {sender_private_key} {recipient_address} {amount_in_usdt}"
-            )
+        sender_private_key = PrivateKey(bytes.fromhex(sender_private_key))
+        sender_address = sender_private_key.public_key.to_base58check_address()
 
-            sender_private_key = PrivateKey(bytes.fromhex(sender_private_key))
-            sender_address = sender_private_key.public_key.to_base58check_address()
+        # Convert the USDT amount to its smallest unit (6 decimal places)
+        amount = int(amount_in_usdt * 10**TronWallet.USDT_DECIMALS)
 
-            destination_address = recipient_address
-
-            print(
-                f"DEBUG - 2: {sender_private_key} {recipient_address} {amount_in_usdt}"
+        async def build(client):
+            builder = await TronWallet.get_usdt_contract(client).functions.transfer(
+                recipient_address, amount
+            )
+            return await (
+                builder.with_owner(sender_address)
+                .fee_limit(TronWallet.TRC20_FEE_LIMIT)
+                .build()
             )
 
-            amount_in_sun = int(1_000_000 * amount_in_usdt)
+        txn = await TronWallet.tron_rpc(build)
+        return txn.sign(sender_private_key)
 
-            print(
-                f"DEBUG - 3: {sender_private_key} {recipient_address} {amount_in_usdt}"
-            )
+    @staticmethod
+    async def broadcast(txn: AsyncTransaction) -> dict:
+        """
+        Broadcasts a signed transaction through the node pool. Sending it
+        again to another node is harmless, its txid stays the same.
 
-            # Convert the USDT amount to SUN (6 decimal places)
-            txn = TronWallet.client.trx.transfer(
-                sender_address, destination_address, amount_in_sun
-            ).build()
+        :return: The broadcast response of the node.
+        """
+        return await TronWallet.tron_rpc(lambda client: client.broadcast(txn))
 
-            print(
-                f"DEBUG - 4: {sender_private_key} {recipient_address} {amount_in_usdt}"
+    @staticmethod
+    async def get_transaction_status(txid: str) -> Optional[str]:
+        """
+        Status of a broadcast transaction: "confirmed" once it succeeded in a
+        block, "failed" if it was reverted, None while it is not found.
+        """
+        try:
+            info = await TronWallet.tron_rpc(
+                lambda client: client.get_transaction_info(txid)
             )
+        except TransactionNotFound:
+            return None
+        if info.get("result") == "FAILED":
+            return "failed"
+        receipt_result = info.get("receipt", {}).get("result", "SUCCESS")
+        return "confirmed" if receipt_result == "SUCCESS" else "failed"
 
-            signed_txn = txn.sign(sender_private_key)
+    @staticmethod
+    async def wait_for_transaction(
+        txid: str,
+        timeout: float = TRANSFER_RESEND_AFTER_SECONDS,
+        interval: float = TRANSFER_CONFIRM_POLL_SECONDS,
+    ) -> Optional[str]:
+        """
+        Poll a broadcast transaction until it is confirmed or failed.
+
+        :param txid: The transaction id.
+        :param timeout: Seconds to poll it before giving up.
+        :param interval: Seconds between two polls.
+        :return: "confirmed", "failed", or None once the timeout passed.
+        """
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            try:
+                status = await TronWallet.get_transaction_status(txid)
+            except Exception as e:
+                logger.warning(f"Could not fetch the status of {txid}: {e}")
+                status = None
+            if status is not None:
+                return status
+            if asyncio.get_running_loop().time() + interval > deadline:
+                return None
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    async def get_usdt_transfers(
+        address: str,
+        min_timestamp: Optional[int] = None,
+        fingerprint: Optional[str] = None,
+        limit: int = 200,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        A page of the USDT (TRC20) transfers of a wallet, newest first, from
+        the TronGrid account API of the node pool.
+
+        :param address: The wallet address.
+        :param min_timestamp: Only transfers from this block timestamp in ms.
+        :param fingerprint: The fingerprint of the page to fetch, from the
+            previous page.
+        :param limit: Transfers per page, at most 200.
+        :return: The transfers and the fingerprint of the next page, None on
+            the last page.
+        """
+        params = {
+            "limit": limit,
+            "contract_address": TronWallet.USDT_CONTRACT,
+            "only_confirmed": "true",
+            "order_by": "block_timestamp,desc",
+        }
+        if min_timestamp is not None:
+            params["min_timestamp"] = min_timestamp
+        if fingerprint:
+            params["fingerprint"] = fingerprint
 
-            print(f"DEBUG - 5: {signed_txn}")
+        async def request(client):
+            # Not a node API, so sent with the HTTP session of the provider
+            provider = client.provider
+            response = await provider.client.get(
+                urljoin(provider.endpoint_uri, f"v1/accounts/{address}/transactions/trc20"),
+                params=params,
+            )
+            response.raise_for_status()
+            return response.json()
 
-            result = signed_txn.broadcast()
+        payload = await TronWallet.tron_rpc(request)
+        return payload.get("data", []), payload.get("meta", {}).get("fingerprint")
 
-            print(f"DEBUG - 6: {result}")
+    @staticmethod
+    async def transfer_usdt(sender_private_key, recipient_address, amount_in_usdt):
+        """
+        Transfers USDT (TRC20) from one wallet to another.
+        """
+        try:
+            txn = await TronWallet.build_usdt_transfer(
+                sender_private_key, recipient_address, amount_in_usdt
+            )
+            sender_address = (
+                PrivateKey(bytes.fromhex(sender_private_key))
+                .public_key.to_base58check_address()
+            )
 
+            result = await TronWallet.broadcast(txn)
+            balance_cache.invalidate("USDT", sender_address, recipient_address)
+            balance_cache.invalidate_when(
+                TronWallet.wait_for_transaction(txn.txid),
+                "USDT",
+                sender_address,
+                recipient_address,
+            )
+            logger.info(f"USDT transfer broadcast: {txn.txid}")
             return result
         except Exception as e:
-            print(f"Error sending USDT: {e}")
+            logger.error(f"Error sending USDT: {e}")
             return None
 
-    def create_usdt_wallet(wallet_name):
+    @staticmethod
+    async def create_usdt_wallet(wallet_name):
         """
         Creates a new USDT wallet and returns its details.
         """
@@ -129,7 +389,7 @@ class TronWallet:
         address = private_key.public_key.to_base58check_address()
 
         try:
-            balance = TronWallet.get_usdt_balance(address)
+            balance = await TronWallet.get_usdt_balance(address)
         except Exception as e:
             print(f"Error creating wallet: {e}")
             balance = 0
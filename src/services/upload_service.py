@@ -0,0 +1,251 @@
+import asyncio
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+
+from beanie import PydanticObjectId
+
+from config.config_manager import (
+    UPLOAD_MAX_ATTEMPTS,
+    UPLOAD_QUEUE_SIZE,
+    UPLOAD_RETRY_BACKOFF,
+    UPLOAD_WAIT_SECONDS,
+    UPLOAD_WORKERS,
+)
+from models.case_model import Case
+from models.finder_model import Finder
+from utils.cloudinary import upload_file
+from utils.logger import logger
+
+
+@dataclass
+class UploadJob:
+    source: object  # path, file-like object or bytes accepted by Cloudinary
+    resource_type: str = "image"
+    options: dict = field(default_factory=dict)
+    on_complete: Optional[Callable[[str], Awaitable]] = None
+    on_failure: Optional[Callable[[Exception], Awaitable]] = None
+    key: Optional[Hashable] = None  # Lets UploadService.wait find the job
+    queued_at: float = field(default_factory=time.monotonic)
+    # Set once the upload finished and its callback ran, whatever the outcome
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+@dataclass
+class UploadMetrics:
+    completed: int = 0
+    failed: int = 0
+    retries: int = 0
+    in_flight: int = 0
+    # Seconds from submit to URL, for the most recent uploads
+    latencies: deque = field(default_factory=lambda: deque(maxlen=500))
+
+
+class UploadService:
+    """
+    Background Cloudinary uploads. Handlers submit a job and answer the user
+    right away; a bounded pool of workers runs the blocking SDK call in
+    threads and hands the URL to the job's callback.
+    """
+
+    _queue: Optional[asyncio.Queue] = None
+    _workers: List[asyncio.Task] = []
+    _executor: Optional[ThreadPoolExecutor] = None
+    _metrics = UploadMetrics()
+    # Jobs not finished yet, by the key they were submitted with
+    _pending: Dict[Hashable, UploadJob] = {}
+
+    @staticmethod
+    def _ensure_started():
+        if UploadService._queue is not None:
+            return
+        UploadService._queue = asyncio.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+        UploadService._executor = ThreadPoolExecutor(
+            max_workers=UPLOAD_WORKERS, thread_name_prefix="upload"
+        )
+        UploadService._workers = [
+            asyncio.create_task(UploadService._worker())
+            for _ in range(UPLOAD_WORKERS)
+        ]
+        logger.info(f"Started {UPLOAD_WORKERS} upload workers")
+
+    @staticmethod
+    async def submit(
+        source,
+        resource_type: str = "image",
+        on_complete: Optional[Callable[[str], Awaitable]] = None,
+        on_failure: Optional[Callable[[Exception], Awaitable]] = None,
+        key: Optional[Hashable] = None,
+        **options,
+    ) -> UploadJob:
+        """
+        Queue an upload and return without waiting for it.
+
+        :param source: A file path, file-like object or bytes.
+        :param resource_type: "image" or "video".
+        :param on_complete: Awaited with the URL once uploaded.
+        :param on_failure: Awaited with the last error once all attempts failed.
+        :param key: What the upload is for, e.g. ("case_photo", case id), so a
+            later step can wait for it. A new upload with the same key
+            replaces the previous one for wait.
+        :return: The queued job.
+        """
+        UploadService._ensure_started()
+        job = UploadJob(source, resource_type, options, on_complete, on_failure, key)
+        if key is not None:
+            UploadService._pending[key] = job
+        # Waits only when the queue is full, which bounds memory under bursts
+        await UploadService._queue.put(job)
+        logger.info(f"Queued {resource_type} upload, queue depth {UploadService._queue.qsize()}")
+        return job
+
+    @staticmethod
+    async def _upload_with_retry(job: UploadJob) -> str:
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, UPLOAD_MAX_ATTEMPTS + 1):
+            try:
+                if hasattr(job.source, "seek"):
+                    job.source.seek(0)
+                return await loop.run_in_executor(
+                    UploadService._executor,
+                    partial(upload_file, job.source, job.resource_type, **job.options),
+                )
+            except Exception as e:
+                if attempt == UPLOAD_MAX_ATTEMPTS:
+                    raise
+                UploadService._metrics.retries += 1
+                delay = UPLOAD_RETRY_BACKOFF * 2 ** (attempt - 1)
+                delay += random.uniform(0, UPLOAD_RETRY_BACKOFF)
+                logger.warning(
+                    f"Upload attempt {attempt} failed ({e}), retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _worker():
+        queue = UploadService._queue
+        metrics = UploadService._metrics
+        while True:
+            job = await queue.get()
+            metrics.in_flight += 1
+            try:
+                url = await UploadService._upload_with_retry(job)
+            except Exception as e:
+                metrics.failed += 1
+                logger.error(f"Upload failed after {UPLOAD_MAX_ATTEMPTS} attempts: {e}")
+                if job.on_failure:
+                    await UploadService._run_callback(job.on_failure, e)
+            else:
+                metrics.completed += 1
+                metrics.latencies.append(time.monotonic() - job.queued_at)
+                if job.on_complete:
+                    await UploadService._run_callback(job.on_complete, url)
+            finally:
+                metrics.in_flight -= 1
+                if job.key is not None and UploadService._pending.get(job.key) is job:
+                    del UploadService._pending[job.key]
+                job.done.set()
+                queue.task_done()
+
+    @staticmethod
+    async def wait(key: Hashable, timeout: float = UPLOAD_WAIT_SECONDS) -> bool:
+        """
+        Wait until the upload submitted with key, if any, finished and its
+        callback ran, e.g. before submitting what the upload is attached to.
+
+        :param key: The key given to submit.
+        :param timeout: Seconds to wait at most.
+        :return: False if the upload is still running after timeout seconds.
+        """
+        job = UploadService._pending.get(key)
+        if job is None:
+            return True
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    @staticmethod
+    async def _run_callback(callback, value):
+        try:
+            await callback(value)
+        except Exception as e:
+            logger.error(f"Upload callback failed: {e}")
+
+    @staticmethod
+    def metrics() -> dict:
+        """
+        Snapshot of the upload queue depth, counters and latency percentiles.
+        """
+        metrics = UploadService._metrics
+        latencies = sorted(metrics.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 3)
+
+        return {
+            "queue_depth": UploadService._queue.qsize() if UploadService._queue else 0,
+            "in_flight": metrics.in_flight,
+            "completed": metrics.completed,
+            "failed": metrics.failed,
+            "retries": metrics.retries,
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+        }
+
+    @staticmethod
+    async def stop(timeout: float = 30):
+        """
+        Let queued uploads finish (up to timeout seconds) and stop the workers.
+        """
+        if UploadService._queue is None:
+            return
+        try:
+            await asyncio.wait_for(UploadService._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Stopping with {UploadService._queue.qsize()} uploads still queued"
+            )
+        for worker in UploadService._workers:
+            worker.cancel()
+        await asyncio.gather(*UploadService._workers, return_exceptions=True)
+        UploadService._executor.shutdown(wait=False)
+        logger.info(f"Upload workers stopped: {UploadService.metrics()}")
+        UploadService._queue = None
+        UploadService._workers = []
+        UploadService._executor = None
+
+    # --- Attach callbacks ---
+
+    @staticmethod
+    def attach_case_photo(case_id: PydanticObjectId) -> Callable[[str], Awaitable]:
+        """
+        Callback setting the uploaded URL as the photo of a case.
+        """
+
+        async def attach(url: str):
+            await Case.get_motor_collection().update_one(
+                {"_id": case_id}, {"$set": {"case_photo": url}}
+            )
+
+        return attach
+
+    @staticmethod
+    def attach_finder_proof(finder_id: PydanticObjectId) -> Callable[[str], Awaitable]:
+        """
+        Callback setting the uploaded URL as the proof of a finder.
+        """
+
+        async def attach(url: str):
+            await Finder.get_motor_collection().update_one(
+                {"_id": finder_id}, {"$set": {"proof_url": [url]}}
+            )
+
+        return attach
@@ -1,25 +1,88 @@
-from typing import List
+from datetime import datetime
+from typing import Iterable, List, Optional
 
 from beanie import PydanticObjectId
+from config.config_manager import (
+    LANG_CACHE_MAX_ENTRIES,
+    LANG_CACHE_TTL_SECONDS,
+    LANG_PREFETCH_LIMIT,
+)
 from models.mobile_number_model import MobileNumber
 from models.user_model import User
+from utils.ttl_cache import TTLCache
+
+
+# Telegram user ID -> language, None for users who never chose one
+_lang_cache = TTLCache(LANG_CACHE_MAX_ENTRIES, LANG_CACHE_TTL_SECONDS)
+_NO_LANG = ""
+
+
+def get_cached_user_lang(user_id: int) -> Optional[str]:
+    """Get the user's language if it is cached, without touching the database."""
+    # load_user_lang refreshes the entry before every update, so the texts of
+    # the update skip the expiry check and the LRU bookkeeping
+    return _lang_cache.peek(user_id) or None
 
 
 async def get_user_lang(user_id: int) -> str:
-    """Get the user's language preference from the database."""
-    user = await User.find_one(User.tl_id == user_id)
-    return user.lang if user else None
+    """Get the user's language preference, from the cache or the database."""
+    lang = _lang_cache.get(user_id)
+    if lang is None:
+        user = await User.get_motor_collection().find_one(
+            {"tl_id": user_id}, {"lang": 1}
+        )
+        lang = user["lang"] if user else _NO_LANG
+        _lang_cache.set(user_id, lang)
+    return lang or None
 
 
 async def save_user_lang(user_id: int, lang: str):
-    """Save the user's language preference to the database."""
-    user = await User.find_one(User.tl_id == user_id)
-    if user:
-        user.lang = lang
-        await user.save()
+    """Save the user's language preference to the database and the cache."""
+    now = datetime.utcnow()
+    await User.get_motor_collection().update_one(
+        {"tl_id": user_id},
+        {"$set": {"lang": lang, "updated_at": now}, "$setOnInsert": {"created_at": now}},
+        upsert=True,
+    )
+    _lang_cache.set(user_id, lang)
+
+
+async def prefetch_user_langs(user_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Load the languages of many users in one query.
+
+    :param user_ids: The users to load, by default the most recently active ones.
+    :return: The number of languages cached.
+    """
+    if user_ids is None:
+        cursor = (
+            User.get_motor_collection()
+            .find({}, {"tl_id": 1, "lang": 1})
+            .sort("updated_at", -1)
+            .limit(LANG_PREFETCH_LIMIT)
+        )
     else:
-        user = User(tl_id=user_id, lang=lang)
-        await user.insert()
+        missing = [user_id for user_id in set(user_ids) if user_id not in _lang_cache]
+        if not missing:
+            return 0
+        cursor = User.get_motor_collection().find(
+            {"tl_id": {"$in": missing}}, {"tl_id": 1, "lang": 1}
+        )
+
+    count = 0
+    async for user in cursor:
+        _lang_cache.set(user["tl_id"], user["lang"])
+        count += 1
+    return count
+
+
+async def load_user_lang(update, context):
+    """
+    Handler run before the others so get_text knows the user's language,
+    also right after a restart. Only a cache miss reaches the database.
+    """
+    if update.effective_user:
+        await get_user_lang(update.effective_user.id)
 
 
 async def save_user_mobiles(user_id: int, new_mobile: str):
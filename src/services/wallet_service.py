@@ -1,27 +1,31 @@
-from typing import  List
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
 from beanie import PydanticObjectId
 from solders.pubkey import Pubkey
-from spl.token.client import Token
+from spl.token.async_client import AsyncToken
 from spl.token.constants import TOKEN_PROGRAM_ID
-from tronpy import Tron
-from config.config_manager import CLIENT
+from spl.token.instructions import get_associated_token_address
 from constant.language_constant import USDT_MINT_ADDRESS
-from constants import USDT_CONTRACT
+from models.history_model import HistoryEntry
 from models.wallet_model import Wallet
+from services.balance_cache import balance_cache
+from services.history_service import HistoryService
+from services.signature_tracker import fetch_signature_statuses, signature_tracker
 from services.tron_wallet_service import TronWallet
 from utils.error_wrapper import catch_async
-from utils.wallet import create_sol_wallet
-from utils.solana_config import solana_client
+from utils.wallet import create_sol_wallet, fetch_sol_balance
+from utils.blockhash_provider import blockhash_provider, is_blockhash_not_found
+from utils.solana_config import get_solana_client, solana_rpc
 from solders.system_program import transfer, TransferParams
 from solders.transaction import Transaction
 from solders.message import Message
 from solders.keypair import Keypair
 
-# Connect to the Tron Shasta testnet
-tron_client = Tron(network='shasta')
+from solana.rpc.types import DataSliceOpts
+from utils.logger import logger
 
-
-from solana.rpc.async_api import AsyncClient
+# Most accounts getMultipleAccounts returns in one call
+SOL_ACCOUNTS_PER_CALL = 100
 
 
 class WalletService:
@@ -36,7 +40,7 @@ class WalletService:
         """
         try:
             if wallet_type == "SOL":
-                sol_wallet = create_sol_wallet(wallet_name)
+                sol_wallet = await create_sol_wallet(wallet_name)
                 wallet = Wallet(
                     public_key=sol_wallet["public_key"],
                     private_key=sol_wallet["secret_key"],
@@ -82,24 +86,13 @@ class WalletService:
             # Convert SOL to lamports (1 SOL = 1e9 lamports)
             lamports = int(amount * 1e9)
 
-            # Create a transfer instruction
-            transfer_instruction = transfer(
-                {
-                    "from_pubkey": sender_keypair.pubkey(),
-                    "to_pubkey": recipient_pubkey,
-                    "lamports": lamports,
-                }
+            # Build and send the transaction
+            response = await WalletService._send_sol_payments(
+                sender_keypair, [(recipient_pubkey, lamports)]
             )
 
-            # Create a transaction and sign it
-            transaction = Transaction().add(transfer_instruction)
-            transaction = transaction.sign([sender_keypair])
-
-            # Send the transaction
-            response = solana_client.send_transaction(transaction)
-
             # Return the transaction signature
-            return response.value  # Transaction signature
+            return str(response.value)  # Transaction signature
         except Exception as e:
             print(f"Error transferring SOL: {e}")
             return f"❌ Error: {e}"
@@ -153,27 +146,7 @@ class WalletService:
         """
         Fetches the USDT (TRC20) balance of a TRON wallet.
         """
-        try:
-            # Load contract with ABI
-            contract = tron_client.get_contract(USDT_CONTRACT).with_abi([
-                {
-                    "constant": True,
-                    "inputs": [{"name": "_owner", "type": "address"}],
-                    "name": "balanceOf",
-                    "outputs": [{"name": "balance", "type": "uint256"}],
-                    "payable": False,
-                    "stateMutability": "View",
-                    "type": "Function",
-                }
-            ])
-            
-            # Call balanceOf function
-            balance = contract.functions.balanceOf(address)
-            
-            return balance / 10**6  # Convert from SUN to USDT
-        except Exception as e:
-            print(f"Error fetching USDT balance: {e}")
-            return 0
+        return await TronWallet.get_usdt_balance(address)
 
     @staticmethod
     async def get_sol_balance(public_key: str) -> float:
@@ -183,23 +156,82 @@ class WalletService:
         :return: The SOL balance as a float.
         """
         try:
-            # Convert the public key string to a Pubkey object
-            publickey = Pubkey.from_string(public_key)
-
-            # Fetch the balance using the Solana client (without await)
-            response = solana_client.get_balance(publickey)
-
-            # Extract the balance value from the response
-            balance = response.value
-
-            print(f"Balance: {balance}")  # Debugging output
-
-            # Convert lamports to SOL (1 SOL = 1e9 lamports)
-            return balance / 1e9
+            # Served from the balance cache, one RPC for concurrent lookups
+            return await fetch_sol_balance(public_key)
         except Exception as e:
             print(f"Error fetching SOL balance: {e}")
             return 0.0
 
+    @staticmethod
+    async def get_sol_balances(public_keys: Iterable[str]) -> Dict[str, float]:
+        """
+        Retrieve the SOL balances of several wallets with getMultipleAccounts,
+        one call per SOL_ACCOUNTS_PER_CALL wallets not cached.
+        :param public_keys: The public keys of the wallets.
+        :return: The SOL balances by public key.
+        """
+
+        async def fetch_many(missing):
+            chunks = [
+                missing[i : i + SOL_ACCOUNTS_PER_CALL]
+                for i in range(0, len(missing), SOL_ACCOUNTS_PER_CALL)
+            ]
+            responses = await asyncio.gather(
+                *(
+                    solana_rpc(
+                        "get_multiple_accounts",
+                        [Pubkey.from_string(key) for key in chunk],
+                        # Only the lamports are needed, not the account data
+                        data_slice=DataSliceOpts(offset=0, length=0),
+                    )
+                    for chunk in chunks
+                )
+            )
+            balances = {}
+            for chunk, response in zip(chunks, responses):
+                for key, account in zip(chunk, response.value):
+                    # A wallet never funded has no account yet
+                    balances[key] = account.lamports / 1e9 if account else 0.0
+            return balances
+
+        return await balance_cache.get_many("SOL", public_keys, fetch_many)
+
+    @staticmethod
+    async def get_wallet_balances(
+        wallets: List[Wallet], refresh: bool = False
+    ) -> Dict[str, Optional[float]]:
+        """
+        Retrieve the balances of wallets of any type concurrently, so a list
+        of wallets costs about one RPC round trip.
+        :param wallets: The wallets.
+        :param refresh: Whether to skip the cached balances.
+        :return: The balances by public key, None where it could not be fetched.
+        """
+        fetchers = {
+            "SOL": WalletService.get_sol_balances,
+            "USDT": TronWallet.get_usdt_balances,
+        }
+        keys_by_type = {}
+        for wallet in wallets:
+            if wallet.wallet_type in fetchers:
+                keys_by_type.setdefault(wallet.wallet_type, []).append(wallet.public_key)
+        if refresh:
+            for wallet_type, keys in keys_by_type.items():
+                balance_cache.invalidate(wallet_type, *keys)
+
+        wallet_types = list(keys_by_type)
+        results = await asyncio.gather(
+            *(fetchers[t](keys_by_type[t]) for t in wallet_types),
+            return_exceptions=True,
+        )
+        balances = {}
+        for wallet_type, result in zip(wallet_types, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Error fetching {wallet_type} balances: {result}")
+                continue
+            balances.update(result)
+        return {wallet.public_key: balances.get(wallet.public_key) for wallet in wallets}
+
     @staticmethod
     async def get_wallet_by_id(id: PydanticObjectId) -> dict:
         """
@@ -220,19 +252,17 @@ class WalletService:
         """
         Generalized method to transfer funds, supports both SOL and USDT.
         :param wallet_type: The type of wallet (e.g., "SOL" or "USDT").
-        :param sender_private_key: The sender's private key.
+        :param sender_private_key: The sender's private key (Base58 encoded).
         :param recipient_public_key: The recipient's public key.
         :param amount: The amount to transfer.
         :return: Transaction signature if successful, or an error message.
         """
         try:
-
-            sender_keypair = Keypair.from_secret_key(bytes.fromhex(sender_private_key))
-            sender_pubkey = sender_keypair.pubkey()
-
             if wallet_type == "SOL":
                 return await WalletService.transfer_sol(
-                    sender_keypair, recipient_public_key, amount
+                    Keypair.from_base58_string(sender_private_key),
+                    recipient_public_key,
+                    amount,
                 )
             elif wallet_type == "USDT":
                 return await WalletService.transfer_usdt(
@@ -250,33 +280,44 @@ class WalletService:
     ) -> str:
         """
         Transfer USDT from one wallet to another.
-        :param sender_private_key: The private key of the sender's wallet.
+        :param sender_private_key: The private key of the sender's wallet
+            (Base58 encoded, as the wallets store it).
         :param recipient_public_key: The public key of the recipient's wallet.
         :param amount: The amount to transfer.
         :return: The transaction signature if successful.
         """
         try:
-            sender_keypair = Keypair.from_secret_key(bytes.fromhex(sender_private_key))
+            sender_keypair = Keypair.from_base58_string(sender_private_key)
             sender_pubkey = sender_keypair.pubkey()
             usdt_mint = Pubkey.from_string(USDT_MINT_ADDRESS)
-            token_client = Token(
-                solana_client, usdt_mint, TOKEN_PROGRAM_ID, sender_keypair
+            token_client = AsyncToken(
+                get_solana_client(), usdt_mint, TOKEN_PROGRAM_ID, sender_keypair
             )
 
-            sender_token_account = token_client.get_accounts(sender_pubkey)[0].address
-            recipient_token_account = token_client.create_associated_token_account(
-                Pubkey.from_string(recipient_public_key)
+            sender_accounts = await token_client.get_accounts_by_owner(sender_pubkey)
+            sender_token_account = sender_accounts.value[0].pubkey
+            recipient_token_account = (
+                await token_client.create_associated_token_account(
+                    Pubkey.from_string(recipient_public_key)
+                )
             )
 
-            tx_sig = token_client.transfer(
+            tx_response = await token_client.transfer(
                 source=sender_token_account,
                 dest=recipient_token_account,
-                owner=sender_pubkey,
+                owner=sender_keypair,
                 amount=int(
                     amount * 1_000_000
                 ),  # Convert to lamports (USDT has 6 decimals)
             )
-            return str(tx_sig)
+            # The sender paid the fees in SOL
+            balance_cache.invalidate("SOL", str(sender_pubkey))
+            balance_cache.invalidate_when(
+                signature_tracker.wait(str(tx_response.value)),
+                "SOL",
+                str(sender_pubkey),
+            )
+            return str(tx_response.value)
         except Exception as e:
             print(f"Error transferring USDT: {e}")
             return f"❌ Error: {str(e)}"
@@ -284,20 +325,20 @@ class WalletService:
     @staticmethod
     async def confirm_transaction(transaction_signature: str) -> dict:
         """
-        Confirm a transaction's status on the Solana blockchain.
+        Wait for a transaction to be confirmed on the Solana blockchain. The
+        signature is polled with the other outstanding ones by the signature
+        tracker, until confirmed, failed or expired.
         :param transaction_signature: The signature of the transaction to confirm.
         :return: A dictionary with the transaction status.
         """
         try:
-            response = solana_client.get_confirmed_transaction(transaction_signature)
-            if response["result"] is None:
-                return {"status": "error", "message": "Transaction not confirmed"}
-
-            status = response["result"]["meta"]["status"]
-            if status["Ok"]:
+            status = await signature_tracker.wait(transaction_signature)
+            if status == "confirmed":
                 return {"status": "success", "message": "Transaction confirmed"}
-            else:
+            elif status == "failed":
                 return {"status": "error", "message": "Transaction failed"}
+            else:
+                return {"status": "error", "message": "Transaction not confirmed"}
         except Exception as e:
             print(f"Error confirming transaction: {e}")
             return {"status": "error", "message": f"❌ Error: {str(e)}"}
@@ -305,26 +346,27 @@ class WalletService:
     @staticmethod
     async def refresh_wallet(wallet_type: str, user_id: int):
         """
-        Refresh a wallet's balance for SOL or USDT.
+        Refresh the balances of a user's SOL or USDT wallets.
         :param wallet_type: The type of wallet to refresh ("SOL" or "USDT").
-        :param user_id: The user_id to identify the wallet.
-        :return: A dictionary containing the wallet's balance information.
+        :param user_id: The user_id to identify the wallets.
+        :return: A dictionary with the total balance and the balance of each
+            wallet by public key.
         """
         try:
-            wallets = await WalletService.get_wallet_by_user(user_id)
-            wallet = next((w for w in wallets if w.wallet_type == wallet_type), None)
+            if wallet_type not in ("SOL", "USDT"):
+                return {"status": "error", "message": "Invalid wallet type"}
 
-            if not wallet:
+            wallets = await WalletService.get_wallet_by_user(user_id)
+            wallets = [w for w in wallets if w.wallet_type == wallet_type]
+            if not wallets:
                 return {"status": "error", "message": "Wallet not found"}
 
-            if wallet_type == "SOL":
-                balance = await WalletService.get_sol_balance(wallet.public_key)
-                return {"status": "success", "balance": balance}
-            elif wallet_type == "USDT":
-                balance = await WalletService.get_usdt_balance(wallet.public_key)
-                return {"status": "success", "balance": balance}
-            else:
-                return {"status": "error", "message": "Invalid wallet type"}
+            balances = await WalletService.get_wallet_balances(wallets, refresh=True)
+            return {
+                "status": "success",
+                "balance": sum(b for b in balances.values() if b is not None),
+                "balances": balances,
+            }
 
         except Exception as e:
             print(f"Error refreshing wallet: {e}")
@@ -354,15 +396,20 @@ class WalletService:
         """
         try:
             if wallet_type == "SOL":
-                balance = await solana_client.get_balance(Pubkey(public_key))
-                return {"status": "success", "balance": balance["result"]["value"]}
+                balance = await solana_rpc(
+                    "get_balance", Pubkey.from_string(public_key)
+                )
+                return {"status": "success", "balance": balance.value}
             elif wallet_type == "USDT":
-                token_account = await solana_client.get_token_account_balance(
-                    Pubkey(public_key), mint=Pubkey(USDT_MINT_ADDRESS)
+                token_account = get_associated_token_address(
+                    Pubkey.from_string(public_key), Pubkey.from_string(USDT_MINT_ADDRESS)
+                )
+                token_balance = await solana_rpc(
+                    "get_token_account_balance", token_account
                 )
                 return {
                     "status": "success",
-                    "balance": token_account["result"]["value"]["uiAmount"],
+                    "balance": token_balance.value.ui_amount,
                 }
             else:
                 return {"status": "error", "message": "Invalid wallet type"}
@@ -370,6 +417,137 @@ class WalletService:
             print(f"Error fetching wallet balance: {e}")
             return {"status": "error", "message": f"❌ Error: {str(e)}"}
 
+    @staticmethod
+    async def _build_transfer_transaction(
+        sender: Keypair, payments: List[Tuple[Pubkey, int]]
+    ) -> Transaction:
+        """
+        Build and sign one transaction holding a SOL transfer instruction per
+        payment, against the latest blockhash. The payments land together or
+        not at all, for one blockhash, one signature and one fee.
+
+        :param sender: The keypair paying and signing the transfers.
+        :param payments: The (recipient public key, lamports) pairs.
+        :return: The signed transaction.
+        """
+        instructions = [
+            transfer(
+                TransferParams(
+                    from_pubkey=sender.pubkey(),
+                    to_pubkey=recipient,
+                    lamports=lamports,
+                )
+            )
+            for recipient, lamports in payments
+        ]
+        # Shared and refreshed in the background, no round trip per send
+        recent_blockhash, _ = await blockhash_provider.get()
+        message = Message(instructions=instructions, payer=sender.pubkey())
+        return Transaction([sender], message, recent_blockhash)
+
+    @staticmethod
+    async def _send_sol_payments(sender: Keypair, payments: List[Tuple[Pubkey, int]]):
+        """
+        Build and send a SOL transfer, building it again once on a fresh
+        blockhash if the node did not know the shared one.
+
+        :param sender: The keypair paying and signing the transfers.
+        :param payments: The (recipient public key, lamports) pairs.
+        :return: The send_transaction response.
+        """
+        for attempt in range(2):
+            transaction = await WalletService._build_transfer_transaction(
+                sender, payments
+            )
+            try:
+                response = await WalletService.broadcast_sol(transaction)
+            except Exception as e:
+                # Rejected before forwarding, so sending it again cannot pay twice
+                if attempt or not is_blockhash_not_found(e):
+                    raise
+            else:
+                # Sent outside the outbox, which forgets them itself once finished
+                balance_cache.invalidate_when(
+                    signature_tracker.wait(str(response.value)),
+                    "SOL",
+                    *(str(key) for key in transaction.message.account_keys),
+                )
+                return response
+
+    @staticmethod
+    async def build_sol_payout(
+        sender_private_key: str, payments: List[Tuple[str, float]]
+    ) -> Transaction:
+        """
+        Build and sign a SOL payout to several recipients (e.g. the finder
+        and the tax wallet) as one transaction, without sending it.
+
+        :param sender_private_key: The private key of the sender (Base58 encoded).
+        :param payments: The (recipient public key, amount in SOL) pairs.
+        :return: The signed transaction.
+        """
+        sender = Keypair.from_base58_string(sender_private_key)
+        return await WalletService._build_transfer_transaction(
+            sender,
+            [
+                (Pubkey.from_string(recipient), int(amount_sol * 1_000_000_000))
+                for recipient, amount_sol in payments
+            ],
+        )
+
+    @staticmethod
+    async def build_sol_transfer(
+        sender_private_key: str, recipient_address: str, amount_sol: float
+    ) -> Transaction:
+        """
+        Build and sign a SOL transfer without sending it, so its signature is
+        known before it can land.
+
+        :param sender_private_key: The private key of the sender (Base58 encoded).
+        :param recipient_address: The public key of the recipient.
+        :param amount_sol: The amount of SOL to send.
+        :return: The signed transaction.
+        """
+        return await WalletService.build_sol_payout(
+            sender_private_key, [(recipient_address, amount_sol)]
+        )
+
+    @staticmethod
+    async def get_signature_status(
+        signature: str, search_history: bool = False
+    ) -> Optional[str]:
+        """
+        Status of a sent transaction: "confirmed" once it is confirmed without
+        error, "failed" if it landed with an error, None while it is unknown.
+
+        :param signature: The transaction signature.
+        :param search_history: Whether to look past the recent status cache
+            of the node, for transactions older than a few minutes.
+        :return: The status.
+        """
+        statuses = await fetch_signature_statuses([signature], search_history)
+        return statuses[0]
+
+    @staticmethod
+    async def broadcast_sol(transaction: Transaction):
+        """
+        Send a signed SOL transfer and forget the balances it changes.
+
+        :param transaction: A transaction built by build_sol_payout.
+        :return: The send_transaction response.
+        """
+        try:
+            response = await solana_rpc("send_transaction", transaction)
+        except Exception as e:
+            if is_blockhash_not_found(e):
+                blockhash_provider.invalidate(transaction.message.recent_blockhash)
+            raise
+        # The payer and every recipient are accounts of the message
+        balance_cache.invalidate(
+            "SOL", *(str(key) for key in transaction.message.account_keys)
+        )
+        return response
+
     @catch_async
     @staticmethod
     async def send_sol(
@@ -386,23 +564,9 @@ class WalletService:
         lamports = int(amount_sol * 1_000_000_000)
         sender = Keypair.from_base58_string(sender_private_key)
         recipient = Pubkey.from_string(recipient_address)
-        instruction = transfer(
-            TransferParams(
-                from_pubkey=sender.pubkey(),
-                to_pubkey=recipient,
-                lamports=lamports,
-            )
+        send_response = await WalletService._send_sol_payments(
+            sender, [(recipient, lamports)]
         )
-        blockhash_response = solana_client.get_latest_blockhash()
-        recent_blockhash = blockhash_response.value.blockhash
-        message = Message(instructions=[instruction], payer=sender.pubkey())
-        transaction = Transaction(
-            from_keypairs=[sender],
-            message=message,
-            recent_blockhash=recent_blockhash,
-        )
-        transaction.sign([sender], recent_blockhash=recent_blockhash)
-        send_response = solana_client.send_transaction(transaction)
         print(f"Transaction sent! Transaction signature: {send_response}")
         return f"Transaction sent! Transaction signature: {send_response}"
 
@@ -421,99 +585,19 @@ class WalletService:
 
     # HISTORY OF THE WALLET
     @staticmethod
-    async def get_sol_history(wallet_address: str) -> list:
+    async def get_sol_history(wallet_address: str) -> List[HistoryEntry]:
         """
-        Retrieve SOL transaction history for a given Solana wallet address.
+        Retrieve the latest transactions of a Solana wallet.
         :param wallet_address: The public Solana wallet address.
-        :return: A list of SOL transactions with details.
+        :return: The transactions, newest first.
         """
-        async with AsyncClient(CLIENT) as client:
-            try:
-                # Fetch the latest transaction signatures
-                response = await client.get_signatures_for_address(wallet_address)
-
-                if not response or "result" not in response or not response["result"]:
-                    return []
-
-                transactions = response["result"]
-                tx_details = []
-
-                for tx in transactions[:10]:  # Fetch last 10 transactions
-                    tx_info = await client.get_transaction(tx["signature"])
-                    if tx_info and "result" in tx_info:
-                        meta = tx_info["result"]["meta"]
-                        pre_balances = meta["preBalances"]
-                        post_balances = meta["postBalances"]
-
-                        # Check if it's a SOL transfer
-                        if (
-                            pre_balances
-                            and post_balances
-                            and pre_balances[0] != post_balances[0]
-                        ):
-                            amount = (
-                                pre_balances[0] - post_balances[0]
-                            ) / 1_000_000_000  # Convert lamports to SOL
-                            tx_details.append(
-                                {
-                                    "signature": tx["signature"],
-                                    "block_time": tx_info["result"]["blockTime"],
-                                    "amount": f"{amount} SOL",
-                                    "fee": f"{meta['fee'] / 1_000_000_000} SOL",
-                                }
-                            )
-
-                return tx_details
-
-            except Exception as e:
-                print(f"Error fetching SOL history: {e}")
-                return []
+        return await HistoryService.get_history("SOL", wallet_address)
 
     @staticmethod
-    async def get_sol_history(wallet_address: str) -> list:
+    async def get_usdt_history(wallet_address: str) -> List[HistoryEntry]:
         """
-        Retrieve SOL transaction history for a given Solana wallet address.
-        :param wallet_address: The public Solana wallet address.
-        :return: A list of SOL transactions with details.
+        Retrieve the latest USDT (TRC20) transfers of a TRON wallet.
+        :param wallet_address: The public TRON wallet address.
+        :return: The transfers, newest first.
         """
-        async with AsyncClient(CLIENT) as client:
-            try:
-                # Fetch the latest transaction signatures
-                response = await client.get_signatures_for_address(wallet_address)
-
-                if not response or "result" not in response or not response["result"]:
-                    return []
-
-                transactions = response["result"]
-                tx_details = []
-
-                for tx in transactions[:10]:  # Fetch last 10 transactions
-                    tx_info = await client.get_transaction(tx["signature"])
-                    if tx_info and "result" in tx_info:
-                        meta = tx_info["result"]["meta"]
-                        pre_balances = meta["preBalances"]
-                        post_balances = meta["postBalances"]
-
-                        # Check if it's a SOL transfer
-                        if (
-                            pre_balances
-                            and post_balances
-                            and pre_balances[0] != post_balances[0]
-                        ):
-                            amount = (
-                                pre_balances[0] - post_balances[0]
-                            ) / 1_000_000_000  # Convert lamports to SOL
-                            tx_details.append(
-                                {
-                                    "signature": tx["signature"],
-                                    "block_time": tx_info["result"]["blockTime"],
-                                    "amount": f"{amount} SOL",
-                                    "fee": f"{meta['fee'] / 1_000_000_000} SOL",
-                                }
-                            )
-
-                return tx_details
-
-            except Exception as e:
-                print(f"Error fetching SOL history: {e}")
-                return []
+        return await HistoryService.get_history("USDT", wallet_address)
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from typing import Optional, Tuple
+
+from solders.hash import Hash
+
+from config.config_manager import BLOCKHASH_MAX_AGE_SECONDS, BLOCKHASH_REFRESH_SECONDS
+from utils.logger import logger
+from utils.solana_config import solana_rpc
+
+
+def is_blockhash_not_found(error: Exception) -> bool:
+    """Whether a send was rejected because the node does not know its blockhash."""
+    message = str(error).lower().replace(" ", "")
+    return "blockhashnotfound" in message
+
+
+class BlockhashProvider:
+    """
+    Recent blockhash shared by every Solana send.
+
+    The blockhash is refreshed in the background every refresh_seconds, so
+    a send does not pay a getLatestBlockhash round trip. One older than
+    max_age (well within the ~150 blocks it stays valid) is fetched again
+    on use, with concurrent senders sharing the call.
+    """
+
+    def __init__(
+        self,
+        refresh_seconds: float = BLOCKHASH_REFRESH_SECONDS,
+        max_age: float = BLOCKHASH_MAX_AGE_SECONDS,
+    ):
+        self.refresh_seconds = refresh_seconds
+        self.max_age = max_age
+        # (blockhash, last valid block height, monotonic time fetched)
+        self._latest: Optional[Tuple[Hash, int, float]] = None
+        self._fetch: Optional[asyncio.Future] = None
+        self._refresher: Optional[asyncio.Task] = None
+
+    async def get(self) -> Tuple[Hash, int]:
+        """
+        A blockhash still valid for a while.
+
+        :return: The blockhash and the last block height it is valid at.
+        """
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_loop())
+        latest = self._latest
+        if latest is None or time.monotonic() - latest[2] > self.max_age:
+            latest = await self._refresh()
+        return latest[0], latest[1]
+
+    def invalidate(self, blockhash: Optional[Hash] = None):
+        """
+        Drop the cached blockhash, e.g. after a blockhash-not-found error,
+        unless another one was fetched meanwhile.
+        """
+        if blockhash is None or (self._latest and self._latest[0] == blockhash):
+            self._latest = None
+
+    async def _refresh(self) -> Tuple[Hash, int, float]:
+        if self._fetch is None:
+            self._fetch = asyncio.ensure_future(self._fetch_latest())
+            self._fetch.add_done_callback(self._fetched)
+        # Shielded: the fetch is shared with the other senders
+        return await asyncio.shield(self._fetch)
+
+    async def _fetch_latest(self) -> Tuple[Hash, int, float]:
+        response = await solana_rpc("get_latest_blockhash")
+        return (
+            response.value.blockhash,
+            response.value.last_valid_block_height,
+            time.monotonic(),
+        )
+
+    def _fetched(self, future: asyncio.Future):
+        self._fetch = None
+        if not future.cancelled() and future.exception() is None:
+            self._latest = future.result()
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self._refresh()
+            except Exception as e:
+                logger.warning(f"Could not refresh the recent blockhash: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    async def stop(self):
+        """
+        Stop the background refresh.
+        """
+        if self._refresher is not None:
+            self._refresher.cancel()
+            await asyncio.gather(self._refresher, return_exceptions=True)
+            self._refresher = None
+
+
+blockhash_provider = BlockhashProvider()
@@ -1,3 +1,4 @@
+import asyncio
 import cloudinary
 from cloudinary.uploader import upload
 from config.config_manager import (
@@ -24,32 +25,42 @@ class CloudinaryError(Exception):
         super().__init__(message)
 
 
-async def upload_image(image: str):
+def upload_file(source, resource_type: str = "image", **options) -> str:
+    """
+    Upload a file to Cloudinary and return its secure URL. This call blocks,
+    run it in a worker thread.
+
+    :param source: A file path, file-like object or bytes.
+    :param resource_type: "image" or "video".
+    :return: The secure URL of the uploaded file.
+    """
     try:
-        upload_result = upload(image)
-        file_url = upload_result["secure_url"]
-        print(f"Uploaded Image URL: {file_url}")
-        return file_url
+        upload_result = upload(source, resource_type=resource_type, **options)
+        return upload_result["secure_url"]
     except cloudinary.exceptions.Error as e:
         print(f"Cloudinary error: {e}")
-        raise CloudinaryError("Error uploading image to Cloudinary.", e.response)
+        raise CloudinaryError(
+            f"Error uploading {resource_type} to Cloudinary.",
+            getattr(e, "response", None),
+        )
+
+
+async def upload_image(image: str):
+    file_url = await asyncio.to_thread(upload_file, image)
+    print(f"Uploaded Image URL: {file_url}")
+    return file_url
 
 
 async def upload_video(file_path: str):
     """Upload the video file to Cloudinary."""
-    try:
-        # Cloudinary upload for video
-        upload_result = upload(
-            file_path,
-            resource_type="video",  # Specifies the upload type as video
-            folder="proofs",  # Optional: Upload to a specific folder
-            public_id=file_path,  # Optional: Use the file's path as its public ID
-        )
-        # Return the secure URL for the uploaded video
-        file_url = upload_result["secure_url"]
-        print(f"Uploaded Video URL: {file_url}")
-        return file_url
-    except cloudinary.exceptions.Error as e:
-        # Handle any errors from Cloudinary during the upload process
-        print(f"Cloudinary upload error: {e}")
-        raise CloudinaryError("Error uploading video to Cloudinary.", e.response)
+    # Cloudinary upload for video
+    file_url = await asyncio.to_thread(
+        upload_file,
+        file_path,
+        resource_type="video",  # Specifies the upload type as video
+        folder="proofs",  # Optional: Upload to a specific folder
+        public_id=file_path,  # Optional: Use the file's path as its public ID
+    )
+    # Return the secure URL for the uploaded video
+    print(f"Uploaded Video URL: {file_url}")
+    return file_url
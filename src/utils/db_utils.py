@@ -1,4 +1,11 @@
-from pymongo import MongoClient
+from typing import Optional, Type, TypeVar, Union
+
+from beanie import Document, Link
+from beanie.odm.utils.encoder import Encoder
+from bson import DBRef, ObjectId
+from pymongo import MongoClient, ReturnDocument
+
+DocumentType = TypeVar("DocumentType", bound=Document)
 
 
 # MongoDB connection setup
@@ -33,3 +40,58 @@ def get_user_data(collection, user_id):
 # Delete user data from MongoDB
 def delete_user_data(collection, user_id):
     collection.delete_one({"user_id": user_id})
+
+
+def link_ref(
+    model: Type[Document], value: Union[str, ObjectId, Document, Link, DBRef]
+) -> DBRef:
+    """
+    Build the DBRef stored for a Link field without fetching the linked document.
+
+    :param model: The document class the link points to.
+    :param value: The linked document, an unfetched Link or DBRef to it, or its id.
+    :return: The DBRef Beanie stores for the link.
+    """
+    if isinstance(value, Link):
+        value = value.ref
+    if isinstance(value, DBRef):
+        value = value.id
+    elif isinstance(value, Document):
+        value = value.id
+    return DBRef(model.get_collection_name(), ObjectId(str(value)))
+
+
+async def find_one_and_upsert(
+    model: Type[DocumentType],
+    query: dict,
+    fields: dict,
+    on_insert: Optional[dict] = None,
+) -> DocumentType:
+    """
+    Atomically update the matching document, or create it, in one round trip.
+
+    Only the given fields are written with $set. on_insert values are applied
+    when the document is created and never overwrite the $set fields. With no
+    fields the matching document is returned as is, or created.
+
+    :param model: The document class of the collection.
+    :param query: Filter of the document to update; its fields seed a new document.
+    :param fields: The fields to set.
+    :param on_insert: Defaults for a newly created document.
+    :return: The document after the update.
+    """
+    encoder = Encoder()
+    update = {}
+    if fields:
+        update["$set"] = encoder.encode(fields)
+    on_insert = {k: v for k, v in (on_insert or {}).items() if k not in fields}
+    if on_insert:
+        update["$setOnInsert"] = encoder.encode(on_insert)
+    if not update:
+        # Empty operators are rejected; the id is only written on insert
+        update["$setOnInsert"] = {"_id": ObjectId()}
+
+    document = await model.get_motor_collection().find_one_and_update(
+        query, update, upsert=True, return_document=ReturnDocument.AFTER
+    )
+    return model.model_validate(document)
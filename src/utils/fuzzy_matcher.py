@@ -0,0 +1,103 @@
+import unicodedata
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List, Set
+
+try:
+    # Optional, a faster and finer scorer for the fuzzy candidates
+    from rapidfuzz import fuzz
+except ImportError:
+    fuzz = None
+
+# Fuzzy suggestions returned when nothing contains the typed text
+FUZZY_MATCH_LIMIT = 10
+# Minimum similarity (0-1) of a fuzzy suggestion
+FUZZY_MIN_SCORE = 0.45
+
+
+def fold(text: str) -> str:
+    """Lower-case the text and strip accents, so "quebec" matches "Québec"."""
+    decomposed = unicodedata.normalize("NFKD", text.strip().lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def trigrams(text: str) -> Set[str]:
+    """The trigrams of a folded text, padded so short words and word starts count."""
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyMatcher:
+    """
+    In-memory matcher over a fixed list of names.
+
+    Names containing the typed text are returned first (prefix matches ahead
+    of the others, then in the original order of the names). When none do,
+    e.g. because of a typo, the names sharing the most trigrams with the text
+    are suggested, best first.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = list(dict.fromkeys(names))
+        self.folded: List[str] = [fold(name) for name in self.names]
+        self._grams: List[Set[str]] = [trigrams(name) for name in self.folded]
+        # All folded names in one string, so the substring pass runs in str.find
+        self._haystack = "\n".join(self.folded)
+        self._offsets: List[int] = []
+        offset = 0
+        for folded in self.folded:
+            self._offsets.append(offset)
+            offset += len(folded) + 1
+        self._index: Dict[str, List[int]] = {}
+        for position, grams in enumerate(self._grams):
+            for gram in grams:
+                self._index.setdefault(gram, []).append(position)
+
+    def _score(self, query: str, query_grams: Set[str], position: int, shared: int) -> float:
+        if fuzz is not None:
+            return fuzz.ratio(query, self.folded[position]) / 100
+        # Dice coefficient of the trigram sets
+        return 2 * shared / (len(query_grams) + len(self._grams[position]))
+
+    def match(self, query: str, limit: int = FUZZY_MATCH_LIMIT) -> List[str]:
+        """
+        Match the typed text against the names.
+
+        :param query: The text typed by the user.
+        :param limit: Maximum number of fuzzy suggestions.
+        :return: The matching names, best first.
+        """
+        # A line break would match across two names of the haystack
+        query = fold(query).replace("\n", " ")
+        positions = set()
+        start = self._haystack.find(query)
+        while query and start != -1:
+            position = bisect_right(self._offsets, start) - 1
+            positions.add(position)
+            # Go on from the next name, each name is listed once
+            next_name = self._offsets[position] + len(self.folded[position]) + 1
+            start = self._haystack.find(query, next_name)
+        if not query:
+            positions = range(len(self.names))
+
+        prefix, substring = [], []
+        for position in sorted(positions):
+            if self.folded[position].startswith(query):
+                prefix.append(self.names[position])
+            else:
+                substring.append(self.names[position])
+        if prefix or substring:
+            return prefix + substring
+
+        query_grams = trigrams(query)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._index.get(gram, ()))
+
+        scored = []
+        for position, count in shared.items():
+            score = self._score(query, query_grams, position, count)
+            if score >= FUZZY_MIN_SCORE:
+                scored.append((score, position))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [self.names[position] for _, position in scored[:limit]]
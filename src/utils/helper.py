@@ -2,11 +2,15 @@ import logging
 import math
 import random
 
-import geonamescache
-import pycountry
-
 from constant.language_constant import ITEMS_PER_PAGE
 
+# Re-exported, the handlers import the location helpers from here
+from utils.location_index import (  # noqa: F401
+    get_cities_by_country,
+    get_city_matches,
+    get_country_matches,
+)
+
 
 def generate_tac():
     """Generate a 6-digit TAC."""
@@ -34,15 +38,6 @@ def transfer_to_escrow(wallet, amount):
     return True  # Simulate success
 
 
-def get_city_matches(country_name, query):
-    return [
-        c for c in get_cities_by_country(country_name) if query.lower() in c.lower()
-    ]
-
-
-gc = geonamescache.GeonamesCache()
-
-
 def paginate_list(items, page, items_per_page=ITEMS_PER_PAGE):
     """Helper to paginate list items."""
     total_pages = max(1, math.ceil(len(items) / items_per_page)) if items else 1
@@ -52,24 +47,6 @@ def paginate_list(items, page, items_per_page=ITEMS_PER_PAGE):
     return items[start:end], total_pages
 
 
-def get_country_matches(query):
-    query = query.lower()
-    return [c.name for c in pycountry.countries if query in c.name.lower()]
-
-
-def get_cities_by_country(country_name):
-    country = pycountry.countries.get(name=country_name)
-    if not country:
-        return []
-    country_code = country.alpha_2
-    all_cities = gc.get_cities().values()
-    filtered = [city for city in all_cities if city["countrycode"] == country_code]
-    if not filtered:
-        return []
-    sorted_cities = sorted(filtered, key=lambda x: x["population"], reverse=True)
-    return [city["name"] for city in sorted_cities[:50]]
-
-
 # Setup logging
 def setup_logging():
     logging.basicConfig(
@@ -0,0 +1,89 @@
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from constant.language_constant import CATALOG, get_lang
+
+# Static menus: rows of (text key, callback data)
+MENUS: Dict[str, List[List[Tuple[str, str]]]] = {
+    "wallet": [
+        [("refresh_btn", "refresh_wallets")],
+        [("sol_btn", "sol_wallets"), ("usdt_btn", "usdt_wallets")],
+        [("address_btn", "show_address")],
+        [("history_btn", "view_history")],
+        [("create_wallet_btn", "create_wallet"), ("delete_wallet_btn", "delete_wallet")],
+    ],
+    "wallet_type": [
+        [("usdt_btn", "USDT"), ("sol_btn", "SOL")],
+    ],
+    "settings": [
+        [("btn_language", "settings_language")],
+        [("btn_mobile_number", "settings_mobile")],
+        [("btn_close_menu", "settings_close")],
+    ],
+    "choose_action": [
+        [("advertise_btn", "advertise"), ("find_btn", "find_people")],
+    ],
+}
+
+# Language pickers: callback data prefix and the languages offered, each
+# button labelled in its own language
+LANGUAGE_PICKERS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "start": ("lang_", ("en", "zh")),
+    "settings": ("setlang_", ("en", "zh", "ms")),
+}
+
+
+@lru_cache(maxsize=None)
+def build_menu(name: str, lang: str) -> InlineKeyboardMarkup:
+    """
+    Build a static menu in a language. Markups are immutable, so each one
+    is built once and shared by every user of that language.
+    """
+    table = CATALOG[lang]
+    return InlineKeyboardMarkup(
+        [
+            [InlineKeyboardButton(table[key], callback_data=data) for key, data in row]
+            for row in MENUS[name]
+        ]
+    )
+
+
+def get_menu(user_id: int, name: str) -> InlineKeyboardMarkup:
+    """
+    The static menu in the user's language.
+
+    :param user_id: The Telegram user ID.
+    :param name: The menu name, a key of MENUS.
+    :return: The cached markup.
+    """
+    return build_menu(name, get_lang(user_id))
+
+
+@lru_cache(maxsize=None)
+def get_language_picker(name: str) -> InlineKeyboardMarkup:
+    """
+    The language picker, the same for every user.
+
+    :param name: The picker name, a key of LANGUAGE_PICKERS.
+    :return: The cached markup.
+    """
+    prefix, langs = LANGUAGE_PICKERS[name]
+    return InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton(CATALOG[lang]["lang_button"], callback_data=prefix + lang)
+                for lang in langs
+            ]
+        ]
+    )
+
+
+def prebuild_keyboards():
+    """Build every static keyboard ahead of the first update."""
+    for name in MENUS:
+        for lang in CATALOG:
+            build_menu(name, lang)
+    for name in LANGUAGE_PICKERS:
+        get_language_picker(name)
@@ -0,0 +1,153 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import geonamescache
+import pycountry
+
+from utils.fuzzy_matcher import FuzzyMatcher, fold
+from utils.logger import logger
+
+# Cities offered per country, the most populated first
+CITIES_PER_COUNTRY = 50
+
+# alpha_2 country code -> (folded name, display name), sorted by folded name
+_province_index: Optional[Dict[str, List[Tuple[str, str]]]] = None
+# alpha_2 country code -> (folded name, display name), by population
+_city_index: Optional[Dict[str, List[Tuple[str, str]]]] = None
+# Fuzzy matchers, built on first use, the per-country ones keyed by alpha_2 code
+_country_matcher: Optional[FuzzyMatcher] = None
+_province_matchers: Dict[str, FuzzyMatcher] = {}
+_city_matchers: Dict[str, FuzzyMatcher] = {}
+
+
+@lru_cache(maxsize=512)
+def resolve_country_code(country_name: str) -> Optional[str]:
+    """
+    Resolve a country name (as offered by get_country_matches) to its alpha_2 code.
+    """
+    country = pycountry.countries.get(name=country_name)
+    if country is None:
+        try:
+            country = pycountry.countries.lookup(country_name)
+        except LookupError:
+            return None
+    return country.alpha_2
+
+
+def load_province_index() -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Build the per-country index of top-level subdivisions from the ISO 3166-2
+    data bundled with pycountry. Called once at startup, later calls reuse it.
+
+    :return: The index, mapping alpha_2 codes to sorted (folded, display) names.
+    """
+    global _province_index
+    if _province_index is not None:
+        return _province_index
+
+    index: Dict[str, List[Tuple[str, str]]] = {}
+    for subdivision in pycountry.subdivisions:
+        # Nested subdivisions (e.g. French departments) are not provinces
+        if subdivision.parent_code is not None:
+            continue
+        # Drop the local name suffix of names such as "Wales [Cymru GB-CYM]"
+        name = re.sub(r"\s*\[.*\]$", "", subdivision.name)
+        index.setdefault(subdivision.country_code, []).append((fold(name), name))
+
+    for entries in index.values():
+        entries.sort()
+    _province_index = index
+    logger.info(f"Loaded provinces of {len(index)} countries")
+    return index
+
+
+def get_provinces_for_country(country_name: str) -> List[str]:
+    """
+    Get the provinces/states of a country, from the offline index.
+
+    :param country_name: The country name.
+    :return: The province names, alphabetically.
+    """
+    code = resolve_country_code(country_name)
+    entries = load_province_index().get(code, [])
+    return [name for _, name in entries]
+
+
+def get_province_matches(query: str, country_name: str) -> List[str]:
+    """
+    Match the provinces of a country against the typed text, tolerating typos.
+
+    :param query: The text typed by the user.
+    :param country_name: The country name.
+    :return: The matching province names, best first.
+    """
+    code = resolve_country_code(country_name)
+    if code not in _province_matchers:
+        _province_matchers[code] = FuzzyMatcher(get_provinces_for_country(country_name))
+    return _province_matchers[code].match(query)
+
+
+def load_city_index() -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Build the per-country index of the most populated cities from the
+    geonamescache dataset. Called once at startup, later calls reuse it.
+
+    :return: The index, mapping alpha_2 codes to (folded, display) names by population.
+    """
+    global _city_index
+    if _city_index is not None:
+        return _city_index
+
+    by_country: Dict[str, list] = {}
+    for city in geonamescache.GeonamesCache().get_cities().values():
+        by_country.setdefault(city["countrycode"], []).append(city)
+
+    index = {}
+    for code, cities in by_country.items():
+        cities.sort(key=lambda city: city["population"], reverse=True)
+        index[code] = [
+            (fold(city["name"]), city["name"])
+            for city in cities[:CITIES_PER_COUNTRY]
+        ]
+    _city_index = index
+    logger.info(f"Loaded cities of {len(index)} countries")
+    return index
+
+
+def get_cities_by_country(country_name: str) -> List[str]:
+    """
+    Get the most populated cities of a country, from the offline index.
+
+    :param country_name: The country name.
+    :return: The city names, the most populated first.
+    """
+    code = resolve_country_code(country_name)
+    return [name for _, name in load_city_index().get(code, [])]
+
+
+def get_city_matches(country_name: str, query: str) -> List[str]:
+    """
+    Match the cities of a country against the typed text, tolerating typos.
+
+    :param country_name: The country name.
+    :param query: The text typed by the user.
+    :return: The matching city names, best first.
+    """
+    code = resolve_country_code(country_name)
+    if code not in _city_matchers:
+        _city_matchers[code] = FuzzyMatcher(get_cities_by_country(country_name))
+    return _city_matchers[code].match(query)
+
+
+def get_country_matches(query: str) -> List[str]:
+    """
+    Match the country names against the typed text, tolerating typos.
+
+    :param query: The text typed by the user.
+    :return: The matching country names, best first.
+    """
+    global _country_matcher
+    if _country_matcher is None:
+        _country_matcher = FuzzyMatcher(c.name for c in pycountry.countries)
+    return _country_matcher.match(query)
@@ -0,0 +1,221 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+from config.config_manager import (
+    RPC_ERROR_PENALTY_SECONDS,
+    RPC_FAILURE_COOLDOWN_SECONDS,
+    RPC_MAX_COOLDOWN_SECONDS,
+)
+from utils.logger import logger
+
+T = TypeVar("T")
+
+# Weight of the latest call in the moving latency and error rate averages
+_SMOOTHING = 0.2
+
+
+def parse_urls(value: Optional[str]) -> List[str]:
+    """The endpoints of a comma-separated setting, e.g. "https://a,https://b"."""
+    return [url.strip() for url in (value or "").split(",") if url.strip()]
+
+
+class TokenBucket:
+    """
+    Rate limit of an endpoint: rate requests per second on average, with
+    bursts of up to capacity requests.
+
+    Tokens are reserved in call order, so waiting callers are served first
+    come first served instead of racing for each new token.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def delay(self) -> float:
+        """Seconds before a new request would be allowed."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+    async def acquire(self):
+        """
+        Wait for a request to be allowed. A rate of 0 means no limit.
+        """
+        if self.rate <= 0:
+            return
+        self._refill()
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+class Endpoint:
+    """
+    An RPC node of a pool, its client, and how it has been answering.
+    """
+
+    def __init__(self, url: str, client: Any, bucket: TokenBucket):
+        self.url = url
+        self.client = client
+        self.bucket = bucket
+        # Moving averages of the answer time in seconds and of the failures
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.down_until = 0.0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.down_until
+
+    def score(self) -> float:
+        """
+        Expected seconds to an answer: the average latency, a penalty for
+        recent failures and the wait for a rate limit token. Endpoints not
+        measured yet score best, so they get measured.
+        """
+        return (
+            (self.latency or 0.0)
+            + self.error_rate * RPC_ERROR_PENALTY_SECONDS
+            + self.bucket.delay()
+        )
+
+    def record_success(self, elapsed: float):
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency += _SMOOTHING * (elapsed - self.latency)
+        self.error_rate *= 1 - _SMOOTHING
+        self.failures = 0
+        self.down_until = 0.0
+
+    def record_failure(self):
+        self.error_rate += _SMOOTHING * (1 - self.error_rate)
+        self.failures += 1
+        cooldown = min(
+            RPC_FAILURE_COOLDOWN_SECONDS * 2 ** (self.failures - 1),
+            RPC_MAX_COOLDOWN_SECONDS,
+        )
+        self.down_until = time.monotonic() + cooldown
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "latency": self.latency,
+            "error_rate": round(self.error_rate, 3),
+            "failures": self.failures,
+            "healthy": self.healthy(time.monotonic()),
+        }
+
+
+class EndpointPool:
+    """
+    Several RPC nodes of a chain behind one call.
+
+    A call goes to the healthy endpoint expected to answer first, given its
+    latency, its recent errors and its rate limit. A connection error, a
+    timeout or an HTTP error status (e.g. 429) puts the endpoint aside for a
+    cooldown doubling with each failure in a row, and the call fails over
+    to the next endpoint. Errors answered by the node itself, e.g. a
+    rejected transaction, are raised without failing over.
+
+    Every endpoint has its own token bucket shared by all the callers, so
+    the pool stays under the rate limit of each provider however many
+    requests are in flight.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        urls: List[str],
+        connect: Callable[[str], Any],
+        rate: float,
+        burst: float,
+        failover_errors: Tuple[Type[BaseException], ...],
+    ):
+        """
+        :param name: The name of the pool in the logs, e.g. "Solana".
+        :param urls: The endpoint URLs, at least one.
+        :param connect: Creates the client of an endpoint URL. Clients need
+            an async close().
+        :param rate: Requests per second allowed to each endpoint, 0 for no limit.
+        :param burst: Requests an endpoint may receive at once above the rate.
+        :param failover_errors: The errors meaning the endpoint did not answer.
+        """
+        if not urls:
+            raise ValueError(f"{name} RPC pool needs at least one endpoint")
+        self.name = name
+        self.failover_errors = failover_errors
+        self.endpoints = [
+            Endpoint(url, connect(url), TokenBucket(rate, burst)) for url in urls
+        ]
+
+    def ranked(self) -> List[Endpoint]:
+        """
+        The endpoints in the order a call tries them: the healthy ones by
+        score, then the ones cooling down, soonest back first.
+        """
+        now = time.monotonic()
+        healthy = [e for e in self.endpoints if e.healthy(now)]
+        down = [e for e in self.endpoints if not e.healthy(now)]
+        return sorted(healthy, key=Endpoint.score) + sorted(
+            down, key=lambda e: e.down_until
+        )
+
+    def best(self) -> Any:
+        """The client of the endpoint a call would go to first."""
+        return self.ranked()[0].client
+
+    async def call(self, request: Callable[[Any], Awaitable[T]]) -> T:
+        """
+        Run a request on the best endpoint, failing over to the next ones.
+
+        :param request: Coroutine function sending the request with the
+            client it is given.
+        :return: The result of the request.
+        """
+        error = None
+        for endpoint in self.ranked():
+            await endpoint.bucket.acquire()
+            started = time.monotonic()
+            try:
+                result = await request(endpoint.client)
+            except self.failover_errors as e:
+                endpoint.record_failure()
+                logger.warning(
+                    f"{self.name} RPC {endpoint.url} failed ({e!r}), "
+                    f"down for {endpoint.down_until - time.monotonic():.0f}s"
+                )
+                error = e
+                continue
+            except Exception:
+                # The node answered, only the request was refused
+                endpoint.record_success(time.monotonic() - started)
+                raise
+            endpoint.record_success(time.monotonic() - started)
+            return result
+        raise error
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """The state of every endpoint, for logs and load tests."""
+        return [endpoint.stats() for endpoint in self.endpoints]
+
+    async def close(self):
+        """
+        Close the client of every endpoint.
+        """
+        await asyncio.gather(
+            *(endpoint.client.close() for endpoint in self.endpoints),
+            return_exceptions=True,
+        )
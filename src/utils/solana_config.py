@@ -1,5 +1,102 @@
-from solana.rpc.api import Client
+import asyncio
+from typing import Optional, Set
 
+import httpx
+from solana.exceptions import SolanaRpcException
+from solana.rpc.async_api import AsyncClient
 
-SOLANA_NETWORK = "https://api.devnet.solana.com"
-solana_client = Client(SOLANA_NETWORK)
+from config.config_manager import (
+    CLIENT,
+    SOLANA_RPC_BURST,
+    SOLANA_RPC_MAX_CONCURRENCY,
+    SOLANA_RPC_MAX_CONNECTIONS,
+    SOLANA_RPC_RATE_PER_SECOND,
+    SOLANA_RPC_TIMEOUT,
+    SOLANA_RPC_URLS,
+)
+from utils.rpc_pool import EndpointPool, parse_urls
+
+
+# SOLANA_RPC_URLS lists several nodes, CLIENT is the single node of older setups
+SOLANA_RPC_ENDPOINTS = parse_urls(SOLANA_RPC_URLS) or [
+    CLIENT or "https://api.devnet.solana.com"
+]
+
+# One AsyncClient (and so one HTTP connection pool) per endpoint, shared by every call site
+_solana_pool: Optional[EndpointPool] = None
+_rpc_semaphore: Optional[asyncio.Semaphore] = None
+# Closing of the sessions replaced in _connect, referenced until done
+_closing: Set[asyncio.Task] = set()
+
+
+def _connect(url: str) -> AsyncClient:
+    client = AsyncClient(url, timeout=SOLANA_RPC_TIMEOUT)
+    # solana-py cannot size the keep-alive pool: the session it created is
+    # swapped for a sized one and closed, it never opened a connection
+    replaced = client._provider.session
+    task = asyncio.get_running_loop().create_task(replaced.aclose())
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+    client._provider.session = httpx.AsyncClient(
+        timeout=SOLANA_RPC_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=SOLANA_RPC_MAX_CONNECTIONS,
+            max_keepalive_connections=SOLANA_RPC_MAX_CONNECTIONS,
+        ),
+    )
+    return client
+
+
+def get_solana_pool() -> EndpointPool:
+    """
+    Return the shared pool of Solana endpoints, creating it on first use
+    (from the event loop).
+    """
+    global _solana_pool
+    if _solana_pool is None:
+        _solana_pool = EndpointPool(
+            "Solana",
+            SOLANA_RPC_ENDPOINTS,
+            _connect,
+            SOLANA_RPC_RATE_PER_SECOND,
+            SOLANA_RPC_BURST,
+            # solana-py wraps the httpx errors, including HTTP error statuses
+            (SolanaRpcException, httpx.HTTPError, OSError, asyncio.TimeoutError),
+        )
+    return _solana_pool
+
+
+def get_solana_client() -> AsyncClient:
+    """
+    Return the async Solana client of the best endpoint, for APIs that need
+    a client rather than a call (e.g. AsyncToken).
+    """
+    return get_solana_pool().best()
+
+
+async def solana_rpc(method: str, *args, **kwargs):
+    """
+    Call an AsyncClient method on the best endpoint, under the shared
+    concurrency limit, failing over to the other endpoints.
+
+    :param method: The AsyncClient method name, e.g. "get_balance".
+    :return: The RPC response.
+    """
+    global _rpc_semaphore
+    if _rpc_semaphore is None:
+        _rpc_semaphore = asyncio.Semaphore(SOLANA_RPC_MAX_CONCURRENCY)
+
+    async with _rpc_semaphore:
+        return await get_solana_pool().call(
+            lambda client: getattr(client, method)(*args, **kwargs)
+        )
+
+
+async def close_solana_client():
+    """
+    Close the clients of the pool and their connection pools.
+    """
+    global _solana_pool
+    if _solana_pool is not None:
+        await _solana_pool.close()
+        _solana_pool = None
@@ -0,0 +1,92 @@
+"""
+Compare the old substring scans with the trigram FuzzyMatcher over the full
+pycountry countries, ISO 3166-2 subdivisions and geonames cities:
+
+    python test/bench_fuzzy_matcher.py --queries 500
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import geonamescache
+import pycountry
+
+from utils.fuzzy_matcher import FuzzyMatcher, fuzz
+
+
+def typo(name, rng):
+    """Drop, swap or replace one character, like a hurried user would."""
+    chars = list(name.lower())
+    if len(chars) < 4:
+        return name.lower()
+    i = rng.randrange(1, len(chars) - 1)
+    kind = rng.choice(["drop", "swap", "replace"])
+    if kind == "drop":
+        del chars[i]
+    elif kind == "swap":
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    else:
+        chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars)
+
+
+def timed(fn, queries):
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(fn(query))
+        latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+def report(dataset, name, latencies, hits, total):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{dataset:<13} {name:<9} p50={statistics.median(latencies) * 1e6:8.1f}us "
+        f"p95={p95 * 1e6:8.1f}us  found {hits}/{total} misspelt names"
+    )
+
+
+def bench(dataset, names, count, rng):
+    build_start = time.perf_counter()
+    matcher = FuzzyMatcher(names)
+    build = time.perf_counter() - build_start
+    print(f"{dataset}: {len(matcher.names)} names, index built in {build * 1000:.0f}ms")
+
+    targets = rng.sample(matcher.names, min(count, len(matcher.names)))
+    queries = [typo(name, rng) for name in targets]
+
+    def substring(query):
+        return [name for name in matcher.names if query in name.lower()]
+
+    for label, fn in [("substring", substring), ("fuzzy", matcher.match)]:
+        results, latencies = timed(fn, queries)
+        hits = sum(target in result for target, result in zip(targets, results))
+        report(dataset, label, latencies, hits, len(queries))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"Scorer: {'rapidfuzz' if fuzz else 'trigram dice'}")
+
+    bench("countries", [c.name for c in pycountry.countries], args.queries, rng)
+    bench("subdivisions", [s.name for s in pycountry.subdivisions], args.queries, rng)
+    cities = geonamescache.GeonamesCache().get_cities().values()
+    bench("cities", [city["name"] for city in cities], args.queries, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Measure the get_text hot path: a plain lookup and a formatted text, against
+the former lookup on the mutable merged dict followed by str.format.
+
+    python test/bench_localization.py --calls 200000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from constant.language_constant import CATALOG, get_text
+from services import user_service
+
+USER_ID = 1
+# The former module-level state: mutable merged catalog and user_data_store
+LANG_DATA = {lang: dict(table) for lang, table in CATALOG.items()}
+user_data_store = {}
+
+
+def old_get_text(user_id, key):
+    lang = user_data_store.get(user_id, {}).get("lang", "en")
+    return LANG_DATA.get(lang, LANG_DATA["en"]).get(key, f"Undefined text for {key}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--lang", default="zh")
+    args = parser.parse_args()
+
+    # The language is resolved by the load_user_lang handler before get_text runs
+    user_service._lang_cache.set(USER_ID, args.lang)
+    user_data_store[USER_ID] = {"lang": args.lang}
+
+    cases = [
+        ("old lookup", lambda: old_get_text(USER_ID, "choose_country")),
+        ("get_text", lambda: get_text(USER_ID, "choose_country")),
+        (
+            "old format",
+            lambda: old_get_text(USER_ID, "city_multi").format(page=1, total=3),
+        ),
+        ("get_text format", lambda: get_text(USER_ID, "city_multi", page=1, total=3)),
+    ]
+    for name, fn in cases:
+        best = min(timeit.repeat(fn, number=args.calls, repeat=5))
+        print(f"{name:<16} {best / args.calls * 1e9:7.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
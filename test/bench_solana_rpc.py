@@ -0,0 +1,83 @@
+"""
+Compare the blocking solana Client with the shared async RPC layer.
+
+Run against a local JSON-RPC endpoint (solana-test-validator or any stand-in):
+
+    python test/bench_solana_rpc.py --url http://127.0.0.1:8899 --requests 500 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from solana.rpc.api import Client
+from solders.keypair import Keypair
+
+
+def report(name, total, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    print(
+        f"{name:<8} {len(latencies)} calls in {total:.2f}s "
+        f"({len(latencies) / total:.0f} req/s) "
+        f"p50={statistics.median(latencies) * 1000:.1f}ms p95={p95 * 1000:.1f}ms"
+    )
+
+
+async def bench_sync(url, pubkeys, concurrency):
+    # What the handlers did before: a blocking call inside a coroutine
+    client = Client(url)
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(pubkey):
+        async with semaphore:
+            start = time.perf_counter()
+            client.get_balance(pubkey)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in pubkeys))
+    report("sync", time.perf_counter() - start, latencies)
+
+
+async def bench_async(pubkeys, concurrency):
+    from utils.solana_config import close_solana_client, solana_rpc
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(pubkey):
+        async with semaphore:
+            start = time.perf_counter()
+            await solana_rpc("get_balance", pubkey)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in pubkeys))
+    report("async", time.perf_counter() - start, latencies)
+    await close_solana_client()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8899")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    # utils.solana_config reads the endpoint from the environment
+    os.environ["CLIENT"] = args.url
+    pubkeys = [Keypair().pubkey() for _ in range(args.requests)]
+
+    await bench_sync(args.url, pubkeys, args.concurrency)
+    await bench_async(pubkeys, args.concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
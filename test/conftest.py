@@ -0,0 +1,105 @@
+"""
+Shared fixtures of the unit tests: src on the import path, and an in-memory
+stand-in for the motor collections the services query directly.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+def _matches(doc: dict, query: dict) -> bool:
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(_matches(doc, branch) for branch in condition):
+                return False
+            continue
+        value = doc.get(field)
+        if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+            for operator, operand in condition.items():
+                if operator == "$in" and value not in operand:
+                    return False
+                if operator == "$nin" and value in operand:
+                    return False
+                if operator == "$lte" and (value is None or value > operand):
+                    return False
+                if operator == "$gt" and (value is None or value <= operand):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, key, direction=1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, order in reversed(keys):
+            self._docs.sort(key=lambda doc: doc.get(field), reverse=order < 0)
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._docs:
+            yield dict(doc)
+
+
+class FakeCollection:
+    """The subset of a motor collection the outbox uses, on a list of dicts."""
+
+    def __init__(self):
+        self.docs = []
+
+    def _find(self, query):
+        return [doc for doc in self.docs if _matches(doc, query)]
+
+    @staticmethod
+    def _apply(doc, update):
+        before = dict(doc)
+        doc.update(update.get("$set", {}))
+        for field, step in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + step
+        return doc != before
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def find_one(self, query):
+        found = self._find(query)
+        return dict(found[0]) if found else None
+
+    def find(self, query):
+        return FakeCursor(self._find(query))
+
+    async def update_one(self, query, update, upsert=False):
+        found = self._find(query)
+        modified = bool(found) and self._apply(found[0], update)
+        return SimpleNamespace(matched_count=len(found[:1]), modified_count=int(modified))
+
+    async def update_many(self, query, update):
+        found = self._find(query)
+        modified = sum(self._apply(doc, update) for doc in found)
+        return SimpleNamespace(matched_count=len(found), modified_count=modified)
+
+    async def find_one_and_update(self, query, update, sort=None, return_document=None):
+        cursor = FakeCursor(self._find(query))
+        if sort:
+            cursor.sort(sort)
+        if not cursor._docs:
+            return None
+        doc = cursor._docs[0]
+        self._apply(doc, update)
+        return dict(doc)
+
+
+@pytest.fixture
+def fake_collection():
+    return FakeCollection()
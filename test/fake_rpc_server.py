@@ -0,0 +1,499 @@
+"""
+Local stand-in for the Solana JSON-RPC and TRON HTTP APIs the bot uses, to
+run wallet flows and benchmarks offline.
+
+Solana: getBalance, getLatestBlockhash, sendTransaction, getSignatureStatuses,
+getMultipleAccounts, getSignaturesForAddress, getTransaction. TRON:
+wallet/getaccount, wallet/getnodeinfo, walletsolidity/getnowblock,
+wallet/getsignweight, wallet/broadcasttransaction,
+wallet/gettransactioninfobyid, wallet/triggerconstantcontract (balanceOf)
+and the TronGrid v1/accounts/<address>/transactions/trc20 listing.
+
+Every account starts with the default balances. Sent transfers move funds
+and land after --confirm-after seconds, unless dropped. Latency and failures
+are injected on every request:
+
+    python test/fake_rpc_server.py --solana-port 8899 --tron-port 8090 \
+        --latency 40 --jitter 20 --fail-rate 0.02 --rate-limit 200
+
+Point the bot at it with SOLANA_RPC_URLS=http://127.0.0.1:8899 and
+TRON_RPC_URLS=http://127.0.0.1:8090. Several servers on different ports
+with different latencies exercise the endpoint pool.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import time
+from collections import deque
+
+from aiohttp import web
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.system_program import ID as SYSTEM_PROGRAM_ID
+from solders.system_program import decode_transfer
+from solders.transaction import Transaction
+from tronpy import keys
+
+LAMPORTS_PER_SOL = 1_000_000_000
+SOL_FEE_LAMPORTS = 5_000
+# Solana blockhashes stay valid for about 150 blocks of ~0.4s
+BLOCKHASH_VALID_BLOCKS = 150
+SLOT_SECONDS = 0.4
+TRANSFER_SELECTOR = "a9059cbb"
+
+
+class Injector:
+    """Latency, random failures and a rate limit applied to every request."""
+
+    def __init__(self, latency_ms, jitter_ms, fail_rate, rate_limit):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.fail_rate = fail_rate
+        self.rate_limit = rate_limit
+        self._window = deque()
+        self.requests = 0
+        self.failed = 0
+        self.limited = 0
+
+    async def __call__(self):
+        """None to answer, or the error response to send instead."""
+        self.requests += 1
+        if self.rate_limit:
+            now = time.monotonic()
+            while self._window and now - self._window[0] > 1:
+                self._window.popleft()
+            if len(self._window) >= self.rate_limit:
+                self.limited += 1
+                return web.Response(status=429, text="Too many requests")
+            self._window.append(now)
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if random.random() < self.fail_rate:
+            self.failed += 1
+            return web.Response(status=503, text="Injected failure")
+        return None
+
+
+class FakeSolana:
+    def __init__(self, options, injector):
+        self.options = options
+        self.inject = injector
+        self.started = time.monotonic()
+        self.lamports = {}
+        # blockhash -> last valid block height
+        self.blockhashes = {}
+        self.blockhash = None
+        self.blockhash_at = 0.0
+        # signature -> (monotonic time it lands, error or None), None if dropped
+        self.landing = {}
+        # signature -> what getTransaction returns once it landed
+        self.transactions = {}
+        # address -> signatures of the transactions it is part of, oldest first
+        self.history = {}
+
+    def slot(self) -> int:
+        return int((time.monotonic() - self.started) / SLOT_SECONDS) + 1
+
+    def balance(self, pubkey: str) -> int:
+        return self.lamports.get(
+            pubkey, int(self.options.sol_balance * LAMPORTS_PER_SOL)
+        )
+
+    def latest_blockhash(self):
+        now = time.monotonic()
+        if self.blockhash is None or now - self.blockhash_at >= self.options.blockhash_seconds:
+            self.blockhash, self.blockhash_at = str(Hash.new_unique()), now
+            self.blockhashes[self.blockhash] = self.slot() + BLOCKHASH_VALID_BLOCKS
+        return self.blockhash, self.blockhashes[self.blockhash]
+
+    def context(self, value):
+        return {"context": {"slot": self.slot(), "apiVersion": "2.0.0"}, "value": value}
+
+    def getBalance(self, pubkey, *_):
+        return self.context(self.balance(pubkey))
+
+    def getLatestBlockhash(self, *_):
+        blockhash, last_valid = self.latest_blockhash()
+        return self.context({"blockhash": blockhash, "lastValidBlockHeight": last_valid})
+
+    def getMultipleAccounts(self, pubkeys, *_):
+        accounts = []
+        for pubkey in pubkeys:
+            lamports = self.balance(pubkey)
+            accounts.append(
+                {
+                    "lamports": lamports,
+                    "owner": str(SYSTEM_PROGRAM_ID),
+                    "data": ["", "base64"],
+                    "executable": False,
+                    "rentEpoch": 0,
+                    "space": 0,
+                }
+                if lamports
+                else None
+            )
+        return self.context(accounts)
+
+    def sendTransaction(self, encoded, *_):
+        transaction = Transaction.from_bytes(base64.b64decode(encoded))
+        message = transaction.message
+        last_valid = self.blockhashes.get(str(message.recent_blockhash))
+        if last_valid is None or last_valid < self.slot():
+            raise RpcError(
+                -32002,
+                "Transaction simulation failed: Blockhash not found",
+                {
+                    "err": "BlockhashNotFound",
+                    "logs": [],
+                    "accounts": None,
+                    "unitsConsumed": 0,
+                    "returnData": None,
+                    "innerInstructions": None,
+                },
+            )
+        signature = str(transaction.signatures[0])
+        if signature in self.landing:
+            return signature
+
+        payer = str(message.account_keys[0])
+        moves = []
+        for instruction in message.instructions:
+            if message.account_keys[instruction.program_id_index] != SYSTEM_PROGRAM_ID:
+                continue
+            params = decode_transfer(instruction_from(message, instruction))
+            moves.append((str(params["from_pubkey"]), str(params["to_pubkey"]), params["lamports"]))
+        needed = SOL_FEE_LAMPORTS + sum(lamports for _, _, lamports in moves)
+        error = None if self.balance(payer) >= needed else {"InsufficientFundsForRent": {"account_index": 0}}
+
+        if random.random() < self.options.drop_rate:
+            self.landing[signature] = None
+            return signature
+        self.landing[signature] = (time.monotonic() + self.options.confirm_after, error)
+        accounts = [str(key) for key in message.account_keys]
+        pre_balances = [self.balance(account) for account in accounts]
+        if error is None:
+            self.lamports[payer] = self.balance(payer) - SOL_FEE_LAMPORTS
+            for sender, recipient, lamports in moves:
+                self.lamports[sender] = self.balance(sender) - lamports
+                self.lamports[recipient] = self.balance(recipient) + lamports
+        self.transactions[signature] = {
+            "slot": self.slot(),
+            "blockTime": int(time.time()),
+            "transaction": [encoded, "base64"],
+            "meta": {
+                "err": error,
+                "status": {"Err": error} if error else {"Ok": None},
+                "fee": SOL_FEE_LAMPORTS,
+                "preBalances": pre_balances,
+                "postBalances": [self.balance(account) for account in accounts],
+                "innerInstructions": [],
+                "logMessages": [],
+                "preTokenBalances": [],
+                "postTokenBalances": [],
+                "rewards": [],
+                "loadedAddresses": {"writable": [], "readonly": []},
+                "computeUnitsConsumed": 150,
+            },
+            "version": "legacy",
+        }
+        for account in dict.fromkeys(accounts):
+            self.history.setdefault(account, []).append(signature)
+        return signature
+
+    def landed(self, signature) -> bool:
+        landing = self.landing.get(signature)
+        return landing is not None and landing[0] <= time.monotonic()
+
+    def getSignaturesForAddress(self, address, config=None):
+        config = config or {}
+        limit = min(config.get("limit") or 1000, 1000)
+        signatures = [s for s in reversed(self.history.get(address, [])) if self.landed(s)]
+        # Newest first, after "before" and down to "until", both excluded
+        if config.get("before") in signatures:
+            signatures = signatures[signatures.index(config["before"]) + 1 :]
+        if config.get("until") in signatures:
+            signatures = signatures[: signatures.index(config["until"])]
+        return [
+            {
+                "signature": signature,
+                "slot": self.transactions[signature]["slot"],
+                "err": self.transactions[signature]["meta"]["err"],
+                "memo": None,
+                "blockTime": self.transactions[signature]["blockTime"],
+                "confirmationStatus": "finalized",
+            }
+            for signature in signatures[:limit]
+        ]
+
+    def getTransaction(self, signature, *_):
+        return self.transactions[signature] if self.landed(signature) else None
+
+    def getSignatureStatuses(self, signatures, *_):
+        now, statuses = time.monotonic(), []
+        for signature in signatures:
+            landing = self.landing.get(signature)
+            if landing is None or landing[0] > now:
+                statuses.append(None)
+                continue
+            error = landing[1]
+            statuses.append(
+                {
+                    "slot": self.slot(),
+                    "confirmations": None,
+                    "err": error,
+                    "status": {"Err": error} if error else {"Ok": None},
+                    "confirmationStatus": "finalized",
+                }
+            )
+        return self.context(statuses)
+
+    async def handle(self, request):
+        failure = await self.inject()
+        if failure is not None:
+            return failure
+        body = await request.json()
+        if isinstance(body, list):
+            return web.json_response([self.dispatch(call) for call in body])
+        return web.json_response(self.dispatch(body))
+
+    def dispatch(self, call):
+        reply = {"jsonrpc": "2.0", "id": call.get("id")}
+        method = getattr(self, call.get("method", ""), None)
+        if method is None or call["method"].startswith("_"):
+            reply["error"] = {"code": -32601, "message": "Method not found"}
+            return reply
+        try:
+            reply["result"] = method(*call.get("params", []))
+        except RpcError as e:
+            reply["error"] = e.payload
+        except Exception as e:
+            reply["error"] = {"code": -32602, "message": f"Invalid params: {e}"}
+        return reply
+
+
+class RpcError(Exception):
+    def __init__(self, code, message, data=None):
+        super().__init__(message)
+        self.payload = {"code": code, "message": message, "data": data}
+
+
+def instruction_from(message, compiled):
+    """The Instruction of a compiled instruction, as decode_transfer takes it."""
+    # Only the order of the accounts matters to decode_transfer
+    accounts = [
+        AccountMeta(message.account_keys[index], message.is_signer(index), True)
+        for index in compiled.accounts
+    ]
+    return Instruction(
+        message.account_keys[compiled.program_id_index], bytes(compiled.data), accounts
+    )
+
+
+class FakeTron:
+    def __init__(self, options, injector):
+        self.options = options
+        self.inject = injector
+        self.started = time.monotonic()
+        # Hex addresses ("41...") -> balance in SUN / in USDT units
+        self.trx = {}
+        self.usdt = {}
+        # txid -> (monotonic time it lands, receipt result), None if dropped
+        self.landing = {}
+        # USDT transfers as TronGrid lists them, oldest first
+        self.trc20 = []
+
+    def block(self):
+        number = int((time.monotonic() - self.started) / 3) + 1
+        block_hash = hashlib.sha256(str(number).encode()).hexdigest()
+        return number, f"{number:016x}{block_hash[16:]}"
+
+    def trx_balance(self, address):
+        return self.trx.get(address, int(self.options.trx_balance * 1_000_000))
+
+    def usdt_balance(self, address):
+        return self.usdt.get(address, int(self.options.usdt_balance * 1_000_000))
+
+    def getaccount(self, payload):
+        address = keys.to_hex_address(payload["address"])
+        return {"address": payload["address"], "balance": self.trx_balance(address)}
+
+    def getnodeinfo(self, payload):
+        number, block_id = self.block()
+        return {"solidityBlock": f"Num:{number},ID:{block_id}"}
+
+    def getnowblock(self, payload):
+        number, block_id = self.block()
+        return {"blockID": block_id, "block_header": {"raw_data": {"number": number}}}
+
+    def getsignweight(self, payload):
+        raw = json.dumps(payload["raw_data"], sort_keys=True).encode()
+        txid = hashlib.sha256(raw).hexdigest()
+        return {"transaction": {"transaction": {"txID": txid, "raw_data": payload["raw_data"]}}}
+
+    def triggerconstantcontract(self, payload):
+        # balanceOf(address): the last 20 bytes of the argument
+        address = "41" + payload["parameter"][-40:]
+        return {
+            "result": {"result": True},
+            "constant_result": [f"{self.usdt_balance(address):064x}"],
+        }
+
+    def broadcasttransaction(self, payload):
+        txid = payload["txID"]
+        if txid in self.landing:
+            return {"result": True, "txid": txid}
+        if not payload.get("signature"):
+            return {"code": "SIGERROR", "message": "missing signature".encode().hex()}
+        if random.random() < self.options.drop_rate:
+            self.landing[txid] = None
+            return {"result": True, "txid": txid}
+
+        contract = payload["raw_data"]["contract"][0]
+        value = contract["parameter"]["value"]
+        result = "SUCCESS"
+        if contract["type"] == "TransferContract":
+            sender, amount = value["owner_address"], value["amount"]
+            if self.trx_balance(sender) < amount:
+                return {"code": "CONTRACT_VALIDATE_ERROR", "message": "balance is not sufficient".encode().hex()}
+            self.trx[sender] = self.trx_balance(sender) - amount
+            self.trx[value["to_address"]] = self.trx_balance(value["to_address"]) + amount
+        elif value.get("data", "").startswith(TRANSFER_SELECTOR):
+            data = value["data"]
+            sender, recipient = value["owner_address"], "41" + data[8:72][-40:]
+            amount = int(data[72:136], 16)
+            if self.usdt_balance(sender) < amount:
+                result = "REVERT"
+            else:
+                self.usdt[sender] = self.usdt_balance(sender) - amount
+                self.usdt[recipient] = self.usdt_balance(recipient) + amount
+                self.trc20.append(
+                    {
+                        "transaction_id": txid,
+                        "token_info": {
+                            "symbol": "USDT",
+                            "address": keys.to_base58check_address(value["contract_address"]),
+                            "decimals": 6,
+                            "name": "Tether USD",
+                        },
+                        "block_timestamp": int(
+                            (time.time() + self.options.confirm_after) * 1000
+                        ),
+                        "from": keys.to_base58check_address(sender),
+                        "to": keys.to_base58check_address(recipient),
+                        "type": "Transfer",
+                        "value": str(amount),
+                    }
+                )
+        self.landing[txid] = (time.monotonic() + self.options.confirm_after, result)
+        return {"result": True, "txid": txid}
+
+    def gettransactioninfobyid(self, payload):
+        landing = self.landing.get(payload["value"])
+        if landing is None or landing[0] > time.monotonic():
+            return {}
+        number, _ = self.block()
+        info = {"id": payload["value"], "blockNumber": number, "receipt": {"result": landing[1]}}
+        if landing[1] != "SUCCESS":
+            info["result"] = "FAILED"
+        return info
+
+    async def trc20_transfers(self, request):
+        failure = await self.inject()
+        if failure is not None:
+            return failure
+        address, query = request.match_info["address"], request.query
+        limit = min(int(query.get("limit", 20)), 200)
+        now = int(time.time() * 1000)
+        transfers = [
+            t
+            for t in self.trc20
+            if address in (t["from"], t["to"])
+            and t["block_timestamp"] <= now
+            and t["block_timestamp"] >= int(query.get("min_timestamp", 0))
+        ]
+        if query.get("order_by", "block_timestamp,desc").endswith("desc"):
+            transfers.reverse()
+        # The fingerprint of the fake is the offset of the next page
+        offset = int(query.get("fingerprint", 0))
+        page = transfers[offset : offset + limit]
+        meta = {"at": now, "page_size": len(page)}
+        if offset + limit < len(transfers):
+            meta["fingerprint"] = str(offset + limit)
+        return web.json_response({"data": page, "success": True, "meta": meta})
+
+    async def handle(self, request):
+        failure = await self.inject()
+        if failure is not None:
+            return failure
+        handler = getattr(self, request.match_info["method"], None)
+        if handler is None:
+            return web.json_response({"Error": f"unknown method {request.path}"})
+        payload = await request.json() if request.can_read_body else {}
+        return web.json_response(handler(payload))
+
+
+def create_solana_app(options) -> web.Application:
+    chain = FakeSolana(options, Injector(options.latency, options.jitter, options.fail_rate, options.rate_limit))
+    app = web.Application()
+    app["chain"] = chain
+    app.router.add_post("/", chain.handle)
+    return app
+
+
+def create_tron_app(options) -> web.Application:
+    chain = FakeTron(options, Injector(options.latency, options.jitter, options.fail_rate, options.rate_limit))
+    app = web.Application()
+    app["chain"] = chain
+    app.router.add_post("/{api:wallet|walletsolidity}/{method}", chain.handle)
+    app.router.add_get("/v1/accounts/{address}/transactions/trc20", chain.trc20_transfers)
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--solana-port", type=int, default=8899, help="0 to disable")
+    parser.add_argument("--tron-port", type=int, default=8090, help="0 to disable")
+    parser.add_argument("--latency", type=float, default=0, help="ms added to every request")
+    parser.add_argument("--jitter", type=float, default=0, help="ms of random latency spread")
+    parser.add_argument("--fail-rate", type=float, default=0, help="share of requests answered 503")
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per second before 429, 0 for none")
+    parser.add_argument("--drop-rate", type=float, default=0, help="share of sent transactions that never land")
+    parser.add_argument("--confirm-after", type=float, default=1, help="seconds before a sent transaction lands")
+    parser.add_argument("--blockhash-seconds", type=float, default=10, help="seconds between new blockhashes")
+    parser.add_argument("--sol-balance", type=float, default=10, help="SOL of every new account")
+    parser.add_argument("--trx-balance", type=float, default=100, help="TRX of every new account")
+    parser.add_argument("--usdt-balance", type=float, default=1000, help="USDT of every new account")
+    return parser.parse_args(argv)
+
+
+async def serve(options):
+    runners = []
+    for port, create in (
+        (options.solana_port, create_solana_app),
+        (options.tron_port, create_tron_app),
+    ):
+        if not port:
+            continue
+        runner = web.AppRunner(create(options), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, options.host, port).start()
+        runners.append(runner)
+        print(f"{create.__name__[7:-4]} fake RPC on http://{options.host}:{port}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,286 @@
+"""
+Load the wallet flows against RPC endpoints and report their throughput,
+latency and how long the event loop was blocked meanwhile.
+
+Meant for the local stand-in (test/fake_rpc_server.py), never for a real
+network: every sender is a new keypair the fake funds on first use.
+
+    python test/fake_rpc_server.py --latency 40 --jitter 20 &
+    python test/load_wallet_flows.py --transfers 300 --concurrency 50
+
+or start the stand-in for the run, with failures injected:
+
+    python test/load_wallet_flows.py --spawn --latency 40 --fail-rate 0.05
+
+Scenarios: "sync" (the blocking solana Client used inside coroutines, as the
+handlers once did), "balances", "sol" (transfer then confirm), "trx" and
+"usdt" (build, broadcast, then wait for the receipt).
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+sys.path.append(SRC)
+
+SCENARIOS = ("sync", "balances", "sol", "trx", "usdt")
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[max(int(len(values) * share) - 1, 0)] if values else 0.0
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a task sleeping tick seconds."""
+
+    def __init__(self, tick=0.01):
+        self.tick = tick
+        self.lags = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.tick)
+            self.lags.append(max(0.0, loop.time() - start - self.tick))
+
+    def __enter__(self):
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+def report(name, total, latencies, failures, lag):
+    count = len(latencies)
+    p50 = statistics.median(latencies) if latencies else 0.0
+    print(
+        f"{name:<9} {count} ok, {failures} failed in {total:.2f}s "
+        f"({count / total:.0f}/s) p50={p50 * 1000:.0f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:.0f}ms | loop lag "
+        f"max={max(lag.lags, default=0) * 1000:.0f}ms "
+        f"p99={percentile(lag.lags, 0.99) * 1000:.1f}ms"
+    )
+
+
+async def run(name, count, concurrency, flow):
+    """Run flow(i) count times, concurrency at a time, and report it."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async def one(i):
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ok = await flow(i)
+            except Exception as e:
+                print(f"{name} #{i} failed: {e!r}")
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                failures += 1
+
+    with LoopLagMonitor() as lag:
+        # Let the monitor start sleeping before the flows run
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(count)))
+        report(name, time.perf_counter() - start, latencies, failures, lag)
+
+
+async def scenario_sync(args):
+    from solana.rpc.api import Client
+    from solders.keypair import Keypair
+
+    client = Client(args.solana_url.split(",")[0])
+    pubkeys = [Keypair().pubkey() for _ in range(args.transfers)]
+
+    async def flow(i):
+        # Lets the loop turn, as a handler would, then blocks the whole
+        # event loop for the duration of the call
+        await asyncio.sleep(0)
+        client.get_balance(pubkeys[i])
+        return True
+
+    await run("sync", args.transfers, args.concurrency, flow)
+
+
+async def scenario_balances(args):
+    from solders.keypair import Keypair
+
+    from services.wallet_service import WalletService
+
+    pubkeys = [str(Keypair().pubkey()) for _ in range(args.transfers)]
+
+    async def flow(i):
+        return await WalletService.get_sol_balance(pubkeys[i]) > 0
+
+    await run("balances", args.transfers, args.concurrency, flow)
+
+    chunk = 100
+    start = time.perf_counter()
+    fresh = [str(Keypair().pubkey()) for _ in range(args.transfers)]
+    balances = {}
+    for i in range(0, len(fresh), chunk):
+        balances.update(await WalletService.get_sol_balances(fresh[i : i + chunk]))
+    print(
+        f"{'bulk':<9} {len(balances)} balances in "
+        f"{time.perf_counter() - start:.2f}s (getMultipleAccounts)"
+    )
+
+
+async def scenario_sol(args):
+    from solders.keypair import Keypair
+
+    from services.wallet_service import WalletService
+
+    async def flow(i):
+        signature = await WalletService.transfer_sol(
+            Keypair(), str(Keypair().pubkey()), 0.01
+        )
+        result = await WalletService.confirm_transaction(signature)
+        return result["status"] == "success"
+
+    await run("sol", args.transfers, args.concurrency, flow)
+
+
+async def wait_tron_receipt(txid, timeout=60):
+    from services.tron_wallet_service import TronWallet
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status = await TronWallet.get_transaction_status(txid)
+        except Exception as e:
+            # A failed poll is retried, as the transfer outbox does
+            print(f"receipt of {txid} not fetched: {e!r}")
+            status = None
+        if status is not None:
+            return status == "confirmed"
+        await asyncio.sleep(0.5)
+    return False
+
+
+async def scenario_trx(args):
+    from tronpy.keys import PrivateKey
+
+    from services.tron_wallet_service import TronWallet
+
+    async def flow(i):
+        recipient = PrivateKey.random().public_key.to_base58check_address()
+        result = await TronWallet.transfer_trx(
+            PrivateKey.random().hex(), recipient, 1
+        )
+        return result is not None and await wait_tron_receipt(result["txid"])
+
+    await run("trx", args.transfers, args.concurrency, flow)
+
+
+async def scenario_usdt(args):
+    from tronpy.keys import PrivateKey
+
+    from services.tron_wallet_service import TronWallet
+
+    async def flow(i):
+        recipient = PrivateKey.random().public_key.to_base58check_address()
+        txn = await TronWallet.build_usdt_transfer(
+            PrivateKey.random().hex(), recipient, 1
+        )
+        await TronWallet.broadcast(txn)
+        return await wait_tron_receipt(txn.txid)
+
+    await run("usdt", args.transfers, args.concurrency, flow)
+
+
+async def close_clients():
+    from services.signature_tracker import signature_tracker
+    from services.tron_wallet_service import TronWallet
+    from utils.blockhash_provider import blockhash_provider
+    from utils.solana_config import close_solana_client, get_solana_pool
+
+    for endpoint in get_solana_pool().stats():
+        print(f"solana endpoint {endpoint}")
+    for endpoint in TronWallet.get_pool().stats():
+        print(f"tron endpoint {endpoint}")
+    await signature_tracker.stop()
+    await blockhash_provider.stop()
+    await close_solana_client()
+    await TronWallet.close()
+
+
+def spawn_server(args):
+    command = [
+        sys.executable,
+        os.path.join(os.path.dirname(__file__), "fake_rpc_server.py"),
+        "--solana-port", str(args.spawn_solana_port),
+        "--tron-port", str(args.spawn_tron_port),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--fail-rate", str(args.fail_rate),
+        "--drop-rate", str(args.drop_rate),
+    ]
+    server = subprocess.Popen(command)
+    args.solana_url = f"http://127.0.0.1:{args.spawn_solana_port}"
+    args.tron_url = f"http://127.0.0.1:{args.spawn_tron_port}"
+    # Give the stand-in time to bind its ports
+    time.sleep(2)
+    return server
+
+
+async def main(args):
+    runners = {
+        "sync": scenario_sync,
+        "balances": scenario_balances,
+        "sol": scenario_sol,
+        "trx": scenario_trx,
+        "usdt": scenario_usdt,
+    }
+    try:
+        for name in args.scenarios:
+            await runners[name](args)
+    finally:
+        await close_clients()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--solana-url", default="http://127.0.0.1:8899", help="comma-separated")
+    parser.add_argument("--tron-url", default="http://127.0.0.1:8090", help="comma-separated")
+    parser.add_argument("--transfers", type=int, default=200, help="flows per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=0, help="requests/s per endpoint, 0 for none")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--spawn", action="store_true", help="start the local stand-in for the run")
+    parser.add_argument("--spawn-solana-port", type=int, default=18899)
+    parser.add_argument("--spawn-tron-port", type=int, default=18090)
+    parser.add_argument("--latency", type=float, default=0, help="ms, with --spawn")
+    parser.add_argument("--jitter", type=float, default=0, help="ms, with --spawn")
+    parser.add_argument("--fail-rate", type=float, default=0, help="with --spawn")
+    parser.add_argument("--drop-rate", type=float, default=0, help="with --spawn")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = spawn_server(args) if args.spawn else None
+    # The RPC settings are read from the environment when src is imported
+    os.environ["SOLANA_RPC_URLS"] = args.solana_url
+    os.environ["TRON_RPC_URLS"] = args.tron_url
+    os.environ["SOLANA_RPC_RATE_PER_SECOND"] = str(args.rate)
+    os.environ["TRON_RPC_RATE_PER_SECOND"] = str(args.rate)
+    try:
+        asyncio.run(main(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,129 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus
+
+from services import signature_tracker as tracker_module
+from services.signature_tracker import (
+    SIGNATURES_PER_CALL,
+    SignatureTracker,
+    fetch_signature_statuses,
+)
+
+CONFIRMED = SimpleNamespace(
+    err=None, confirmation_status=TransactionConfirmationStatus.Confirmed
+)
+PROCESSED = SimpleNamespace(
+    err=None, confirmation_status=TransactionConfirmationStatus.Processed
+)
+FAILED = SimpleNamespace(
+    err="InstructionError", confirmation_status=TransactionConfirmationStatus.Confirmed
+)
+
+
+class FakeNode:
+    """Answers getSignatureStatuses from a table, recording each call."""
+
+    def __init__(self):
+        self.statuses = {}
+        self.calls = []
+
+    async def rpc(self, method, signatures, search_transaction_history=False):
+        assert method == "get_signature_statuses"
+        self.calls.append([str(signature) for signature in signatures])
+        return SimpleNamespace(
+            value=[self.statuses.get(str(signature)) for signature in signatures]
+        )
+
+
+@pytest.fixture
+def node(monkeypatch):
+    node = FakeNode()
+    monkeypatch.setattr(tracker_module, "solana_rpc", node.rpc)
+    return node
+
+
+def signatures(count):
+    return [str(Signature.new_unique()) for _ in range(count)]
+
+
+def test_statuses_are_fetched_in_batches(node):
+    tracked = signatures(2 * SIGNATURES_PER_CALL + 88)
+    node.statuses[tracked[-1]] = CONFIRMED
+    node.statuses[tracked[300]] = FAILED
+
+    statuses = asyncio.run(fetch_signature_statuses(tracked))
+
+    assert [len(call) for call in node.calls] == [256, 256, 88]
+    assert sum(node.calls, []) == tracked
+    assert statuses[-1] == "confirmed"
+    assert statuses[300] == "failed"
+    assert statuses.count(None) == len(tracked) - 2
+
+
+def test_tracker_resolves_confirmed_failed_and_unknown(node):
+    confirmed, failed, processed, unknown = signatures(4)
+    node.statuses.update({confirmed: CONFIRMED, failed: FAILED, processed: PROCESSED})
+    tracker = SignatureTracker(min_interval=0.01, max_interval=0.02)
+
+    async def scenario():
+        results = await asyncio.gather(
+            tracker.wait(confirmed),
+            tracker.wait(failed),
+            # Only processed: still unknown when its tracking time is over
+            tracker.wait(processed, timeout=0.05),
+            tracker.wait(unknown, timeout=0.05),
+        )
+        await tracker.stop()
+        return results
+
+    assert asyncio.run(scenario()) == ["confirmed", "failed", None, None]
+    assert len(tracker) == 0
+    # All four were polled together
+    assert sorted(node.calls[0]) == sorted([confirmed, failed, processed, unknown])
+
+
+def test_tracker_polls_in_batches_of_at_most_256(node):
+    tracked = signatures(600)
+    for signature in tracked:
+        node.statuses[signature] = CONFIRMED
+    tracker = SignatureTracker(min_interval=0.01, max_interval=0.02)
+
+    async def scenario():
+        results = await asyncio.gather(*(tracker.wait(s) for s in tracked))
+        await tracker.stop()
+        return results
+
+    assert asyncio.run(scenario()) == ["confirmed"] * len(tracked)
+    assert all(len(call) <= SIGNATURES_PER_CALL for call in node.calls)
+    assert len(node.calls) == 3
+
+
+def test_tracker_shares_one_future_per_signature(node):
+    [signature] = signatures(1)
+    node.statuses[signature] = CONFIRMED
+    tracker = SignatureTracker(min_interval=0.01, max_interval=0.02)
+
+    async def scenario():
+        first = tracker.track(signature)
+        assert tracker.track(signature) is first
+        assert len(tracker) == 1
+        return await first
+
+    assert asyncio.run(scenario()) == "confirmed"
+
+
+def test_malformed_signature_is_rejected(node):
+    tracker = SignatureTracker()
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            tracker.track("not-a-signature")
+        with pytest.raises(ValueError):
+            await tracker.wait("")
+
+    asyncio.run(scenario())
+    assert len(tracker) == 0
+    assert node.calls == []
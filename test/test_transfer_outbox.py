@@ -0,0 +1,418 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from models.transfer_model import Transfer, TransferStatus
+from services import transfer_outbox
+from services.transfer_outbox import TransferOutbox
+from services.tron_wallet_service import TronWallet
+
+PAST = datetime(2000, 1, 1)
+
+
+class FakeTron:
+    """Builds, broadcasts and reports the USDT transfers of a test."""
+
+    def __init__(self):
+        self.built = 0
+        self.broadcast_txids = []
+        self.statuses = {}
+        self.build_error = None
+        self.broadcast_error = None
+
+    async def build_usdt_transfer(self, private_key, recipient, amount):
+        if self.build_error:
+            raise self.build_error
+        self.built += 1
+        return SimpleNamespace(txid=f"tx{self.built}")
+
+    async def broadcast(self, transaction):
+        if self.broadcast_error:
+            raise self.broadcast_error
+        self.broadcast_txids.append(transaction.txid)
+
+    async def get_transaction_status(self, txid):
+        return self.statuses.get(txid)
+
+
+@pytest.fixture
+def outbox(fake_collection, monkeypatch):
+    monkeypatch.setattr(
+        Transfer, "get_motor_collection", classmethod(lambda cls: fake_collection)
+    )
+    tron = FakeTron()
+    monkeypatch.setattr(TronWallet, "build_usdt_transfer", tron.build_usdt_transfer)
+    monkeypatch.setattr(TronWallet, "broadcast", tron.broadcast)
+    monkeypatch.setattr(
+        TronWallet, "get_transaction_status", tron.get_transaction_status
+    )
+    settled = []
+
+    async def hook(bot, transfers, context):
+        settled.append([t.status for t in transfers])
+
+    monkeypatch.setitem(TransferOutbox._settle_hooks, "test", hook)
+    return SimpleNamespace(
+        collection=fake_collection, tron=tron, settled=settled, hook=hook
+    )
+
+
+def add_transfer(outbox, name="payout", group="test:1", **fields) -> Transfer:
+    fields.setdefault("next_attempt_at", PAST)
+    fields.setdefault("chain", "USDT")
+    transfer = Transfer(
+        id=ObjectId(),
+        key=f"{group}:{name}",
+        group=group,
+        sender="sender",
+        recipient=f"{name}-recipient",
+        amount=1.0,
+        **fields,
+    )
+    doc = transfer.model_dump(by_alias=True)
+    doc["status"] = transfer.status.value
+    outbox.collection.docs.append(doc)
+    return transfer
+
+
+def stored(outbox, transfer: Transfer) -> dict:
+    return next(doc for doc in outbox.collection.docs if doc["_id"] == transfer.id)
+
+
+def make_due(outbox, transfer: Transfer):
+    stored(outbox, transfer).update(next_attempt_at=PAST, locked_until=None)
+
+
+async def work_once():
+    """Claim and process one transfer, as a worker does."""
+    transfer = await TransferOutbox._claim()
+    assert transfer is not None
+    try:
+        await TransferOutbox._process(transfer)
+    except Exception as e:
+        await TransferOutbox._reschedule(transfer, str(e))
+    return transfer
+
+
+def test_claim_leases_due_transfers(outbox):
+    due = add_transfer(outbox, "due")
+    add_transfer(outbox, "later", next_attempt_at=datetime.utcnow() + timedelta(hours=1))
+
+    async def scenario():
+        claimed = await TransferOutbox._claim()
+        assert claimed.id == due.id
+        assert claimed.locked_until > datetime.utcnow()
+        # Leased to the first worker, and the other one is not due yet
+        assert await TransferOutbox._claim() is None
+        stored(outbox, due)["locked_until"] = PAST
+        assert (await TransferOutbox._claim()).id == due.id
+
+    asyncio.run(scenario())
+
+
+def test_transfer_failed_on_chain_is_sent_again(outbox):
+    transfer = add_transfer(outbox)
+
+    async def scenario():
+        await work_once()
+        assert stored(outbox, transfer)["status"] == "sent"
+        assert outbox.tron.broadcast_txids == ["tx1"]
+
+        outbox.tron.statuses["tx1"] = "failed"
+        make_due(outbox, transfer)
+        await work_once()
+        doc = stored(outbox, transfer)
+        assert doc["status"] == "pending"
+        assert doc["signature"] is None
+        assert doc["attempts"] == 1
+
+        make_due(outbox, transfer)
+        await work_once()
+        assert outbox.tron.broadcast_txids == ["tx1", "tx2"]
+        assert stored(outbox, transfer)["attempts"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_expired_transfer_is_sent_again(outbox):
+    transfer = add_transfer(
+        outbox,
+        status=TransferStatus.SENT,
+        signature="tx0",
+        sent_at=PAST,
+        attempts=1,
+    )
+
+    async def scenario():
+        await work_once()
+        doc = stored(outbox, transfer)
+        assert doc["status"] == "pending"
+        assert doc["signature"] is None
+        assert doc["last_error"] == "Transaction expired unconfirmed"
+
+    asyncio.run(scenario())
+
+
+def test_failed_build_is_retried(outbox):
+    transfer = add_transfer(outbox)
+    outbox.tron.build_error = OSError("node unreachable")
+
+    async def scenario():
+        await work_once()
+        doc = stored(outbox, transfer)
+        assert doc["status"] == "pending"
+        assert doc["attempts"] == 1
+        assert doc["next_attempt_at"] > datetime.utcnow()
+        assert outbox.tron.broadcast_txids == []
+
+    asyncio.run(scenario())
+
+
+def test_stored_signature_is_not_sent_again(outbox):
+    transfer = add_transfer(outbox)
+    outbox.tron.broadcast_error = OSError("connection reset")
+
+    async def scenario():
+        # The broadcast may have reached the node: the signature is kept
+        await work_once()
+        doc = stored(outbox, transfer)
+        assert doc["status"] == "sent"
+        assert doc["signature"] == "tx1"
+
+        outbox.tron.broadcast_error = None
+        for _ in range(3):
+            make_due(outbox, transfer)
+            await work_once()
+        assert outbox.tron.built == 1
+        assert outbox.tron.broadcast_txids == []
+
+        outbox.tron.statuses["tx1"] = "confirmed"
+        make_due(outbox, transfer)
+        await work_once()
+        assert stored(outbox, transfer)["status"] == "confirmed"
+        assert outbox.tron.built == 1
+
+    asyncio.run(scenario())
+
+
+def test_send_after_losing_the_lease_does_not_broadcast(outbox):
+    add_transfer(outbox)
+
+    async def scenario():
+        first = await TransferOutbox._claim()
+        # The lease of the first worker expires and another one claims it
+        outbox.collection.docs[0]["locked_until"] = PAST
+        second = await TransferOutbox._claim()
+
+        await TransferOutbox._send(first)
+        assert outbox.tron.broadcast_txids == []
+        await TransferOutbox._send(second)
+        assert outbox.tron.broadcast_txids == ["tx2"]
+        assert outbox.collection.docs[0]["signature"] == "tx2"
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("status", ["confirmed", "failed"])
+def test_stale_watcher_leaves_the_next_attempt_alone(outbox, monkeypatch, status):
+    transfer = add_transfer(outbox, chain="SOL", status=TransferStatus.SENT)
+    stale = transfer.model_copy(update={"signature": "S1", "sent_at": PAST})
+    stored(outbox, transfer).update(signature="S2", sent_at=datetime.utcnow())
+
+    async def wait(signature, timeout):
+        return status
+
+    monkeypatch.setattr(transfer_outbox.signature_tracker, "wait", wait)
+
+    async def scenario():
+        await TransferOutbox._watch_signature(stale, 0)
+
+    asyncio.run(scenario())
+    doc = stored(outbox, transfer)
+    assert (doc["status"], doc["signature"]) == ("sent", "S2")
+    assert outbox.settled == []
+
+
+def test_settle_runs_the_hook_once(outbox):
+    add_transfer(outbox, "finder", status=TransferStatus.CONFIRMED)
+    add_transfer(outbox, "tax", status=TransferStatus.FAILED)
+
+    async def scenario():
+        await asyncio.gather(*(TransferOutbox._settle("test:1") for _ in range(3)))
+        await TransferOutbox._settle("test:1")
+        assert not await TransferOutbox._settle_due()
+
+    asyncio.run(scenario())
+    assert outbox.settled == [[TransferStatus.CONFIRMED, TransferStatus.FAILED]]
+
+
+def test_settle_waits_for_open_transfers(outbox):
+    add_transfer(outbox, "finder", status=TransferStatus.CONFIRMED)
+    add_transfer(outbox, "tax", status=TransferStatus.SENT, signature="tx0")
+
+    asyncio.run(TransferOutbox._settle("test:1"))
+    assert outbox.settled == []
+
+
+def test_failed_hook_runs_again_once_its_lease_passed(outbox, monkeypatch):
+    first = add_transfer(outbox, "finder", status=TransferStatus.CONFIRMED)
+    calls = []
+
+    async def flaky_hook(bot, transfers, context):
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("Telegram unreachable")
+
+    monkeypatch.setitem(TransferOutbox._settle_hooks, "test", flaky_hook)
+
+    async def scenario():
+        await TransferOutbox._settle("test:1")
+        assert stored(outbox, first)["settled"] is False
+        # Leased: neither a late finish nor the sweep runs it meanwhile
+        await TransferOutbox._settle("test:1")
+        assert not await TransferOutbox._settle_due()
+        assert len(calls) == 1
+
+        stored(outbox, first)["settle_after"] = PAST
+        assert await TransferOutbox._settle_due()
+        assert stored(outbox, first)["settled"] is True
+        assert not await TransferOutbox._settle_due()
+
+    asyncio.run(scenario())
+    assert calls == [0, 1]
+
+
+def test_last_attempt_fails_the_transfer_and_settles(outbox, monkeypatch):
+    monkeypatch.setattr(transfer_outbox, "TRANSFER_MAX_ATTEMPTS", 2)
+    transfer = add_transfer(
+        outbox,
+        status=TransferStatus.SENT,
+        signature="tx0",
+        sent_at=datetime.utcnow(),
+        attempts=2,
+    )
+    outbox.tron.statuses["tx0"] = "failed"
+
+    asyncio.run(work_once())
+    assert stored(outbox, transfer)["status"] == "failed"
+    assert outbox.settled == [[TransferStatus.FAILED]]
+
+
+class FakeBot:
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, chat_id=None, text=None):
+        self.messages.append((chat_id, text))
+
+
+@pytest.fixture
+def reward(outbox, fake_collection, monkeypatch):
+    from handlers import listing_handler
+    from models.finder_model import Finder
+
+    statuses, queued = [], []
+
+    async def get_user_lang(user_id):
+        return "en"
+
+    async def set_case_status(case_id, status, expected):
+        statuses.append((status, expected))
+        return True
+
+    async def enqueue(group, transfers, context=None):
+        queued.append((group, transfers, context))
+        return True
+
+    monkeypatch.setattr(listing_handler, "get_user_lang", get_user_lang)
+    monkeypatch.setattr(listing_handler, "set_case_status", set_case_status)
+    monkeypatch.setattr(TransferOutbox, "enqueue", enqueue)
+    monkeypatch.setattr(
+        Finder, "get_motor_collection", classmethod(lambda cls: fake_collection)
+    )
+    context = {
+        "user_id": 1,
+        "case_id": str(ObjectId()),
+        "finder_id": str(ObjectId()),
+        "finder_user_id": 2,
+        "amount": 10.0,
+    }
+    return SimpleNamespace(
+        settle=listing_handler.reward_settled,
+        statuses=statuses,
+        queued=queued,
+        context=context,
+        bot=FakeBot(),
+    )
+
+
+def reward_transfers(outbox, group, **statuses):
+    return [
+        add_transfer(outbox, name, group=group, status=status)
+        for name, status in statuses.items()
+    ]
+
+
+def test_reward_with_a_failed_tax_is_not_completed(outbox, reward):
+    from models.case_model import CaseStatus
+
+    transfers = reward_transfers(
+        outbox,
+        "reward:c:1",
+        finder=TransferStatus.CONFIRMED,
+        tax=TransferStatus.FAILED,
+    )
+    asyncio.run(reward.settle(reward.bot, transfers, reward.context))
+
+    assert reward.statuses == []
+    [(group, specs, context)] = reward.queued
+    assert group == "reward:c:1:retry1"
+    assert list(specs) == ["tax"]
+    assert specs["tax"]["recipient"] == "tax-recipient"
+    assert (context["group"], context["round"], context["paid"]) == (
+        "reward:c:1",
+        1,
+        ["finder"],
+    )
+
+    # The follow-up group pays the tax: the case is completed
+    follow_up = reward_transfers(
+        outbox, "reward:c:1:retry1", tax=TransferStatus.CONFIRMED
+    )
+    asyncio.run(reward.settle(reward.bot, follow_up, context))
+    assert reward.statuses == [(CaseStatus.COMPLETED, CaseStatus.PAYOUT_PENDING)]
+    assert len(reward.queued) == 1
+
+
+def test_reward_with_nothing_paid_is_listed_again(outbox, reward):
+    from models.case_model import CaseStatus
+
+    transfers = reward_transfers(
+        outbox,
+        "reward:c:1",
+        finder=TransferStatus.FAILED,
+        tax=TransferStatus.FAILED,
+    )
+    asyncio.run(reward.settle(reward.bot, transfers, reward.context))
+    assert reward.statuses == [(CaseStatus.ADVERTISE, CaseStatus.PAYOUT_PENDING)]
+    assert reward.queued == []
+
+
+def test_reward_failing_every_round_is_held_for_the_owner(outbox, reward, monkeypatch):
+    from handlers import listing_handler
+
+    monkeypatch.setattr(listing_handler, "REWARD_PAYOUT_MAX_ROUNDS", 1)
+    transfers = reward_transfers(
+        outbox, "reward:c:1:retry1", tax=TransferStatus.FAILED
+    )
+    context = {**reward.context, "group": "reward:c:1", "round": 1, "paid": ["finder"]}
+    asyncio.run(reward.settle(reward.bot, transfers, context))
+
+    assert reward.statuses == []
+    assert reward.queued == []
+    assert str(listing_handler.OWNER_TELEGRAM_ID) in [
+        str(chat_id) for chat_id, _ in reward.bot.messages
+    ]